@@ -0,0 +1,31 @@
+"""Shared setup for tests that drive the API against a temporary store."""
+import os
+import tempfile
+import unittest
+import warnings
+from typing import Any, Dict, Optional
+
+with warnings.catch_warnings():
+    # FastAPI's on_event hooks and the pydantic v1-style models warn on import
+    warnings.simplefilter("ignore", DeprecationWarning)
+    import main
+    from fastapi.testclient import TestClient
+
+from store import DataStore
+
+__all__ = ["TestClient", "main", "use_temp_store"]
+
+def use_temp_store(test: unittest.TestCase, initial: Optional[Dict[str, Any]] = None) -> DataStore:
+    """Point main at a fresh store in a temporary directory for the rest of `test`.
+
+    The store starts from `initial` (main.INITIAL_DATA by default). Cleanup
+    puts the previous store back, then closes this one and removes its files.
+    """
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    store = DataStore(os.path.join(tmp.name, "data.json"), main.INITIAL_DATA if initial is None else initial)
+    store.load()
+    test.addCleanup(store.close)
+    test.addCleanup(main.use_store, main.store)
+    main.use_store(store)
+    return store
@@ -0,0 +1,49 @@
+"""Benchmark for working-calendar arithmetic.
+
+Counts working days over multi-year ranges and steps N working days with a
+day-by-day loop (what the labor code used to do per assignment) and with
+WorkCalendar's cumulative arrays. Run from the backend directory:
+
+    python bench_calendar.py [QUERIES]
+"""
+import random
+import sys
+import time
+from datetime import date
+
+from work_calendar import calendar_from_spec
+
+def loop_count(weekdays, holidays, start, end):
+    return sum(1 for o in range(start, end + 1) if (o - 1) % 7 in weekdays and o not in holidays)
+
+def loop_add(weekdays, holidays, start, n):
+    day = start
+    while n:
+        day += 1
+        if (day - 1) % 7 in weekdays and day not in holidays:
+            n -= 1
+    return day
+
+if __name__ == "__main__":
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(1)
+    base = date(2025, 1, 1).toordinal()
+    holidays = sorted({date.fromordinal(base + rng.randrange(5 * 365)).isoformat() for _ in range(50)})
+    calendar = calendar_from_spec({"workingDays": [1, 2, 3, 4, 5], "nonWorkingDates": holidays})
+    ranges = [(base + rng.randrange(365), base + 365 + rng.randrange(3 * 365)) for _ in range(queries)]
+    steps = [(base + rng.randrange(365), rng.randrange(1, 750)) for _ in range(queries)]
+
+    started = time.perf_counter()
+    expected = [loop_count(calendar.working_weekdays, calendar.holidays, a, b) for a, b in ranges]
+    expected_add = [loop_add(calendar.working_weekdays, calendar.holidays, a, n) for a, n in steps]
+    loop = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = [calendar.count(a, b) for a, b in ranges]
+    actual_add = [calendar.add(a, n) for a, n in steps]
+    fast = time.perf_counter() - started
+    assert actual == expected and actual_add == expected_add
+
+    print(f"{queries} counts + {queries} steps over 1-4 year ranges")
+    print(f"day-by-day loop:      {loop * 1000:8.1f}ms")
+    print(f"cumulative arrays:    {fast * 1000:8.1f}ms ({loop / fast:.0f}x)")
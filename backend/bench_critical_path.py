@@ -0,0 +1,71 @@
+"""Benchmark for the critical-path engine.
+
+Builds a ScheduleNetwork over N items and M random forward links of all four
+types, then times single-item moves (incremental passes) and online link inserts
+(cycle check + reorder + passes) against the full build, and the per-item results,
+which are built once per change and then reused. Run from the backend directory:
+
+    python bench_critical_path.py [N] [M]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from critical_path import DAY_MINUTES, LINK_TYPES, DependencyCycleError, ScheduleNetwork, item_times
+
+MOVES = 200
+
+def make_network(n, m, seed=1):
+    rng = random.Random(seed)
+    first = date(2026, 1, 1)
+    items = [{"id": f"i{k}", "startAt": (first + timedelta(days=rng.randrange(365))).isoformat(),
+              "durationMinutes": rng.choice([60, DAY_MINUTES, 5 * DAY_MINUTES])} for k in range(n)]
+    links = []
+    for k in range(m):
+        a = rng.randrange(n - 1)
+        b = rng.randrange(a + 1, min(n, a + 200)) # mostly local links, like real plans
+        links.append({"id": f"l{k}", "predecessorId": f"i{a}", "successorId": f"i{b}",
+                      "type": rng.choice(LINK_TYPES), "lagMinutes": rng.choice([0, 0, 60, DAY_MINUTES])})
+    return items, links
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    items, links = make_network(n, m)
+
+    started = time.perf_counter()
+    network = ScheduleNetwork(items, links)
+    build = time.perf_counter() - started
+
+    rng = random.Random(2)
+    started = time.perf_counter()
+    for _ in range(MOVES):
+        moved = items[rng.randrange(n)]
+        moved["durationMinutes"] = rng.choice([60, DAY_MINUTES, 5 * DAY_MINUTES])
+        network.move(moved["id"], *item_times(moved))
+    move = (time.perf_counter() - started) / MOVES
+
+    started = time.perf_counter()
+    rejected = 0
+    for k in range(MOVES):
+        a, b = rng.sample(range(n), 2) # half of these run against the current order
+        try:
+            network.add_link({"id": f"new{k}", "predecessorId": f"i{a}", "successorId": f"i{b}", "type": "FS"})
+        except DependencyCycleError:
+            rejected += 1
+    insert = (time.perf_counter() - started) / MOVES
+
+    started = time.perf_counter()
+    results = network.results()
+    report = time.perf_counter() - started
+    started = time.perf_counter()
+    network.results(critical_only=True)
+    again = time.perf_counter() - started
+
+    print(f"{n} items, {m} links, {len(results['criticalPath'])} on the critical path")
+    print(f"full build (sort + both passes): {build * 1000:7.1f}ms")
+    print(f"move one item (incremental):     {move * 1000:7.2f}ms")
+    print(f"add one link (online):           {insert * 1000:7.2f}ms ({rejected} rejected as cycles)")
+    print(f"results for every item:          {report * 1000:7.1f}ms")
+    print(f"results again, critical only:    {again * 1000:7.2f}ms")
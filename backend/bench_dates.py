@@ -0,0 +1,93 @@
+"""Micro-benchmark for the shared date parsing layer.
+
+Times /api/calculate-date-info, the billing item generator and the labor
+generator pipeline with the previous per-call strptime parsing (and linear
+ordering-period scan that re-parsed ORDERING_PERIODS, and strftime month
+keys) against the cached parser, bisect lookup and month_key in date_utils. Run from the backend directory:
+
+    python bench_dates.py
+"""
+import asyncio
+import random
+import time
+import warnings
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+warnings.simplefilter("ignore", DeprecationWarning)
+
+import date_utils
+import logic_billing
+import logic_labor
+import main
+from bench_labor import make_plan
+
+cached_parse = date_utils.parse_date
+
+def strptime_parse(date_str):
+    return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+def linear_ordering_period(date_str):
+    if not date_str:
+        return None
+    dt = strptime_parse(date_str)
+    for period in date_utils.ORDERING_PERIODS:
+        if strptime_parse(period["start"]) <= dt <= strptime_parse(period["end"]):
+            return period
+    return None
+
+LEGACY = [
+    mock.patch.object(date_utils, "parse_date", strptime_parse),
+    mock.patch.object(date_utils, "get_ordering_period", linear_ordering_period),
+    mock.patch.object(main, "get_ordering_period", linear_ordering_period),
+    mock.patch.object(logic_billing, "parse_date", strptime_parse),
+    mock.patch.object(logic_labor, "parse_date", strptime_parse),
+    mock.patch.object(logic_labor, "month_key", lambda d: d.strftime("%Y-%m")),
+]
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        cached_parse.cache_clear() # time cold caches: each run parses its strings afresh
+        date_utils.month_key.cache_clear()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def legacy(fn):
+    for patch in LEGACY:
+        patch.start()
+    try:
+        return timed(fn)
+    finally:
+        for patch in LEGACY:
+            patch.stop()
+
+async def date_info_calls(days):
+    for d in days:
+        await main.calculate_date_info(d)
+
+def main_bench():
+    rng = random.Random(1)
+    days = [(date(2024, 7, 1) + timedelta(days=rng.randrange(1900))).isoformat() for _ in range(20000)]
+    deployments = make_plan(400)[0]
+    for i, d in enumerate(deployments):
+        d.update(name=f"D{i}", type=rng.choice(["Land", "Ship", "Shore", "Other"]),
+                 clinPrice15=1500, clinPriceSingle=100, clinPriceOverAbove=50, price=900)
+    labor_args = make_plan(200)
+
+    cases = [
+        ("calculate-date-info (20k calls)", lambda: asyncio.run(date_info_calls(days))),
+        ("billing items (400 deployments)", lambda: logic_billing.generate_all_billing_items(deployments)),
+        ("labor pipeline (200 deployments)", lambda: logic_labor.aggregate_monthly_hours(*labor_args, engine="python")),
+    ]
+    print(f"{'case':<34} {'strptime (s)':>12} {'cached (s)':>11} {'speedup':>8}")
+    for name, fn in cases:
+        before = legacy(fn)
+        after = timed(fn)
+        print(f"{name:<34} {before:>12.4f} {after:>11.4f} {before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main_bench()
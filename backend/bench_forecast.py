@@ -0,0 +1,44 @@
+"""Benchmark for the pricing-aware revenue forecast.
+
+Prices thousands of what-if deployments against the ordering-period rate
+table, cold (empty per-deployment cache) and warm (re-run after editing a
+few deployments). Run from the backend directory:
+
+    python bench_forecast.py [DEPLOYMENTS]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from forecast import RevenueForecast
+
+PRICING = {str(op): {"land15": "360321.00", "landOA": "315803.00", "ship15": "181406.10", "ship1": "10600.91"}
+           for op in range(1, 6)}
+
+def what_if(n, seed=1):
+    rng = random.Random(seed)
+    deployments = []
+    for i in range(n):
+        start = date(2024, 7, 14) + timedelta(days=rng.randrange(5 * 365))
+        deployments.append({"id": f"w{i}", "type": rng.choice(["Land", "Ship", "Shore", "Other"]),
+                            "startDate": start.isoformat(),
+                            "endDate": (start + timedelta(days=rng.randrange(15, 365))).isoformat(), "price": 5000})
+    return deployments
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    deployments = what_if(n)
+    forecast = RevenueForecast(PRICING)
+    cold, rows = timed(lambda: forecast.cube(deployments))
+    for d in deployments[:50]:
+        d["endDate"] = (date.fromisoformat(d["endDate"]) + timedelta(days=30)).isoformat()
+    warm, _ = timed(lambda: forecast.cube(deployments))
+    print(f"{n} what-if deployments -> {len(rows)} cube cells")
+    print(f"cold cache: {cold:.3f}s")
+    print(f"warm cache, 50 edited: {warm:.3f}s")
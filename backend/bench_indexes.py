@@ -0,0 +1,69 @@
+"""Benchmark for the scheduler item merge with and without hash indexes.
+
+Times GET /api/scheduler/items (indexed lookups) against the previous
+nested-scan merge at growing sizes, then the indexed merge alone at 10k
+deployments and 50k schedule items. The nested scan is quadratic, so it is
+only run up to a size where it finishes in reasonable time. Run from the
+backend directory:
+
+    python bench_indexes.py
+"""
+import asyncio
+import os
+import tempfile
+import time
+import warnings
+
+warnings.simplefilter("ignore", DeprecationWarning)
+
+import main
+from store import DataStore
+
+def make_store(path, n_deployments, n_items):
+    store = DataStore(path, main.INITIAL_DATA, compact_threshold=1 << 40)
+    store.load()
+    store.data["deployments"] = [
+        {"id": f"d{i}", "name": f"Deployment {i}", "startDate": "2026-01-01", "endDate": "2026-03-31"}
+        for i in range(n_deployments)
+    ]
+    # Half the deployments have a linked local item; the rest of the items are free-standing tasks.
+    linked = [{"id": f"s{i}", "deploymentId": f"d{i}", "title": "", "startAt": "", "endAt": ""}
+              for i in range(0, n_deployments, 2)]
+    local = [{"id": f"t{i}", "title": f"Task {i}", "startAt": "2026-02-01", "endAt": "2026-02-05"}
+             for i in range(n_items - len(linked))]
+    store.data["scheduleItems"] = linked + local
+    return store
+
+def nested_scan_merge(deployments, local_items):
+    merged = []
+    for d in deployments:
+        local = next((i for i in local_items if i.get('deploymentId') == d['id']), None)
+        merged.append(local.copy() if local else {"id": f"dep_{d['id']}"})
+    merged.extend(i for i in local_items if not i.get('deploymentId'))
+    return merged
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+def main_bench():
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, "data.json")
+    print(f"{'deployments':>12} {'items':>8} {'indexed (s)':>12} {'nested scan (s)':>16}")
+    for n_deps, n_items, run_scan in [(500, 2500, True), (1000, 5000, True), (2000, 10000, True),
+                                      (10000, 50000, False)]:
+        main.use_store(make_store(path, n_deps, n_items))
+        indexed, merged = timed(lambda: asyncio.run(main.get_scheduler_items(from_=None)))
+        line = f"{n_deps:>12} {n_items:>8} {indexed:>12.4f}"
+        if run_scan:
+            scan, legacy = timed(lambda: nested_scan_merge(main.store.get("deployments"), main.store.get("scheduleItems")))
+            assert len(legacy) == len(merged)
+            line += f" {scan:>16.4f}"
+        else:
+            line += f" {'(skipped)':>16}"
+        print(line)
+    tmp.cleanup()
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,79 @@
+"""Benchmark for monthly labor aggregation engines.
+
+Builds multi-year plans with hundreds of deployments (pre/during/post
+segments, overhead and resource assignments), checks the NumPy engine returns
+identical results to the generator pipeline and reports the speedup. Then
+runs a forecast over all ordering periods with ten 'during' segments per
+deployment and reports peak memory per engine. Run from the backend directory:
+
+    python bench_labor.py [DEPLOYMENTS]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from date_utils import ORDERING_PERIODS, parse_date
+from logic_labor import aggregate_monthly_hours
+
+def make_plan(n_deployments, years=4, seed=1, base=date(2025, 1, 1), n_during=3):
+    rng = random.Random(seed)
+    span = 365 * years
+    seg = lambda: {"categoryId": rng.choice(["lc_1", "lc_2", "lc_3", "lc_4"]), "hours": rng.choice([4, 8, 10, 12]),
+                   "isOvertimeEligible": rng.random() < 0.5, "duration": rng.randrange(5, 45), "offset": rng.randrange(0, 10)}
+    deployments, assignments = [], []
+    for i in range(n_deployments):
+        start = base + timedelta(days=rng.randrange(span))
+        end = start + timedelta(days=rng.randrange(30, 240))
+        deployments.append({"id": f"d{i}", "startDate": start.isoformat(), "endDate": end.isoformat(),
+                            "laborPlan": {"pre": [seg(), seg()], "during": [seg() for _ in range(n_during)], "post": [seg()]}})
+        assignments.append({"id": f"a{i}", "scheduleItemId": f"dep_d{i}", "resourceId": f"res_{i % 20}",
+                            "allocationMode": "fte", "allocationValue": 0.5})
+    overhead = [{"id": f"o{c}", "categoryId": f"lc_{c}", "hours": 2, "startDate": base.isoformat(),
+                 "endDate": (base + timedelta(days=span)).isoformat()} for c in range(1, 5)]
+    return deployments, overhead, [], assignments, []
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main_bench(sizes):
+    print(f"{'deployments':>12} {'python (s)':>11} {'numpy (s)':>10} {'speedup':>8}")
+    for n in sizes:
+        args = make_plan(n)
+        slow, expected = timed(lambda: aggregate_monthly_hours(*args, engine="python"), repeat=1)
+        fast, actual = timed(lambda: aggregate_monthly_hours(*args, engine="numpy"))
+        assert actual == expected, "engines disagree"
+        print(f"{n:>12} {slow:>11.3f} {fast:>10.4f} {slow / fast:>7.1f}x")
+
+def peak_memory(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed, result
+
+def forecast_bench(n):
+    first = parse_date(ORDERING_PERIODS[0]["start"])
+    years = (parse_date(ORDERING_PERIODS[-1]["end"]) - first).days // 365
+    args = make_plan(n, years=years, base=first, n_during=10)
+    print(f"\n{years}-year ordering-period forecast, {n} deployments x 10 'during' segments")
+    print(f"{'engine':>10} {'peak MB':>8} {'time (s)':>9}")
+    results = {}
+    for engine in ("python", "numpy", "timeline"):
+        peak, elapsed, results[engine] = peak_memory(lambda: aggregate_monthly_hours(*args, engine=engine))
+        print(f"{engine:>10} {peak / 2 ** 20:>8.1f} {elapsed:>9.3f}")
+    assert results["numpy"] == results["python"], "engines disagree"
+    assert all(abs(results["timeline"][m][c] - h) < 1e-6 for m, cats in results["python"].items() for c, h in cats.items())
+
+if __name__ == "__main__":
+    main_bench([int(sys.argv[1])] if len(sys.argv) > 1 else [100, 300, 600])
+    forecast_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
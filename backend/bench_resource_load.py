@@ -0,0 +1,66 @@
+"""Benchmark for the resource load engine.
+
+Builds R resources with weekday calendars and holidays, and assignments over a
+multi-year horizon with every spread, then times the full build against
+re-reading after a single assignment edit. Run from the backend directory:
+
+    python bench_resource_load.py [RESOURCES] [ASSIGNMENTS]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from resource_load import ResourceLoad
+from store import DataStore
+
+EDITS = 200
+
+def make_data(n_resources, n_assignments, years=3, seed=1, base=date(2025, 1, 1)):
+    rng = random.Random(seed)
+    holidays = [(base + timedelta(days=rng.randrange(365 * years))).isoformat() for _ in range(10 * years)]
+    resources = [{"id": f"r{k}", "name": f"R{k}", "defaultCapacityHoursPerDay": rng.choice([6, 8]),
+                  "calendar": {"workingDays": [1, 2, 3, 4, 5], "nonWorkingDates": holidays}} for k in range(n_resources)]
+    items, assignments = [], []
+    for k in range(n_assignments):
+        start = base + timedelta(days=rng.randrange(365 * years))
+        end = start + timedelta(days=rng.randrange(5, 120))
+        items.append({"id": f"i{k}", "title": f"i{k}", "type": "task", "startAt": start.isoformat(), "endAt": end.isoformat()})
+        assignments.append(random_assignment(rng, k, n_resources))
+    return {"scheduleItems": items, "resources": resources, "resourceAssignments": assignments}
+
+def random_assignment(rng, k, n_resources):
+    return {"id": f"a{k}", "resourceId": f"r{rng.randrange(n_resources)}", "scheduleItemId": f"i{k}",
+            "allocationMode": rng.choice(["hours", "fte", "percent"]), "allocationValue": rng.choice([0.5, 1, 50, 80]),
+            "spread": rng.choice(["uniform", "front_loaded", "back_loaded"])}
+
+if __name__ == "__main__":
+    n_resources = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_assignments = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DataStore(os.path.join(tmp, "data.json"), make_data(n_resources, n_assignments))
+        store.load()
+        view = ResourceLoad(store)
+
+        started = time.perf_counter()
+        over = sum(len(view.over_allocated(f"r{k}")) for k in range(n_resources))
+        build = time.perf_counter() - started
+
+        rng = random.Random(2)
+        started = time.perf_counter()
+        for _ in range(EDITS):
+            store.upsert("resourceAssignments", random_assignment(rng, rng.randrange(n_assignments), n_resources))
+            view.over_allocated("r0")
+        edit = (time.perf_counter() - started) / EDITS
+
+        started = time.perf_counter()
+        report = view.report()
+        full_report = time.perf_counter() - started
+        store.close()
+
+    print(f"{n_resources} resources, {n_assignments} assignments, {report['start']}..{report['end']}, {over} over-allocated days")
+    print(f"full build:             {build * 1000:8.1f}ms")
+    print(f"one assignment edit:    {edit * 1000:8.2f}ms")
+    print(f"report (every day):     {full_report * 1000:8.1f}ms")
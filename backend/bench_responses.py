@@ -0,0 +1,53 @@
+"""Benchmark for JSON response encoding.
+
+Times GET /api/data over a store of N schedule items: FastAPI's default
+path (jsonable_encoder plus json.dumps) against fastjson, cold and served
+from the per-revision byte cache. Run from the backend directory:
+
+    python bench_responses.py [N]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.simplefilter("ignore", DeprecationWarning)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+import fastjson
+import main
+from store import DataStore
+
+ROUNDS = 20
+
+def timed(fn, rounds=ROUNDS):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    tmp = tempfile.TemporaryDirectory()
+    items = [{"id": f"item_{i}", "type": "task", "title": f"Task {i}", "startAt": "2026-02-01",
+              "endAt": "2026-02-05", "metadata": {"tags": ["a", "b"]}} for i in range(n)]
+    store = DataStore(os.path.join(tmp.name, "data.json"), {"scheduleItems": items})
+    store.load()
+    main.use_store(store)
+    client = TestClient(main.app)
+
+    default = timed(lambda: json.dumps(jsonable_encoder(store.data)).encode())
+    fast = timed(lambda: fastjson.dumps(store.data))
+    client.get("/api/data")
+    cached = timed(lambda: client.get("/api/data"))
+    store.close()
+    tmp.cleanup()
+
+    print(f"{n} schedule items, orjson {'in use' if fastjson.available() else 'not installed'}")
+    print(f"jsonable_encoder + json: {default * 1000:7.1f}ms")
+    print(f"fastjson encode:         {fast * 1000:7.1f}ms")
+    print(f"GET /api/data, cached:   {cached * 1000:7.1f}ms")
@@ -0,0 +1,52 @@
+"""Benchmark for the storage backends.
+
+Seeds a store with N schedule items, then times a reload, a run of
+single-record upserts and a full flush, once with the JSON snapshot and
+journal and once with SQLite. Run from the backend directory:
+
+    python bench_storage.py [N]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlite_storage import SqliteStorage
+from store import DataStore, JsonStorage
+
+EDITS = 1000
+
+def item(i, title="Task"):
+    return {"id": f"item_{i}", "type": "task", "deploymentId": f"d{i % 50}", "title": f"{title} {i}",
+            "startAt": "2026-02-01", "endAt": "2026-02-05", "metadata": {"notes": "x" * 40}}
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+def run(name, make_storage, n):
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, "data.json")
+    store = DataStore(path, {"scheduleItems": []}, storage=make_storage(tmp.name, path))
+    store.load()
+    store.replace({"scheduleItems": [item(i) for i in range(n)]})
+    asyncio.run(store.flush())
+    store.close()
+
+    store = DataStore(path, {"scheduleItems": []}, storage=make_storage(tmp.name, path))
+    load = timed(store.load)
+    write = timed(lambda: [store.upsert("scheduleItems", item(i * 7 % n, "Edited")) for i in range(EDITS)])
+    flush = timed(lambda: asyncio.run(store.flush()))
+    store.close()
+    tmp.cleanup()
+    print(f"{name:7} load {load * 1000:8.1f}ms   {EDITS} upserts {write * 1000:7.1f}ms "
+          f"({write / EDITS * 1e6:5.0f}us each)   flush {flush * 1000:7.1f}ms")
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{n} schedule items")
+    # Threshold high enough that the JSON journal never compacts mid-run
+    run("json", lambda d, path: JsonStorage(path, compact_threshold=1 << 40), n)
+    run("sqlite", lambda d, path: SqliteStorage(os.path.join(d, "data.db")), n)
@@ -0,0 +1,66 @@
+"""Concurrency benchmark for the data store.
+
+Fires N concurrent upserts at the scheduler endpoints, interleaved with
+deployment renames, and checks that every write survives both in memory and
+after the store is reloaded from disk. Run from the backend directory:
+
+    python bench_store.py [N]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import httpx
+
+warnings.simplefilter("ignore", DeprecationWarning)
+
+import main
+from store import DataStore
+
+async def run(n: int):
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, "data.json")
+    # Small threshold so compactions run concurrently with the upserts
+    main.use_store(DataStore(path, main.INITIAL_DATA, compact_threshold=64 * 1024))
+    main.store.load()
+    main.store.upsert("deployments", {"id": "d0", "name": "Deployment", "startDate": "2026-01-01", "endDate": "2026-01-31"})
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def upsert_item(i):
+            item = {"id": f"item_{i}", "title": f"Task {i}", "type": "task", "startAt": "2026-02-01", "endAt": "2026-02-05"}
+            res = await client.post("/api/scheduler/items", json=item)
+            res.raise_for_status()
+
+        async def upsert_assignment(i):
+            assign = {"id": f"assign_{i}", "scheduleItemId": f"item_{i}", "resourceId": "res_1", "allocationValue": 8}
+            res = await client.post("/api/scheduler/assignments", json=assign)
+            res.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(f(i) for i in range(n) for f in (upsert_item, upsert_assignment)))
+        elapsed = time.perf_counter() - started
+
+    await main.store.flush()
+    main.store.close()
+    in_memory = (len(main.store.get("scheduleItems")), len(main.store.get("resourceAssignments")))
+
+    reloaded = DataStore(path, main.INITIAL_DATA)
+    reloaded.load()
+    on_disk = (len(reloaded.get("scheduleItems")), len(reloaded.get("resourceAssignments")))
+    reloaded.close()
+    tmp.cleanup()
+
+    print(f"{2 * n} concurrent upserts in {elapsed:.2f}s ({2 * n / elapsed:.0f} req/s)")
+    print(f"in memory: {in_memory[0]} items, {in_memory[1]} assignments")
+    print(f"reloaded:  {on_disk[0]} items, {on_disk[1]} assignments")
+    lost = 2 * n - sum(on_disk)
+    print("no lost updates" if lost == 0 else f"LOST {lost} UPDATES")
+    return lost
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    sys.exit(1 if asyncio.run(run(n)) else 0)
@@ -0,0 +1,52 @@
+"""Benchmark for timeline density buckets.
+
+Counts the items overlapping each week of a multi-year window per lane by
+scanning every item for every bucket, and with build_timeline's difference
+arrays. Run from the backend directory:
+
+    python bench_timeline.py [ITEMS]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from timeline import bucket_starts, build_timeline
+
+def scan(items, lo, hi, starts):
+    lanes = {}
+    for k in range(len(starts) - 1):
+        b_lo, b_hi = max(starts[k], lo), min(starts[k + 1] - 1, hi)
+        for key in lanes:
+            lanes[key].append(0)
+        for item, start, end in items:
+            if start <= b_hi and end >= b_lo:
+                counts = lanes.setdefault(item["swimlaneKey"], [0] * (k + 1))
+                counts[k] += 1
+    return lanes
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(1)
+    base = date(2025, 1, 1)
+    items = []
+    for k in range(n):
+        start = base + timedelta(days=rng.randrange(3 * 365))
+        end = start + timedelta(days=rng.randrange(120))
+        items.append({"id": f"i{k}", "startAt": start.isoformat(), "endAt": end.isoformat(),
+                      "swimlaneKey": f"lane{rng.randrange(20)}"})
+    lo, hi = base.toordinal(), base.toordinal() + 3 * 365
+    spans = [(i, date.fromisoformat(i["startAt"]).toordinal(), date.fromisoformat(i["endAt"]).toordinal()) for i in items]
+
+    started = time.perf_counter()
+    expected = scan(spans, lo, hi, bucket_starts(lo, hi, "week"))
+    naive = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = build_timeline(items, lo, hi, "week", density=True)
+    fast = time.perf_counter() - started
+    assert {lane["key"]: lane["density"] for lane in result["lanes"]} == expected
+
+    print(f"{n} items, {len(result['buckets'])} weekly buckets, {len(result['lanes'])} lanes")
+    print(f"scan per bucket:      {naive * 1000:8.1f}ms")
+    print(f"difference arrays:    {fast * 1000:8.1f}ms ({naive / fast:.0f}x)")
@@ -0,0 +1,105 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from datetime import date
+
+from logic_billing import billing_item_matches, generate_billing_items_for_deployment
+
+# Every deployment field generate_billing_items_for_deployment reads
+BILLING_FIELDS = ("id", "name", "startDate", "endDate", "type",
+                  "clinPrice15", "clinPriceSingle", "clinPriceOverAbove", "price")
+
+def billing_fingerprint(d: Dict[str, Any]) -> tuple:
+    return tuple(d.get(field) for field in BILLING_FIELDS)
+
+class BillingItems:
+    """Materialized billing items, one list per deployment.
+
+    A deployment's items are regenerated only when one of its BILLING_FIELDS
+    changes; edits to labor plans, other collections or unrelated fields
+    leave them alone. Item ids keep the f"{id}_15_{i}" scheme, so
+    billingState references stay valid. The concatenated list and the
+    per-deployment counts and totals are kept until a deployment's items
+    actually change, so reads between edits cost nothing.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Follows the order of the deployments list: new records append,
+        # upserts keep their slot, deletes drop out.
+        self._items: Dict[str, List[Dict[str, Any]]] = {}
+        self._fingerprints: Dict[str, tuple] = {}
+        self._summary: Dict[str, Dict[str, Any]] = {}
+        self._all: Optional[List[Dict[str, Any]]] = None
+        self._dirty: Set[str] = set()
+        self._stale = True
+        store.subscribe(self._on_change)
+
+    def items_for(self, deployment_id: str) -> List[Dict[str, Any]]:
+        self._refresh()
+        return self._items.get(deployment_id, [])
+
+    def all_items(self) -> List[Dict[str, Any]]:
+        self._refresh()
+        if self._all is None:
+            self._all = [item for items in self._items.values() for item in items]
+        return self._all
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """deploymentId -> {"count": number of items, "total": sum of amounts}."""
+        self._refresh()
+        return self._summary
+
+    def iter_items(self, deployments: Iterable[Dict[str, Any]], types: Optional[Iterable[str]] = None,
+                   start: Optional[date] = None, end: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        """Materialized counterpart of logic_billing.iter_billing_items."""
+        types = set(types) if types else None
+        for d in deployments:
+            for item in self.items_for(d["id"]):
+                if billing_item_matches(item, types, start, end):
+                    yield item
+
+    # --- Maintenance ---
+
+    def _refresh(self):
+        if self._stale:
+            self._items.clear()
+            self._fingerprints.clear()
+            self._summary.clear()
+            self._dirty = {d["id"] for d in self.store.get("deployments", [])}
+            self._all = None
+            self._stale = False
+        if not self._dirty:
+            return
+        added = False
+        for deployment_id in self._dirty:
+            d = self.store.find("deployments", deployment_id)
+            if d is None:
+                if self._items.pop(deployment_id, None) is not None:
+                    self._all = None
+                self._fingerprints.pop(deployment_id, None)
+                self._summary.pop(deployment_id, None)
+                continue
+            fingerprint = billing_fingerprint(d)
+            if self._fingerprints.get(deployment_id) == fingerprint:
+                continue
+            try:
+                items = generate_billing_items_for_deployment(d)
+            except (KeyError, TypeError, ValueError):
+                items = [] # malformed dates or prices: no items until the deployment is fixed
+            added = added or deployment_id not in self._items
+            self._items[deployment_id] = items
+            self._fingerprints[deployment_id] = fingerprint
+            self._summary[deployment_id] = {"count": len(items), "total": sum(item["amount"] for item in items)}
+            self._all = None
+        self._dirty.clear()
+        if added:
+            # New deployments were generated in set order; restore list order
+            self._items = {d["id"]: self._items[d["id"]] for d in self.store.get("deployments", []) if d["id"] in self._items}
+
+    def _on_change(self, op: Dict[str, Any]):
+        if self._stale:
+            return
+        collection = op.get("collection")
+        if op["op"] == "replace" or (op["op"] == "set" and collection == "deployments"):
+            self._stale = True
+        elif collection == "deployments" and op["op"] in ("upsert", "update", "delete"):
+            self._dirty.add(op["record"]["id"] if op["op"] == "upsert" else op["id"])
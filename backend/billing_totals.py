@@ -0,0 +1,104 @@
+from datetime import date
+from fractions import Fraction
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from date_utils import ORDERING_PERIODS, get_fiscal_year, get_ordering_period, parse_date
+from logic_billing import calculate_billing_periods
+
+GROUP_FIELDS = ("deploymentId", "type", "fiscalYear", "orderingPeriod")
+
+# (first ordinal, last ordinal, billing type, amount per item, days between item starts)
+Run = Tuple[int, int, str, float, int]
+
+def billing_runs(d: Dict[str, Any]) -> List[Run]:
+    """The arithmetic runs of item start dates generate_billing_items_for_deployment produces.
+
+    Mirrors its rules: P 15-day CLINs (and, for Land with an O&A rate, P
+    parallel O&A items) every 15 days from the start, then one Daily Rate
+    item per remainder day for Ship/Shore, or a single flat item for Other.
+    """
+    rate_15 = float(d.get('clinPrice15', 0) or 0)
+    rate_daily = float(d.get('clinPriceSingle', 0) or 0)
+    rate_oa = float(d.get('clinPriceOverAbove', 0) or 0)
+
+    start = parse_date(d['startDate'])
+    if not d.get('endDate'):
+        return []
+    periods = calculate_billing_periods(d['startDate'], d['endDate'], d.get('type', 'Land'))
+    period_count = periods['periods15Day']
+    remainder = periods['remainderDays']
+
+    s = start.toordinal()
+    runs: List[Run] = []
+    if period_count > 0:
+        last = s + 15 * (period_count - 1)
+        runs.append((s, last, "15-Day CLIN", rate_15, 15))
+        if d.get('type') == 'Land' and rate_oa > 0:
+            runs.append((s, last, "Over & Above", rate_oa, 15))
+    if d.get('type') in ['Ship', 'Shore'] and remainder > 0:
+        first = s + 15 * period_count
+        runs.append((first, first + remainder - 1, "Daily Rate", rate_daily, 1))
+    if d.get('type') == 'Other':
+        price = float(d.get('price', 0) or 0)
+        if price > 0:
+            runs.append((s, s, "Other", price, 1))
+    return runs
+
+def _boundaries(lo: int, hi: int) -> List[int]:
+    """Ordinals in (lo, hi] where the fiscal year or ordering period changes."""
+    cuts = set()
+    for year in range(date.fromordinal(lo).year, date.fromordinal(hi).year + 1):
+        cuts.add(date(year, 4, 1).toordinal()) # FY starts in April
+    for period in ORDERING_PERIODS:
+        cuts.add(parse_date(period["start"]).toordinal())
+        cuts.add(parse_date(period["end"]).toordinal() + 1)
+    return sorted(c for c in cuts if lo < c <= hi)
+
+def _count_in(run: Run, a: int, b: int) -> int:
+    """Items of `run` starting within [a, b]."""
+    first, last, _, _, step = run
+    lo, hi = max(first, a), min(last, b)
+    if lo > hi:
+        return 0
+    k_lo = -((first - lo) // step) # ceil((lo - first) / step)
+    k_hi = (hi - first) // step
+    return max(0, k_hi - k_lo + 1)
+
+def deployment_totals(d: Dict[str, Any]) -> Iterator[Tuple[Tuple[Any, ...], int, Fraction]]:
+    """(deploymentId, type, fiscalYear, orderingPeriod id), item count and exact amount.
+
+    Items are attributed by their start date, like the Billing view does.
+    Each run is cut at fiscal-year and ordering-period boundaries and the
+    items in each piece are counted arithmetically.
+    """
+    for run in billing_runs(d):
+        first, last, kind, amount, _ = run
+        edges = [first] + _boundaries(first, last) + [last + 1]
+        for a, b in zip(edges, edges[1:]):
+            count = _count_in(run, a, b - 1)
+            if count:
+                day = date.fromordinal(a).isoformat()
+                period = get_ordering_period(day)
+                key = (d['id'], kind, get_fiscal_year(day), period["id"] if period else None)
+                yield key, count, Fraction(amount) * count
+
+def billing_totals(deployments: Iterable[Dict[str, Any]], group_by: Sequence[str] = GROUP_FIELDS) -> List[Dict[str, Any]]:
+    """Item counts and amounts summed over `group_by` (a subset of GROUP_FIELDS), without generating line items.
+
+    Amounts are accumulated exactly and rounded once, so they equal
+    math.fsum over the matching generate_all_billing_items amounts.
+    """
+    unknown = set(group_by) - set(GROUP_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot group billing totals by: {', '.join(sorted(unknown))}")
+    picks = [GROUP_FIELDS.index(field) for field in group_by]
+    groups: Dict[Tuple[Any, ...], List[Any]] = {}
+    for d in deployments:
+        for key, count, amount in deployment_totals(d):
+            group = groups.setdefault(tuple(key[i] for i in picks), [0, Fraction(0)])
+            group[0] += count
+            group[1] += amount
+    return [
+        {**dict(zip(group_by, key)), "count": count, "amount": float(amount)}
+        for key, (count, amount) in groups.items()
+    ]
@@ -0,0 +1,650 @@
+import heapq
+from collections import Counter
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import accumulate, repeat
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover - exercised only without numpy
+    np = None
+
+from date_utils import parse_date
+
+DAY_MINUTES = 24 * 60
+LINK_TYPES = ("FS", "SS", "FF", "SF")
+LINK_KINDS = {kind: k for k, kind in enumerate(LINK_TYPES)}
+LINK_KINDS_OR_FS = {**LINK_KINDS, None: 0, "": 0, 0: 0} # (type or "FS") for hashable types
+
+@lru_cache(maxsize=65536)
+def to_minutes(value: str, end: bool = False) -> Optional[int]:
+    """Minutes since 0001-01-01 of an ISO date or datetime; None if unparseable.
+
+    A bare date as an end means the end of that day, as with deployment end dates.
+    """
+    try:
+        if len(value) <= 10:
+            return (parse_date(value).toordinal() + (1 if end else 0)) * DAY_MINUTES
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return moment.toordinal() * DAY_MINUTES + moment.hour * 60 + moment.minute
+
+@lru_cache(maxsize=65536)
+def _iso_day(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+def from_minutes(minutes: int) -> str:
+    day, rest = divmod(minutes, DAY_MINUTES)
+    return f"{_iso_day(day)}T{rest // 60:02d}:{rest % 60:02d}"
+
+def item_times(item: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """(planned start, duration) in minutes, from startAt and endAt or durationMinutes."""
+    start = to_minutes(item.get("startAt") or "")
+    if start is None:
+        return None
+    end = to_minutes(item["endAt"], end=True) if item.get("endAt") else None
+    if end is None:
+        end = start + int(item.get("durationMinutes") or 0)
+    return start, max(0, end - start)
+
+class DependencyCycleError(ValueError):
+    def __init__(self, ids: List[str]):
+        super().__init__(f"Dependencies form a cycle through: {', '.join(ids[:20])}")
+        self.ids = ids
+
+class _Adjacency:
+    """Link numbers by item in CSR form: item i's are links[offsets[i]:offsets[i + 1]], in link order.
+
+    Two flat int lists instead of a list per item keep the build cheap. An
+    item whose links are added or removed gets its own list in `edited`,
+    which takes precedence, so edits never shift the flat lists.
+    """
+
+    def __init__(self, ends: List[int], n: int):
+        if np is not None:
+            column = np.array(ends, dtype=np.int64)
+            self.links: List[int] = np.argsort(column, kind="stable").tolist()
+            self.offsets: List[int] = [0, *np.cumsum(np.bincount(column, minlength=n)).tolist()]
+        else:
+            self.links = sorted(range(len(ends)), key=ends.__getitem__) # stable
+            counts = Counter(ends)
+            self.offsets = [0, *accumulate(counts[i] for i in range(n))]
+        self.edited: Dict[int, List[int]] = {}
+
+    def __getitem__(self, i: int) -> List[int]:
+        links = self.edited.get(i)
+        return links if links is not None else self.links[self.offsets[i]:self.offsets[i + 1]]
+
+    def add(self, i: int, e: int):
+        self._own(i).append(e)
+
+    def remove(self, i: int, e: int):
+        self._own(i).remove(e)
+
+    def _own(self, i: int) -> List[int]:
+        if i not in self.edited:
+            self.edited[i] = self[i]
+        return self.edited[i]
+
+class ScheduleNetwork:
+    """Critical-path schedule of items linked by FS/SS/FF/SF dependencies with lag.
+
+    Items and links are numbered. Each link's ends, type and lag are kept in
+    flat columns indexed by its number, and successor and predecessor links
+    per item as _Adjacency, so both passes walk each link once in
+    topological order. Each item starts no earlier than its planned start,
+    and later if a link requires it:
+
+        FS: S(succ) >= F(pred) + lag     SS: S(succ) >= S(pred) + lag
+        FF: F(succ) >= F(pred) + lag     SF: F(succ) >= S(pred) + lag
+
+    The backward pass stores each item's `tail`, the time its late finish
+    leaves before the project finish, instead of the late finish itself, so
+    moving the project finish needs no recomputation. move() re-runs the
+    forward pass only downstream of the moved item, and the backward pass
+    only upstream of it when its duration changed, stopping wherever a value
+    comes out unchanged.
+
+    Links can be added and removed in place. add_link() keeps the
+    topological order with the Pearce-Kelly algorithm: a link that already
+    points forward in the order costs nothing; otherwise only the items
+    ordered between its ends are searched, both for a cycle and to reorder.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]], links: Iterable[Dict[str, Any]]):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.start: List[int] = []
+        self.duration: List[int] = []
+        for item in items:
+            times = item_times(item)
+            if times is None or item["id"] in self.index:
+                continue
+            self.index[item["id"]] = len(self.ids)
+            self.ids.append(item["id"])
+            self.start.append(times[0])
+            self.duration.append(times[1])
+
+        links = list(links)
+        try:
+            lookup = self.index.get
+            ends = [list(map(lookup, map(dict.get, links, repeat("predecessorId")))),
+                    list(map(lookup, map(dict.get, links, repeat("successorId")))),
+                    list(map(LINK_KINDS_OR_FS.get, map(dict.get, links, repeat("type"))))]
+        except TypeError: # an unhashable id or type somewhere
+            ends = [list(column) for column in zip(*map(self._ends, links))]
+        self.skipped: Dict[Any, None] = {} # ids of links to unknown items, or of unknown type
+        if any(None in column for column in ends):
+            kept = []
+            for e, link in enumerate(links):
+                if None in (ends[0][e], ends[1][e], ends[2][e]):
+                    self.skipped[link.get("id")] = None
+                else:
+                    kept.append(e)
+            links = [links[e] for e in kept]
+            ends = [[column[e] for e in kept] for column in ends]
+        # Link e runs from item link_from[e] to item link_to[e]; a removed link's number is not reused
+        self.link_from: List[int] = ends[0]
+        self.link_to: List[int] = ends[1]
+        self.link_kind: List[int] = ends[2]
+        self.link_lag: List[int] = [int(lag) if lag else 0 for lag in map(dict.get, links, repeat("lagMinutes"))]
+        self.link_ids: List[Any] = list(map(dict.get, links, repeat("id")))
+        self._links: Optional[Dict[Any, int]] = None
+        self.succ = _Adjacency(self.link_from, len(self.ids))
+        self.pred = _Adjacency(self.link_to, len(self.ids))
+
+        # The link columns in successor order, so each item's outgoing links are slices of them
+        out = [list(map(column.__getitem__, self.succ.links)) for column in (self.link_to, self.link_kind, self.link_lag)]
+        self.order, self.early = self._sort_and_forward(*out)
+        self.position = [0] * len(self.ids)
+        for p, i in enumerate(self.order):
+            self.position[i] = p
+        self.tail = self._tails(*out)
+        self._report: Optional[Tuple[List[Dict[str, Any]], List[str], Optional[str], Optional[str]]] = None
+
+    # --- Passes ---
+
+    def _sort_and_forward(self, out_to: List[int], out_kind: List[int], out_lag: List[int]) -> Tuple[List[int], List[int]]:
+        """Topological order by Kahn's algorithm, computing early starts along the way.
+
+        An item's early start is final once it is ordered, so it is pushed
+        over its links as they are counted off instead of pulled in a
+        second walk (as _early does for moves).
+        """
+        indegree = list(map(int.__sub__, self.pred.offsets[1:], self.pred.offsets))
+        order = [i for i, d in enumerate(indegree) if d == 0]
+        early, duration = self.start[:], self.duration
+        offsets = self.succ.offsets
+        for i in order:
+            es = early[i]
+            ef = es + duration[i]
+            a, b = offsets[i], offsets[i + 1]
+            for j, k, lag in zip(out_to[a:b], out_kind[a:b], out_lag[a:b]):
+                if k == 0:
+                    bound = ef + lag
+                elif k == 1:
+                    bound = es + lag
+                elif k == 2:
+                    bound = ef + lag - duration[j]
+                else:
+                    bound = es + lag - duration[j]
+                if bound > early[j]:
+                    early[j] = bound
+                left = indegree[j] - 1
+                indegree[j] = left
+                if left == 0:
+                    order.append(j)
+        if len(order) < len(self.ids):
+            # whatever never reaches in-degree zero is on or behind a cycle
+            raise DependencyCycleError([self.ids[i] for i, d in enumerate(indegree) if d > 0])
+        return order, early
+
+    def _tails(self, out_to: List[int], out_kind: List[int], out_lag: List[int]) -> List[int]:
+        """Every item's tail, walking the order backwards; _tail over the build's flat columns."""
+        tail, duration, offsets = [0] * len(self.ids), self.duration, self.succ.offsets
+        for i in reversed(self.order):
+            di = duration[i]
+            best = 0
+            a, b = offsets[i], offsets[i + 1]
+            for j, k, lag in zip(out_to[a:b], out_kind[a:b], out_lag[a:b]):
+                if k == 0:
+                    t = tail[j] + duration[j] + lag
+                elif k == 1:
+                    t = tail[j] + duration[j] + lag - di
+                elif k == 2:
+                    t = tail[j] + lag
+                else:
+                    t = tail[j] + lag - di
+                if t > best:
+                    best = t
+            tail[i] = best
+        return tail
+
+    def _early(self, j: int) -> int:
+        es = self.start[j]
+        early, duration = self.early, self.duration
+        link_from, link_kind, link_lag = self.link_from, self.link_kind, self.link_lag
+        dj = duration[j]
+        for e in self.pred[j]:
+            i, k = link_from[e], link_kind[e]
+            if k == 0:
+                bound = early[i] + duration[i] + link_lag[e]
+            elif k == 1:
+                bound = early[i] + link_lag[e]
+            elif k == 2:
+                bound = early[i] + duration[i] + link_lag[e] - dj
+            else:
+                bound = early[i] + link_lag[e] - dj
+            if bound > es:
+                es = bound
+        return es
+
+    def _tail(self, i: int) -> int:
+        tail, duration = self.tail, self.duration
+        link_to, link_kind, link_lag = self.link_to, self.link_kind, self.link_lag
+        di = duration[i]
+        best = 0
+        for e in self.succ[i]:
+            j, k = link_to[e], link_kind[e]
+            if k == 0:
+                t = tail[j] + duration[j] + link_lag[e]
+            elif k == 1:
+                t = tail[j] + duration[j] + link_lag[e] - di
+            elif k == 2:
+                t = tail[j] + link_lag[e]
+            else:
+                t = tail[j] + link_lag[e] - di
+            if t > best:
+                best = t
+        return best
+
+    def move(self, item_id: str, start: int, duration: int) -> bool:
+        """Give an item new planned times and propagate; False if the item is unknown."""
+        i = self.index.get(item_id)
+        if i is None:
+            return False
+        resized = duration != self.duration[i]
+        self.start[i] = start
+        self.duration[i] = duration
+        # A new duration shifts what the item imposes on both neighbours
+        self._forward(i, forced=resized)
+        if resized:
+            self._backward(i, forced=True)
+        return True
+
+    def _forward(self, i: int, forced: bool = False):
+        """Recompute early starts downstream of `i`, in topological order."""
+        self._report = None
+        early, order, position, link_to = self.early, self.order, self.position, self.link_to
+        heap = [position[i]]
+        queued = {i}
+        while heap:
+            j = order[heapq.heappop(heap)]
+            es = self._early(j)
+            if es == early[j] and not (forced and j == i):
+                continue
+            early[j] = es
+            for e in self.succ[j]:
+                s = link_to[e]
+                if s not in queued:
+                    queued.add(s)
+                    heapq.heappush(heap, position[s])
+
+    def _backward(self, i: int, forced: bool = False):
+        """Recompute tails upstream of `i`, in reverse topological order (max-heap on position)."""
+        self._report = None
+        tails, order, position, link_from = self.tail, self.order, self.position, self.link_from
+        heap = [-position[i]]
+        queued = {i}
+        while heap:
+            j = order[-heapq.heappop(heap)]
+            tail = self._tail(j)
+            if tail == tails[j] and not (forced and j == i):
+                continue
+            tails[j] = tail
+            for e in self.pred[j]:
+                p = link_from[e]
+                if p not in queued:
+                    queued.add(p)
+                    heapq.heappush(heap, -position[p])
+
+    # --- Links ---
+
+    @property
+    def links(self) -> Dict[Any, int]:
+        """Link id -> link number; indexed on first use, since only edits look links up by id."""
+        if self._links is None:
+            self._links = dict(zip(self.link_ids, range(len(self.link_ids))))
+        return self._links
+
+    def _ends(self, link: Dict[str, Any]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """(predecessor, successor, link type index) of `link`, each None if unknown."""
+        try:
+            return (self.index.get(link.get("predecessorId")), self.index.get(link.get("successorId")),
+                    LINK_KINDS.get(link.get("type") or "FS"))
+        except TypeError:
+            return None, None, None
+
+    def cycle_with(self, link: Dict[str, Any]) -> Optional[List[str]]:
+        """The cycle `link` would close, as item ids from its predecessor back to it; None if none.
+
+        A link replacing one with the same id is checked without the old one.
+        """
+        x, y, k = self._ends(link)
+        if x is None or y is None or k is None:
+            return None
+        if x == y:
+            return [self.ids[x], self.ids[x]]
+        if self.position[x] < self.position[y]:
+            return None # the order already runs x before y
+        path = self._search_forward(y, self.position[x], self.links.get(link.get("id")))[1]
+        return [self.ids[x]] + [self.ids[i] for i in path] if path else None
+
+    def _search_forward(self, y: int, bound: int, ignore: Optional[int] = None):
+        """Items reachable from y without passing position `bound`, and the path to the item at `bound` if reached."""
+        target = self.order[bound]
+        parent = {y: None}
+        stack = [y]
+        while stack:
+            j = stack.pop()
+            if j == target:
+                path = []
+                while j is not None:
+                    path.append(j)
+                    j = parent[j]
+                return parent, path[::-1]
+            for e in self.succ[j]:
+                s = self.link_to[e]
+                if s not in parent and self.position[s] <= bound and e != ignore:
+                    parent[s] = j
+                    stack.append(s)
+        return parent, None
+
+    def add_link(self, link: Dict[str, Any]):
+        """Add (or replace, by id) a link and propagate; raises DependencyCycleError without changing anything.
+
+        Links to unknown items are recorded as skipped.
+        """
+        cycle = self.cycle_with(link)
+        if cycle:
+            raise DependencyCycleError(cycle)
+        self.remove_link(link.get("id"))
+        x, y, k = self._ends(link)
+        if x is None or y is None or k is None:
+            self.skipped[link.get("id")] = None
+            return
+        if self.position[x] > self.position[y]:
+            self._reorder(x, y)
+        e = self.links[link.get("id")] = len(self.link_from)
+        self.link_from.append(x)
+        self.link_to.append(y)
+        self.link_kind.append(k)
+        self.link_lag.append(int(link.get("lagMinutes") or 0))
+        self.link_ids.append(link.get("id"))
+        self.succ.add(x, e)
+        self.pred.add(y, e)
+        self._forward(y)
+        self._backward(x)
+
+    def _reorder(self, x: int, y: int):
+        """Pearce-Kelly: move what y reaches after what reaches x, within the positions they span."""
+        lower, upper = self.position[y], self.position[x]
+        ahead = list(self._search_forward(y, upper)[0])
+        behind = {x}
+        stack = [x]
+        while stack:
+            j = stack.pop()
+            for e in self.pred[j]:
+                p = self.link_from[e]
+                if p not in behind and self.position[p] > lower:
+                    behind.add(p)
+                    stack.append(p)
+        ahead.sort(key=self.position.__getitem__)
+        moved = sorted(behind, key=self.position.__getitem__) + ahead
+        for slot, i in zip(sorted(self.position[i] for i in moved), moved):
+            self.position[i] = slot
+            self.order[slot] = i
+
+    def remove_link(self, link_id: Any):
+        """Drop a link by id and propagate; the topological order stays valid."""
+        self.skipped.pop(link_id, None)
+        e = self.links.pop(link_id, None)
+        if e is None:
+            return
+        x, y = self.link_from[e], self.link_to[e]
+        self.succ.remove(x, e)
+        self.pred.remove(y, e)
+        self._forward(y)
+        self._backward(x)
+
+    # --- Results ---
+
+    def finish(self) -> int:
+        return max(map(int.__add__, self.early, self.duration), default=0)
+
+    def free_float(self, i: int, finish: int) -> int:
+        """How far an item can slip without delaying any successor (or the project finish)."""
+        early, duration = self.early, self.duration
+        link_to, link_kind, link_lag = self.link_to, self.link_kind, self.link_lag
+        ef = early[i] + duration[i]
+        succ = self.succ[i]
+        if not succ:
+            return finish - ef
+        slack = None
+        for e in succ:
+            j, k = link_to[e], link_kind[e]
+            if k == 0:
+                s = early[j] - (ef + link_lag[e])
+            elif k == 1:
+                s = early[j] - (early[i] + link_lag[e])
+            elif k == 2:
+                s = early[j] + duration[j] - (ef + link_lag[e])
+            else:
+                s = early[j] + duration[j] - (early[i] + link_lag[e])
+            if slack is None or s < slack:
+                slack = s
+        return slack
+
+    def results(self, critical_only: bool = False) -> Dict[str, Any]:
+        """Early/late dates, total and free float (minutes) per item, in input order.
+
+        The critical path is listed by early start. Neither depends on which
+        topological order the network happens to hold after online edits.
+        Rows are built once per change to the network and shared between calls.
+        """
+        if self._report is None:
+            self._report = self._build_report()
+        rows, critical, project_start, project_finish = self._report
+        return {
+            "projectStart": project_start,
+            "projectFinish": project_finish,
+            "criticalPath": critical,
+            "items": [row for row in rows if row["critical"]] if critical_only else rows,
+            "skippedLinks": list(self.skipped),
+        }
+
+    def _build_report(self):
+        finish = self.finish()
+        early, duration = self.early, self.duration
+        early_finish = list(map(int.__add__, early, duration))
+        late_finish = [finish - tail for tail in self.tail]
+        late_start = list(map(int.__sub__, late_finish, duration))
+        # items share dates, so format each instant once
+        texts = {minutes: from_minutes(minutes) for minutes in {*early, *early_finish, *late_start, *late_finish}}
+        rows = []
+        critical = []
+        for i, item_id in enumerate(self.ids):
+            es, ls = early[i], late_start[i]
+            total = ls - es
+            if total == 0:
+                critical.append((es, early_finish[i], i))
+            rows.append({
+                "id": item_id,
+                "earlyStart": texts[es],
+                "earlyFinish": texts[early_finish[i]],
+                "lateStart": texts[ls],
+                "lateFinish": texts[late_finish[i]],
+                "totalFloatMinutes": total,
+                "freeFloatMinutes": self.free_float(i, finish),
+                "critical": total == 0,
+            })
+        return (rows, [self.ids[i] for _, _, i in sorted(critical)],
+                texts[min(early)] if self.ids else None,
+                from_minutes(finish) if self.ids else None)
+
+def find_cycle(links: Iterable[Dict[str, Any]], link: Dict[str, Any]) -> Optional[List[str]]:
+    """The cycle `link` would close among `links` (replacing any with its id), by plain search."""
+    source, target = link.get("successorId"), link.get("predecessorId")
+    successors: Dict[Any, List[Any]] = {}
+    for other in links:
+        if other.get("id") != link.get("id"):
+            successors.setdefault(other.get("predecessorId"), []).append(other.get("successorId"))
+    parent = {source: None}
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        if node == target:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = parent[node]
+            return [target] + path[::-1]
+        for nxt in successors.get(node, ()):
+            if nxt not in parent:
+                parent[nxt] = node
+                stack.append(nxt)
+    return None
+
+def cyclic_ids(links: Iterable[Dict[str, Any]]) -> List[str]:
+    """Ids on or downstream of a cycle among `links` (Kahn's algorithm), empty if there is none."""
+    succ: Dict[Any, List[Any]] = {}
+    indegree: Dict[Any, int] = {}
+    for link in links:
+        a, b = link.get("predecessorId"), link.get("successorId")
+        succ.setdefault(a, []).append(b)
+        indegree.setdefault(a, 0)
+        indegree[b] = indegree.get(b, 0) + 1
+    ready = [node for node, count in indegree.items() if count == 0]
+    while ready:
+        for nxt in succ.get(ready.pop(), ()):
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                ready.append(nxt)
+    return [node for node, count in indegree.items() if count > 0]
+
+class CriticalPath:
+    """ScheduleNetwork over the merged schedule items, kept current with the store.
+
+    A change to an item's or deployment's dates moves the affected nodes
+    (ScheduleNetwork.move), so only the subgraph downstream of them is
+    recomputed on the next read. Links are added and removed in place.
+    Adding or removing items rebuilds the network.
+    """
+
+    def __init__(self, store, assembler):
+        self.store = store
+        self.assembler = assembler
+        self._network: Optional[ScheduleNetwork] = None
+        self._moved: Set[str] = set()
+        # merged item id -> deployment it stands for, as of the network build
+        self._deployment_of: Dict[str, Optional[str]] = {}
+        store.subscribe(self._on_change)
+
+    def network(self) -> ScheduleNetwork:
+        if self._network is not None and self._moved:
+            self._apply_moves()
+        if self._network is None:
+            items = self.assembler.items()
+            self._deployment_of = {i["id"]: i.get("deploymentId") for i in items}
+            self._network = ScheduleNetwork(items, self.store.get("scheduleDependencies", []))
+            self._moved.clear()
+        return self._network
+
+    def _check_fields(self, link: Dict[str, Any]):
+        if not link.get("id") or not isinstance(link["id"], str):
+            raise ValueError("Dependency needs a string id")
+        for field in ("predecessorId", "successorId"):
+            item_id = link.get(field)
+            if not isinstance(item_id, str) or self.assembler.get(item_id) is None:
+                raise ValueError(f"{field} '{item_id}' is not a schedule item")
+        if (link.get("type") or "FS") not in LINK_TYPES:
+            raise ValueError(f"type must be one of {', '.join(LINK_TYPES)}")
+        try:
+            int(link.get("lagMinutes") or 0)
+        except (TypeError, ValueError):
+            raise ValueError("lagMinutes must be a number of minutes")
+
+    def check_link(self, link: Dict[str, Any]):
+        """Raise ValueError if `link` is malformed or names unknown items, DependencyCycleError if it closes a cycle.
+
+        Uses the network's topological order, so a link that agrees with it
+        is accepted without a search.
+        """
+        self._check_fields(link)
+        try:
+            network = self.network()
+        except DependencyCycleError:
+            network = None # the stored links already loop
+        if network is not None and link["predecessorId"] in network.index and link["successorId"] in network.index:
+            cycle = network.cycle_with(link)
+        else:
+            # Undated items are not in the network; fall back to a plain search
+            cycle = find_cycle(self.store.get("scheduleDependencies", []), link)
+        if cycle:
+            raise DependencyCycleError(cycle)
+
+    def check_links(self, links: List[Dict[str, Any]]):
+        """check_link for a batch, with one O(V+E) pass over the stored and new links together."""
+        for link in links:
+            self._check_fields(link)
+        if len(links) == 1:
+            return self.check_link(links[0])
+        merged = {l.get("id"): l for l in self.store.get("scheduleDependencies", [])}
+        merged.update((l["id"], l) for l in links)
+        cycle = cyclic_ids(merged.values())
+        if cycle:
+            raise DependencyCycleError(cycle)
+
+    def _apply_moves(self):
+        network = self._network
+        for item_id in self._moved:
+            entry = self.assembler.get(item_id)
+            times = item_times(entry) if entry is not None else None
+            if (times is None) != (item_id not in network.index):
+                self._network = None # an item appeared or disappeared
+                return
+            if times is not None:
+                network.move(item_id, *times)
+        self._moved.clear()
+
+    def _on_change(self, op: Dict[str, Any]):
+        if self._network is None:
+            return
+        collection = op.get("collection")
+        if op["op"] == "replace" or (op["op"] == "set" and collection in ("deployments", "scheduleItems", "scheduleDependencies")):
+            self._network = None
+            return
+        if op["op"] not in ("upsert", "update", "delete"):
+            return
+        record_id = op["record"]["id"] if op["op"] == "upsert" else op["id"]
+        if collection == "scheduleDependencies":
+            link = self.store.find("scheduleDependencies", record_id)
+            try:
+                if link is None:
+                    self._network.remove_link(record_id)
+                else:
+                    self._network.add_link(link)
+            except (DependencyCycleError, TypeError, ValueError):
+                self._network = None # stored anyway (not via save_dependency); reads will report it
+        # Merged entries that can show this record: the item itself, and the
+        # entry of any deployment it is (or was) linked to
+        elif collection == "scheduleItems":
+            item = self.store.find("scheduleItems", record_id)
+            links = {self._deployment_of.get(record_id), item.get("deploymentId") if item else None}
+            self._moved.add(record_id)
+            self._moved.update(f"dep_{d}" for d in links if d)
+        elif collection == "deployments":
+            self._moved.add(f"dep_{record_id}")
+            self._moved.update(self.store.index("scheduleItems").ids_by("deploymentId", record_id))
@@ -1,4 +1,6 @@
+from bisect import bisect_right
 from datetime import datetime, date
+from functools import lru_cache
 from typing import Optional, Dict
 
 ORDERING_PERIODS = [
@@ -9,9 +11,29 @@ ORDERING_PERIODS = [
     {"id": '5', "start": '2028-10-01', "end": '2029-09-30', "label": 'OP5'},
 ]
 
+# Shared by every backend module. The same few thousand date strings are parsed
+# over and over, so results are cached; canonical YYYY-MM-DD strings take the
+# fromisoformat fast path, anything else gets strptime's exact semantics.
+@lru_cache(maxsize=16384)
 def parse_date(date_str: str) -> date:
+    if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-' and date_str[:4].isdigit():
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            pass
     return datetime.strptime(date_str, "%Y-%m-%d").date()
 
+# "YYYY-MM" for a date. Labor aggregation keys every daily entry by month;
+# strftime dominated that loop, and entries share a few thousand dates.
+@lru_cache(maxsize=16384)
+def month_key(d: date) -> str:
+    return f"{d.year:04d}-{d.month:02d}"
+
+# Ordering periods as sorted ordinal bounds, for bisect lookups
+_PERIODS = sorted(ORDERING_PERIODS, key=lambda p: p["start"])
+_PERIOD_STARTS = [parse_date(p["start"]).toordinal() for p in _PERIODS]
+_PERIOD_ENDS = [parse_date(p["end"]).toordinal() for p in _PERIODS]
+
 def get_fiscal_year(date_str: str) -> int:
     if not date_str:
         return 0
@@ -26,11 +48,8 @@ def get_fiscal_year(date_str: str) -> int:
 def get_ordering_period(date_str: str) -> Optional[Dict[str, str]]:
     if not date_str:
         return None
-    dt = parse_date(date_str)
-    
-    for period in ORDERING_PERIODS:
-        start = parse_date(period["start"])
-        end = parse_date(period["end"])
-        if start <= dt <= end:
-            return period
+    ordinal = parse_date(date_str).toordinal()
+    i = bisect_right(_PERIOD_STARTS, ordinal) - 1
+    if i >= 0 and ordinal <= _PERIOD_ENDS[i]:
+        return _PERIODS[i]
     return None
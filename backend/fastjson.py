@@ -0,0 +1,37 @@
+"""JSON encoding for responses and persistence.
+
+Uses orjson when it is installed and the standard library otherwise. Both
+paths take and return the same things: dumps() gives UTF-8 bytes, loads()
+accepts bytes or str. Output is compact unless `pretty` is set, which
+indents by 2 with orjson (its only indent) and by 4 with the stdlib, as
+data.json has always been written.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError: # pragma: no cover - depends on the environment
+    orjson = None
+
+def available() -> bool:
+    """Whether the orjson fast path is in use."""
+    return orjson is not None
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value: Any, pretty: bool = False) -> bytes:
+        return orjson.dumps(value, option=_OPTIONS | orjson.OPT_INDENT_2 if pretty else _OPTIONS)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+else:
+    _compact = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    _pretty = json.JSONEncoder(indent=4, ensure_ascii=False)
+
+    def dumps(value: Any, pretty: bool = False) -> bytes:
+        return (_pretty if pretty else _compact).encode(value).encode("utf-8")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
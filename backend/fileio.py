@@ -0,0 +1,23 @@
+import os
+import tempfile
+from typing import Union
+
+def atomic_write(path: str, payload: Union[str, bytes]):
+    """Write a file so readers see either the old or the new contents, never a mix.
+
+    The payload goes to a temporary file in the same directory, is fsynced, and
+    then renamed over the target. A crash mid-write leaves the old file intact.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    mode = "wb" if isinstance(payload, bytes) else "w"
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
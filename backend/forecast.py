@@ -0,0 +1,122 @@
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from date_utils import ORDERING_PERIODS, get_fiscal_year, get_ordering_period, parse_date
+from logic_billing import calculate_billing_periods
+
+CUBE_FIELDS = ("orderingPeriod", "fiscalYear", "type", "month")
+Cell = Tuple[Optional[str], int, str, str] # (OP id, FY, billing type, "YYYY-MM")
+
+# Billing type -> pricing table key, per deployment type (as Deploys.jsx fills prices in)
+RATE_KEYS = {
+    "Land": {"15-Day CLIN": "land15", "Over & Above": "landOA"},
+    "Ship": {"15-Day CLIN": "ship15", "Daily Rate": "ship1"},
+    "Shore": {"15-Day CLIN": "ship15", "Daily Rate": "ship1"},
+}
+# Deployment field used when the table has no rate for a date or type
+FALLBACK_FIELDS = {"15-Day CLIN": "clinPrice15", "Over & Above": "clinPriceOverAbove", "Daily Rate": "clinPriceSingle"}
+
+CACHE_LIMIT = 65536
+
+def _rate(value: Any) -> float:
+    return float(value or 0)
+
+def _cuts(lo: int, hi: int) -> List[int]:
+    """Ordinals in (lo, hi] where the month, and so possibly FY or ordering period, changes."""
+    cuts = set()
+    for period in ORDERING_PERIODS:
+        cuts.add(parse_date(period["start"]).toordinal())
+        cuts.add(parse_date(period["end"]).toordinal() + 1)
+    first = date.fromordinal(lo)
+    year, month = first.year, first.month
+    while True:
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        ordinal = date(year, month, 1).toordinal()
+        if ordinal > hi:
+            break
+        cuts.add(ordinal)
+    return sorted(c for c in cuts if lo < c <= hi)
+
+class RevenueForecast:
+    """Revenue cube (OP x FY x billing type x month) priced from the ordering-period rate table.
+
+    Each deployment's billing periods are laid out as in
+    generate_billing_items_for_deployment, but every day is priced at the
+    rate of the ordering period it falls in: a 15-day period earns
+    rate / 15 per day, so one that straddles an OP boundary is split pro
+    rata between the two rates. Remainder days earn the daily rate, and
+    Other deployments keep their flat price on their start date.
+
+    Per-deployment cells are cached by the fields that determine them, so a
+    forecast over mostly unchanged (or repeated what-if) deployments only
+    prices the new shapes.
+    """
+
+    def __init__(self, pricing: Dict[str, Dict[str, Any]]):
+        self.pricing = {op_id: {key: _rate(value) for key, value in rates.items()}
+                        for op_id, rates in (pricing or {}).items()}
+        self._cells: Dict[tuple, Tuple[Tuple[Cell, float], ...]] = {}
+
+    def daily_rate(self, op_id: Optional[str], deployment: Dict[str, Any], kind: str) -> float:
+        """Revenue per day of `kind` items; 15-day rates are spread over their 15 days."""
+        key = RATE_KEYS.get(deployment.get('type'), {}).get(kind)
+        rates = self.pricing.get(op_id) if op_id is not None else None
+        rate = rates.get(key, 0.0) if rates and key else 0.0
+        if not rate:
+            rate = _rate(deployment.get(FALLBACK_FIELDS[kind]))
+        return rate / 15 if kind != "Daily Rate" else rate
+
+    def cells(self, d: Dict[str, Any]) -> Tuple[Tuple[Cell, float], ...]:
+        key = (d.get('startDate'), d.get('endDate'), d.get('type'), d.get('price'),
+               *(d.get(field) for field in FALLBACK_FIELDS.values()))
+        cached = self._cells.get(key)
+        if cached is None:
+            if len(self._cells) >= CACHE_LIMIT:
+                self._cells.clear()
+            cached = self._cells[key] = tuple(self._price(d).items())
+        return cached
+
+    def _price(self, d: Dict[str, Any]) -> Dict[Cell, float]:
+        out: Dict[Cell, float] = {}
+        if not d.get('startDate') or not d.get('endDate'):
+            return out
+        start = parse_date(d['startDate'])
+        periods = calculate_billing_periods(d['startDate'], d['endDate'], d.get('type', 'Land'))
+        s = start.toordinal()
+        runs = []
+        if periods['periods15Day'] > 0:
+            runs.append((s, s + 15 * periods['periods15Day'] - 1, "15-Day CLIN"))
+            if d.get('type') == 'Land':
+                runs.append((s, s + 15 * periods['periods15Day'] - 1, "Over & Above"))
+        if d.get('type') in ('Ship', 'Shore') and periods['remainderDays'] > 0:
+            first = s + 15 * periods['periods15Day']
+            runs.append((first, first + periods['remainderDays'] - 1, "Daily Rate"))
+
+        if d.get('type') == 'Other':
+            runs.append((s, s, "Other"))
+
+        for lo, hi, kind in runs:
+            edges = [lo] + _cuts(lo, hi) + [hi + 1]
+            for a, b in zip(edges, edges[1:]):
+                day = date.fromordinal(a).isoformat()
+                period = get_ordering_period(day)
+                op_id = period["id"] if period else None
+                if kind == "Other":
+                    amount = _rate(d.get('price')) # flat, on the start date
+                else:
+                    amount = (b - a) * self.daily_rate(op_id, d, kind)
+                if amount > 0:
+                    cell = (op_id, get_fiscal_year(day), kind, day[:7])
+                    out[cell] = out.get(cell, 0.0) + amount
+        return out
+
+    def cube(self, deployments: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows of {orderingPeriod, fiscalYear, type, month, amount}, sorted by those fields."""
+        totals: Dict[Cell, float] = {}
+        for d in deployments:
+            for cell, amount in self.cells(d):
+                totals[cell] = totals.get(cell, 0.0) + amount
+        return [
+            {**dict(zip(CUBE_FIELDS, cell)), "amount": amount}
+            for cell, amount in sorted(totals.items(), key=lambda kv: (kv[0][0] or "", kv[0][1:]))
+        ]
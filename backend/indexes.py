@@ -0,0 +1,109 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+# Secondary indexes kept on list collections, beyond the primary id index.
+SECONDARY_INDEXES = {
+    "scheduleItems": ("deploymentId",),
+    "resourceAssignments": ("scheduleItemId", "resourceId"),
+    "scheduleDependencies": ("predecessorId", "successorId"),
+}
+
+class IndexedCollection:
+    """Hash index over a list of records keyed by "id".
+
+    The records stay in the plain list the store serializes; this class keeps
+    an id -> position map and optional secondary indexes (field value -> ids)
+    alongside it, so lookups no longer scan the list. All mutations must go
+    through the collection to keep the indexes in sync.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], indexes: Iterable[str] = ()):
+        self.records = records
+        self.fields = tuple(indexes)
+        self._pos: Dict[str, int] = {}
+        # field -> value -> ids (dict used as an ordered set)
+        self._secondary: Dict[str, Dict[Any, Dict[str, None]]] = {f: {} for f in self.fields}
+        for i, record in enumerate(records):
+            self._register(i, record)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._pos
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        pos = self._pos.get(record_id)
+        return self.records[pos] if pos is not None else None
+
+    def ids_by(self, field: str, value: Any) -> List[str]:
+        """Ids of the records whose `field` equals `value`, in list order."""
+        return sorted(self._secondary[field].get(value, ()), key=self._pos.__getitem__)
+
+    def by(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Records whose `field` equals `value`, in list order."""
+        return [self.get(i) for i in self.ids_by(field, value)]
+
+    def first(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """The earliest record in the list whose `field` equals `value`, as a scan would find it."""
+        ids = self._secondary[field].get(value)
+        return self.get(min(ids, key=self._pos.__getitem__)) if ids else None
+
+    # --- Mutations ---
+
+    def upsert(self, record: Dict[str, Any]):
+        pos = self._pos.get(record["id"])
+        if pos is None:
+            self.records.append(record)
+            self._register(len(self.records) - 1, record)
+        else:
+            self._unregister(self.records[pos])
+            self.records[pos] = record
+            self._register(pos, record)
+
+    def update(self, record_id: str, fields: Dict[str, Any]) -> bool:
+        record = self.get(record_id)
+        if record is None:
+            return False
+        pos = self._pos[record_id]
+        self._unregister(record)
+        record.update(fields)
+        self._register(pos, record)
+        return True
+
+    def delete(self, record_id: str) -> bool:
+        if record_id not in self._pos:
+            return False
+        # Loop in case the file holds duplicate ids; the old list filter removed them all.
+        while record_id in self._pos:
+            pos = self._pos[record_id]
+            self._unregister(self.records[pos])
+            del self.records[pos]
+            for i in range(pos, len(self.records)):
+                other = self.records[i]["id"]
+                if self._pos.get(other) == i + 1:
+                    self._pos[other] = i
+                elif other == record_id and record_id not in self._pos:
+                    self._pos[record_id] = i
+        return True
+
+    # --- Index maintenance ---
+
+    def _register(self, pos: int, record: Dict[str, Any]):
+        record_id = record["id"]
+        if record_id in self._pos and self._pos[record_id] < pos:
+            return  # duplicate id; the first occurrence wins, as with next() scans
+        self._pos[record_id] = pos
+        for field in self.fields:
+            value = record.get(field)
+            if value is not None:
+                self._secondary[field].setdefault(value, {})[record_id] = None
+
+    def _unregister(self, record: Dict[str, Any]):
+        record_id = record["id"]
+        self._pos.pop(record_id, None)
+        for field in self.fields:
+            ids = self._secondary[field].get(record.get(field))
+            if ids is not None:
+                ids.pop(record_id, None)
+                if not ids:
+                    del self._secondary[field][record.get(field)]
@@ -0,0 +1,234 @@
+import random
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from date_utils import parse_date
+
+Span = Tuple[int, int]  # inclusive (start, end) date ordinals
+
+def date_ordinal(value: Optional[str]) -> Optional[int]:
+    """Ordinal of an ISO date or datetime string (date part only); None if unparseable."""
+    if not value:
+        return None
+    try:
+        return parse_date(value[:10]).toordinal()
+    except ValueError:
+        return None
+
+def span_of(start: Optional[str], end: Optional[str]) -> Optional[Span]:
+    """Inclusive ordinal span of two date strings; an open end collapses to the start."""
+    lo = date_ordinal(start)
+    if lo is None:
+        return None
+    hi = date_ordinal(end)
+    return (lo, hi if hi is not None and hi >= lo else lo)
+
+class _Node:
+    __slots__ = ("start", "end", "key", "order", "priority", "left", "right", "max_end")
+
+    def __init__(self, start: int, end: int, key: Hashable):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.order = (start, end, repr(key)) # total order, ties broken by key
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.max_end = end
+
+    def fix(self):
+        m = self.end
+        if self.left is not None and self.left.max_end > m:
+            m = self.left.max_end
+        if self.right is not None and self.right.max_end > m:
+            m = self.right.max_end
+        self.max_end = m
+
+class IntervalIndex:
+    """Dynamic interval tree over inclusive integer spans (date ordinals).
+
+    A treap ordered by start and augmented with each subtree's maximum end,
+    so add/remove are O(log n) expected and overlap queries are O(log n + k).
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._spans: Dict[Hashable, Span] = {}
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._spans
+
+    def span(self, key: Hashable) -> Optional[Span]:
+        return self._spans.get(key)
+
+    def add(self, key: Hashable, start: int, end: int):
+        """Insert or move `key` to the span [start, end]."""
+        if key in self._spans:
+            if self._spans[key] == (start, end):
+                return
+            self.remove(key)
+        self._spans[key] = (start, end)
+        self._root = self._insert(self._root, _Node(start, end, key))
+
+    def remove(self, key: Hashable) -> bool:
+        span = self._spans.pop(key, None)
+        if span is None:
+            return False
+        self._root = self._delete(self._root, (span[0], span[1], repr(key)))
+        return True
+
+    def clear(self):
+        self._root = None
+        self._spans.clear()
+
+    def build(self, entries: Iterable[Tuple[Hashable, int, int]]):
+        """Replace the contents with (key, start, end) entries in O(n log n)."""
+        nodes = sorted((_Node(start, end, key) for key, start, end in entries), key=lambda n: n.order)
+        self._spans = {n.key: (n.start, n.end) for n in nodes}
+
+        def link(lo: int, hi: int) -> Optional[_Node]:
+            if lo >= hi:
+                return None
+            mid = (lo + hi) // 2
+            node = nodes[mid]
+            node.left = link(lo, mid)
+            node.right = link(mid + 1, hi)
+            node.fix()
+            return node
+
+        self._root = link(0, len(nodes))
+        # Hand out random priorities largest-first in breadth-first order so the
+        # balanced tree is also a valid heap for later inserts.
+        priorities = sorted((random.random() for _ in nodes), reverse=True)
+        queue = deque([self._root] if self._root else [])
+        for priority in priorities:
+            node = queue.popleft()
+            node.priority = priority
+            queue.extend(child for child in (node.left, node.right) if child is not None)
+
+    def overlapping(self, lo: int, hi: int) -> List[Hashable]:
+        """Keys whose span intersects [lo, hi], ordered by start."""
+        out: List[Hashable] = []
+        stack: List[_Node] = []
+        node = self._root
+        # Iterative in-order walk that skips subtrees ending before lo and
+        # stops once starts pass hi.
+        while stack or node is not None:
+            while node is not None and node.max_end >= lo:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.start > hi:
+                break
+            if node.end >= lo:
+                out.append(node.key)
+            node = node.right
+        return out
+
+    # --- Treap internals ---
+
+    def _insert(self, root: Optional[_Node], node: _Node) -> _Node:
+        if root is None:
+            return node
+        if node.priority > root.priority:
+            node.left, node.right = self._split(root, node.order)
+            node.fix()
+            return node
+        if node.order < root.order:
+            root.left = self._insert(root.left, node)
+        else:
+            root.right = self._insert(root.right, node)
+        root.fix()
+        return root
+
+    def _split(self, root: Optional[_Node], order) -> Tuple[Optional[_Node], Optional[_Node]]:
+        if root is None:
+            return None, None
+        if root.order < order:
+            left, right = self._split(root.right, order)
+            root.right = left
+            root.fix()
+            return root, right
+        left, right = self._split(root.left, order)
+        root.left = right
+        root.fix()
+        return left, root
+
+    def _merge(self, a: Optional[_Node], b: Optional[_Node]) -> Optional[_Node]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if a.priority > b.priority:
+            a.right = self._merge(a.right, b)
+            a.fix()
+            return a
+        b.left = self._merge(a, b.left)
+        b.fix()
+        return b
+
+    def _delete(self, root: Optional[_Node], order) -> Optional[_Node]:
+        if root is None:
+            return None
+        current = root.order
+        if current == order:
+            return self._merge(root.left, root.right)
+        if order < current:
+            root.left = self._delete(root.left, order)
+        else:
+            root.right = self._delete(root.right, order)
+        root.fix()
+        return root
+
+class CollectionIntervals:
+    """Keeps an IntervalIndex over one store collection in sync with its edits.
+
+    `span_fn` maps a record to its inclusive ordinal span, or None to leave
+    the record out of the index.
+    """
+
+    def __init__(self, store, collection: str, span_fn: Callable[[Dict[str, Any]], Optional[Span]]):
+        self.store = store
+        self.collection = collection
+        self.span_fn = span_fn
+        self.index = IntervalIndex()
+        self._stale = True
+        store.subscribe(self._on_change)
+
+    def overlapping(self, lo: int, hi: int) -> List[Dict[str, Any]]:
+        if self._stale:
+            entries = []
+            for record in self.store.get(self.collection, []):
+                span = self._span(record)
+                if span is not None:
+                    entries.append((record["id"], span[0], span[1]))
+            self.index.build(entries)
+            self._stale = False
+        return [self.store.find(self.collection, key) for key in self.index.overlapping(lo, hi)]
+
+    def _span(self, record: Dict[str, Any]) -> Optional[Span]:
+        try:
+            return self.span_fn(record)
+        except (KeyError, TypeError, ValueError):
+            return None # malformed dates: leave the record out of windowed queries
+
+    def _reindex(self, record_id: str):
+        record = self.store.find(self.collection, record_id)
+        span = self._span(record) if record is not None else None
+        if span is None:
+            self.index.remove(record_id)
+        else:
+            self.index.add(record_id, span[0], span[1])
+
+    def _on_change(self, op: Dict[str, Any]):
+        if self._stale:
+            return
+        if op["op"] in ("replace", "set") and op.get("collection") in (None, self.collection):
+            self._stale = True
+        elif op.get("collection") == self.collection:
+            self._reindex(op["record"]["id"] if op["op"] == "upsert" else op["id"])
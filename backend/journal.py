@@ -0,0 +1,85 @@
+import json
+import os
+from typing import Any, Dict, Iterator
+
+import fastjson
+from fileio import atomic_write
+
+class Journal:
+    """Append-only log of store operations, one JSON object per line.
+
+    Each mutation costs one appended line instead of a full rewrite of the data
+    file. The journal is folded into the snapshot by DataStore.compact() and
+    replayed on startup to recover edits made since the last snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    @property
+    def size(self) -> int:
+        if self._file is not None:
+            return self._file.tell()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def append(self, op: Dict[str, Any]):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            if self._file.tell() and not self._ends_with_newline():
+                # Never continue a line left unterminated by a crash
+                self._file.write(b"\n")
+        self._file.write(fastjson.dumps(op) + b"\n")
+        self._file.flush()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield the logged operations in order.
+
+        A crash mid-append leaves a partial last line; it is cut off the file
+        so later appends start clean. An unreadable line followed by further
+        entries is corruption and raises ValueError.
+        """
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        torn = None
+        with open(self.path, "rb") as f:
+            for raw in f:
+                line = raw.strip()
+                if line:
+                    if torn is not None:
+                        raise ValueError(f"Corrupt journal entry at byte {torn} of {self.path}")
+                    try:
+                        op = fastjson.loads(line)
+                    except json.JSONDecodeError:
+                        torn = offset
+                    else:
+                        yield op
+                offset += len(raw)
+        if torn is not None:
+            self.close()
+            os.truncate(self.path, torn)
+
+    def discard_prefix(self, offset: int):
+        """Drop the first `offset` bytes, keeping operations appended after them."""
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            tail = f.read()
+        atomic_write(self.path, tail)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def journal_path_for(data_path: str) -> str:
+    base, _ = os.path.splitext(data_path)
+    return base + ".journal"
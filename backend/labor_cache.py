@@ -0,0 +1,171 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+from date_utils import month_key
+from logic_labor import generate_assignment_entries, generate_daily_plan_entries, generate_overhead_entries
+
+RecordKey = Tuple[str, str] # (collection, id)
+Week = Tuple[int, int]      # (ISO year, ISO week)
+Cell = Tuple[str, str]      # ("YYYY-MM", categoryId)
+
+SOURCES = ("deployments", "overhead", "resourceAssignments")
+
+class MonthlyLaborCache:
+    """Incrementally maintained result of aggregate_monthly_hours for the whole store.
+
+    Each deployment, overhead segment and resource assignment keeps its own
+    contribution, split by ISO week into eligible and non-eligible hours per
+    (month, category). A store edit marks only the records it affects as
+    dirty: the record itself, assignments dated by an edited deployment or
+    schedule item or belonging to an edited resource, and records
+    referencing an edited labor category. The
+    next read recomputes those records, re-applies weekly overtime to the
+    weeks they touch (old and new) and re-sums the months those weeks fall in.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._contributions: Dict[RecordKey, Dict[Week, Dict[Cell, List[float]]]] = {}
+        self._week_records: Dict[Week, Set[RecordKey]] = defaultdict(set)
+        self._week_totals: Dict[Week, Dict[Cell, float]] = {}
+        self._month_weeks: Dict[str, Set[Week]] = defaultdict(set)
+        self._months: Dict[str, Dict[str, float]] = {}
+        # categoryId -> records whose plan references it
+        self._category_users: Dict[str, Set[RecordKey]] = defaultdict(set)
+        self._dirty: Set[RecordKey] = set()
+        self._stale = True
+        store.subscribe(self._on_change)
+
+    def monthly(self) -> Dict[str, Dict[str, float]]:
+        if self._stale:
+            self._reset()
+        if self._dirty:
+            self._refresh()
+        return {month: dict(self._months[month]) for month in sorted(self._months)}
+
+    # --- Maintenance ---
+
+    def _reset(self):
+        self._contributions.clear()
+        self._week_records.clear()
+        self._week_totals.clear()
+        self._month_weeks.clear()
+        self._months.clear()
+        self._category_users.clear()
+        self._dirty = {(collection, r["id"]) for collection in SOURCES for r in self.store.get(collection, [])}
+        self._stale = False
+
+    def _entries(self, key: RecordKey):
+        collection, record_id = key
+        record = self.store.find(collection, record_id)
+        if record is None:
+            return []
+        if collection == "deployments":
+            return generate_daily_plan_entries([record])
+        if collection == "overhead":
+            return generate_overhead_entries([record])
+        item_id = record["scheduleItemId"]
+        deployment = self.store.find("deployments", item_id)
+        if deployment is None and item_id.startswith("dep_"):
+            deployment = self.store.find("deployments", item_id[4:])
+        item = self.store.find("scheduleItems", item_id)
+        resource = self.store.find("resources", record["resourceId"])
+        return generate_assignment_entries([record], [deployment] if deployment else [], [item] if item else [],
+                                           resources=[resource] if resource else [])
+
+    def _contribution(self, key: RecordKey) -> Dict[Week, Dict[Cell, List[float]]]:
+        weeks: Dict[Week, Dict[Cell, List[float]]] = {}
+        try:
+            for entry in self._entries(key):
+                week = entry['date'].isocalendar()[:2]
+                cell = (month_key(entry['date']), entry['categoryId'])
+                hours = weeks.setdefault(week, {}).setdefault(cell, [0.0, 0.0])
+                hours[1 if entry['isOvertimeEligible'] else 0] += entry['hours']
+        except (KeyError, TypeError, ValueError):
+            return {} # malformed record: contributes nothing until it is fixed
+        return weeks
+
+    def _refresh(self):
+        weeks: Set[Week] = set()
+        for key in self._dirty:
+            old = self._contributions.pop(key, {})
+            for week in old:
+                self._week_records[week].discard(key)
+            for cell in {c for cells in old.values() for c in cells}:
+                self._category_users[cell[1]].discard(key)
+
+            new = self._contribution(key)
+            if new:
+                self._contributions[key] = new
+            for week in new:
+                self._week_records[week].add(key)
+            for cell in {c for cells in new.values() for c in cells}:
+                self._category_users[cell[1]].add(key)
+            weeks.update(old)
+            weeks.update(new)
+        self._dirty.clear()
+
+        months: Set[str] = set()
+        for week in weeks:
+            for month, _ in self._week_totals.pop(week, {}):
+                self._month_weeks[month].discard(week)
+                months.add(month)
+            totals = self._combine_week(week)
+            if totals:
+                self._week_totals[week] = totals
+            for month, _ in totals:
+                self._month_weeks[month].add(week)
+                months.add(month)
+
+        for month in months:
+            cats: Dict[str, float] = defaultdict(float)
+            for week in sorted(self._month_weeks[month]):
+                for (m, cat_id), hours in self._week_totals[week].items():
+                    if m == month:
+                        cats[cat_id] += hours
+            if cats:
+                self._months[month] = dict(cats)
+            else:
+                self._months.pop(month, None)
+                self._month_weeks.pop(month, None)
+
+    def _combine_week(self, week: Week) -> Dict[Cell, float]:
+        """Hours per (month, category) for one ISO week, with the overtime premium applied."""
+        records = sorted(self._week_records.get(week, ()))
+        if not records:
+            self._week_records.pop(week, None)
+            return {}
+        cells: Dict[Cell, List[float]] = defaultdict(lambda: [0.0, 0.0])
+        for key in records:
+            for cell, (regular, eligible) in self._contributions[key][week].items():
+                cells[cell][0] += regular
+                cells[cell][1] += eligible
+        eligible_hours = sum(eligible for _, eligible in cells.values())
+        extra = max(0, eligible_hours - 40) * 0.5
+        factor = 1 + extra / eligible_hours if eligible_hours > 0 else 1
+        return {cell: regular + eligible * factor for cell, (regular, eligible) in cells.items()}
+
+    def _on_change(self, op: Dict[str, Any]):
+        if self._stale:
+            return
+        collection = op.get("collection")
+        if op["op"] == "replace" or (op["op"] == "set" and collection in SOURCES + ("scheduleItems", "resources", "laborCategories")):
+            self._stale = True
+            return
+        if op["op"] not in ("upsert", "update", "delete"):
+            return
+        record_id = op["record"]["id"] if op["op"] == "upsert" else op["id"]
+        if collection in SOURCES:
+            self._dirty.add((collection, record_id))
+        if collection in ("deployments", "scheduleItems"):
+            # Assignments take their dates from the item or deployment they point at
+            assignments = self.store.index("resourceAssignments")
+            item_ids = (record_id, f"dep_{record_id}") if collection == "deployments" else (record_id,)
+            for item_id in item_ids:
+                self._dirty.update(("resourceAssignments", a["id"]) for a in assignments.by("scheduleItemId", item_id))
+        elif collection == "resources":
+            # ...and their working days and capacity from the resource
+            self._dirty.update(("resourceAssignments", a_id) for a_id in
+                               self.store.index("resourceAssignments").ids_by("resourceId", record_id))
+        elif collection == "laborCategories":
+            self._dirty.update(self._category_users.get(record_id, ()))
@@ -0,0 +1,267 @@
+"""Vectorized monthly labor aggregation.
+
+Same inputs and output as logic_labor.aggregate_monthly_hours, but instead of
+one dict per segment per day the plan is held as arrays of segments (start
+ordinal, day count, category, hours/day, OT flag) that are expanded to days,
+reduced per ISO week for overtime and binned into months with NumPy.
+
+Entries are summed in the same order as the generator pipeline (week by week,
+stream order within a week), so the result is identical, not just close.
+NumPy is optional; callers check available() first.
+"""
+from typing import Any, Dict, List
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover - exercised only without numpy
+    np = None
+
+from logic_labor import ItemDateIndex, assignment_hours, parse_date
+
+UNIX_EPOCH_ORDINAL = 719163 # date(1970, 1, 1).toordinal()
+
+def available() -> bool:
+    return np is not None
+
+class _Segments:
+    """Column buffers for segments, plus each segment's place in the entry stream.
+
+    Entry i of a segment sits at stream position base + i * stride; the
+    'during' segments of a deployment interleave day by day, like the
+    generator yields them.
+    """
+
+    def __init__(self):
+        self.start: List[int] = []
+        self.days: List[int] = []
+        self.category: List[int] = []
+        self.hours: List[float] = []
+        self.eligible: List[bool] = []
+        self.base: List[int] = []
+        self.stride: List[int] = []
+        self.categories: List[Any] = []
+        self._category_index: Dict[Any, int] = {}
+        self.position = 0
+
+    def add(self, start: int, days: int, category_id: Any, hours: float, eligible: bool, base: int, stride: int = 1):
+        index = self._category_index.get(category_id)
+        if index is None:
+            index = self._category_index[category_id] = len(self.categories)
+            self.categories.append(category_id)
+        self.start.append(start)
+        self.days.append(days)
+        self.category.append(index)
+        self.hours.append(hours)
+        self.eligible.append(bool(eligible))
+        self.base.append(base)
+        self.stride.append(stride)
+
+    def add_run(self, start: int, days: int, category_id: Any, hours: float, eligible: bool):
+        self.add(start, days, category_id, hours, eligible, self.position)
+        self.position += days
+
+def collect_segments(deployments: List[Dict], overhead: List[Dict], assignments: List[Dict],
+                     schedule_items: List[Dict], resources: List[Dict] = []) -> _Segments:
+    segs = _Segments()
+
+    for d in deployments:
+        plan = d.get('laborPlan', {})
+        if not plan: continue
+        start_date = parse_date(d['startDate'])
+        if not d.get('endDate'): continue
+        end_date = parse_date(d['endDate'])
+        start = start_date.toordinal()
+        end = end_date.toordinal()
+
+        during = plan.get('during', [])
+        days_during = end - start + 1
+        if during and days_during > 0:
+            for j, seg in enumerate(during):
+                segs.add(start, days_during, seg['categoryId'], float(seg['hours']),
+                         seg.get('isOvertimeEligible', False), segs.position + j, len(during))
+            segs.position += days_during * len(during)
+
+        for seg in plan.get('pre', []):
+            duration = int(seg.get('duration', 0) or 0)
+            offset = int(seg.get('offset', 0) or 0)
+            if duration > 0:
+                segs.add_run(start - offset - duration, duration, seg['categoryId'], float(seg['hours']),
+                             seg.get('isOvertimeEligible', False))
+
+        for seg in plan.get('post', []):
+            duration = int(seg.get('duration', 0) or 0)
+            offset = int(seg.get('offset', 0) or 0)
+            if duration > 0:
+                segs.add_run(end + offset, duration, seg['categoryId'], float(seg['hours']),
+                             seg.get('isOvertimeEligible', False))
+
+    for seg in overhead:
+        start = parse_date(seg['startDate']).toordinal()
+        days = parse_date(seg['endDate']).toordinal() - start + 1
+        if days <= 0: continue
+        segs.add_run(start, days, seg['categoryId'], float(seg['hours']), False)
+
+    index = ItemDateIndex(deployments, schedule_items, resources)
+    for a in assignments:
+        start, end = index.dates(a['scheduleItemId'])
+        if not start or not end: continue
+
+        # Runs of consecutive days at the same hours, in the generator's day order
+        run_start = run_days = 0
+        run_hours = None
+        hours_by_day = assignment_hours(a, start.toordinal(), end.toordinal(), index.resource(a['resourceId']))
+        for day, hours in hours_by_day.items():
+            if day == run_start + run_days and hours == run_hours:
+                run_days += 1
+                continue
+            if run_days:
+                segs.add_run(run_start, run_days, a['resourceId'], run_hours, False)
+            run_start, run_days, run_hours = day, 1, hours
+        if run_days:
+            segs.add_run(run_start, run_days, a['resourceId'], run_hours, False)
+
+    return segs
+
+def aggregate_monthly_hours(deployments: List[Dict], overhead: List[Dict], categories: List[Dict],
+                            assignments: List[Dict] = [], schedule_items: List[Dict] = [],
+                            resources: List[Dict] = []) -> Dict[str, Dict[str, float]]:
+    segs = collect_segments(deployments, overhead, assignments, schedule_items, resources)
+    if not segs.days:
+        return {}
+
+    days = np.array(segs.days, dtype=np.int64)
+    total = int(days.sum())
+    if total == 0:
+        return {}
+
+    # Expand segments to one row per entry, then put the rows in stream order
+    # (positions are a permutation of range(total)).
+    seg_idx = np.repeat(np.arange(len(days)), days)
+    first_row = np.cumsum(days) - days
+    step = np.arange(total, dtype=np.int64) - np.repeat(first_row, days)
+    position = np.array(segs.base, dtype=np.int64)[seg_idx] + step * np.array(segs.stride, dtype=np.int64)[seg_idx]
+    stream = np.empty(total, dtype=np.int64)
+    stream[position] = np.arange(total, dtype=np.int64)
+    seg_idx = seg_idx[stream]
+    day = np.array(segs.start, dtype=np.int64)[seg_idx] + step[stream]
+
+    # Ordinal 1 is a Monday, so (ordinal - 1) // 7 numbers ISO weeks in order.
+    # A stable sort by week keeps stream order within each week.
+    week = (day - 1) // 7
+    week -= week.min()
+    n_weeks = int(week.max()) + 1
+    order = np.argsort(week.astype(np.int16) if n_weeks < 2 ** 15 else week, kind='stable')
+    seg_idx = seg_idx[order]
+    day = day[order]
+    week = week[order]
+
+    hours = np.array(segs.hours, dtype=np.float64)[seg_idx]
+    eligible = np.array(segs.eligible, dtype=bool)[seg_idx]
+    category = np.array(segs.category, dtype=np.int64)[seg_idx]
+
+    # Weekly overtime premium, spread pro rata over the week's eligible entries
+    eligible_hours = np.bincount(week[eligible], weights=hours[eligible], minlength=n_weeks)
+    extra = np.maximum(eligible_hours - 40, 0) * 0.5
+    premium = eligible & (eligible_hours[week] > 0)
+    pw = week[premium]
+    hours[premium] = hours[premium] + extra[pw] * (hours[premium] / eligible_hours[pw])
+
+    # Bin into (month, category); months come from a per-day lookup table
+    first_day = int(day.min())
+    calendar = np.arange(first_day, int(day.max()) + 1, dtype=np.int64) - UNIX_EPOCH_ORDINAL
+    month_of_day = calendar.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    first_month = int(month_of_day[0])
+    n_categories = len(segs.categories)
+    key = (month_of_day[day - first_day] - first_month) * n_categories + category
+    n_keys = (int(month_of_day[-1]) - first_month + 1) * n_categories
+    sums = np.bincount(key, weights=hours, minlength=n_keys)
+    # Output dicts keep first-appearance order, like the defaultdicts they replace
+    first_seen = np.full(n_keys, total, dtype=np.int64)
+    np.minimum.at(first_seen, key, np.arange(total, dtype=np.int64))
+
+    present = np.flatnonzero(first_seen < total)
+    present = present[np.argsort(first_seen[present])]
+    labels = np.datetime_as_string((present // n_categories + first_month).astype('datetime64[M]'))
+    months: Dict[str, Dict[str, float]] = {}
+    for k, label in zip(present.tolist(), labels.tolist()):
+        months.setdefault(label, {})[segs.categories[k % n_categories]] = float(sums[k])
+    return months
+
+class LaborTimeline:
+    """Daily hours per category over a date horizon, built from difference arrays.
+
+    Each segment adds +hours at its first day and -hours the day after its
+    last, so building costs O(segments) and a cumulative sum yields the daily
+    series. Memory is (days in horizon x categories), independent of how many
+    segments overlap. Eligible and non-eligible hours are kept apart for the
+    weekly overtime premium, and a segment count per day records which
+    (category, month) pairs have entries at all.
+    """
+
+    def __init__(self, segs: _Segments):
+        self.categories = segs.categories
+        starts = np.array(segs.start, dtype=np.int64)
+        days = np.array(segs.days, dtype=np.int64)
+        keep = days > 0
+        starts, days = starts[keep], days[keep]
+        self.first_day = int(starts.min()) if len(starts) else 0
+        self.n_days = int((starts + days).max()) - self.first_day if len(starts) else 0
+
+        n_categories = len(self.categories)
+        channel = np.array(segs.category, dtype=np.int64)[keep] * 2 + np.array(segs.eligible, dtype=np.int64)[keep]
+        hours = np.array(segs.hours, dtype=np.float64)[keep]
+        lo = starts - self.first_day
+        hi = lo + days
+
+        diff = np.zeros((2 * n_categories, self.n_days + 1))
+        np.add.at(diff, (channel, lo), hours)
+        np.add.at(diff, (channel, hi), -hours)
+        active = np.zeros((2 * n_categories, self.n_days + 1), dtype=np.int32)
+        np.add.at(active, (channel, lo), 1)
+        np.add.at(active, (channel, hi), -1)
+
+        self.active = np.cumsum(active[:, :-1], axis=1, out=active[:, :-1]).reshape(n_categories, 2, self.n_days)
+        hours_by_day = np.cumsum(diff[:, :-1], axis=1, out=diff[:, :-1]).reshape(n_categories, 2, self.n_days)
+        # Cumulative sums drift by rounding; days with no live segment are exactly zero.
+        hours_by_day[self.active == 0] = 0.0
+        self.hours = hours_by_day
+
+    @classmethod
+    def build(cls, deployments: List[Dict], overhead: List[Dict], assignments: List[Dict] = [],
+              schedule_items: List[Dict] = [], resources: List[Dict] = []) -> "LaborTimeline":
+        return cls(collect_segments(deployments, overhead, assignments, schedule_items, resources))
+
+    def weekly_premium_factor(self):
+        """Per-day multiplier for eligible hours: 1 + 0.5 * OT / eligible hours of its ISO week."""
+        ordinals = np.arange(self.first_day, self.first_day + self.n_days, dtype=np.int64)
+        week = (ordinals - 1) // 7
+        week -= week[0]
+        eligible_hours = np.bincount(week, weights=self.hours[:, 1, :].sum(axis=0))
+        extra = np.maximum(eligible_hours - 40, 0) * 0.5
+        factor = np.zeros_like(eligible_hours)
+        np.divide(extra, eligible_hours, out=factor, where=eligible_hours > 0)
+        return 1.0 + factor[week]
+
+    def monthly_hours(self) -> Dict[str, Dict[str, float]]:
+        if self.n_days == 0:
+            return {}
+        daily = self.hours[:, 0, :] + self.hours[:, 1, :] * self.weekly_premium_factor()
+        ordinals = np.arange(self.first_day, self.first_day + self.n_days, dtype=np.int64)
+        month = (ordinals - UNIX_EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]')
+        month_starts = np.flatnonzero(np.r_[True, month[1:] != month[:-1]])
+        totals = np.add.reduceat(daily, month_starts, axis=1)
+        present = np.add.reduceat(self.active.sum(axis=1), month_starts, axis=1) > 0
+
+        labels = np.datetime_as_string(month[month_starts]).tolist()
+        months: Dict[str, Dict[str, float]] = {}
+        for m, label in enumerate(labels):
+            cats = np.flatnonzero(present[:, m])
+            if len(cats):
+                months[label] = {self.categories[c]: float(totals[c, m]) for c in cats.tolist()}
+        return months
+
+def aggregate_monthly_hours_timeline(deployments: List[Dict], overhead: List[Dict], categories: List[Dict],
+                                     assignments: List[Dict] = [], schedule_items: List[Dict] = [],
+                                     resources: List[Dict] = []) -> Dict[str, Dict[str, float]]:
+    """aggregate_monthly_hours via LaborTimeline; equal up to floating-point rounding."""
+    return LaborTimeline.build(deployments, overhead, assignments, schedule_items, resources).monthly_hours()
@@ -1,10 +1,11 @@
-from datetime import datetime, date, timedelta
-from typing import Dict, Any, List
+from datetime import date, timedelta
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from date_utils import parse_date
+from work_calendar import WorkCalendar
 
-def parse_date(d: str) -> date:
-    return datetime.strptime(d, "%Y-%m-%d").date()
-
-def calculate_billing_periods(start_date: str, end_date: str, deploy_type: str) -> Dict[str, int]:
+def calculate_billing_periods(start_date: str, end_date: str, deploy_type: str, calendar: Optional[WorkCalendar] = None) -> Dict[str, int]:
+    # Periods run on calendar days; with a working calendar the result also
+    # counts the working days in the range (an O(1) lookup).
     start = parse_date(start_date)
     end = parse_date(end_date)
     
@@ -23,13 +24,16 @@ def calculate_billing_periods(start_date: str, end_date: str, deploy_type: str)
     # Ship has 'Single Day CLIN' - likely the remainder.
     
     # We return the calculated time units.
-    return {
+    result = {
         "periods15Day": periods_15,
         "remainderDays": remainder,
         "totalDays": total_days
     }
+    if calendar is not None:
+        result["workingDays"] = calendar.count(start.toordinal(), end.toordinal())
+    return result
 
-def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, Any]]:
+def iter_billing_items_for_deployment(d: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
     # Extract rates
     rate_15 = float(d.get('clinPrice15', 0) or 0)
     rate_daily = float(d.get('clinPriceSingle', 0) or 0)
@@ -38,7 +42,7 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
     start = parse_date(d['startDate'])
     end_date = d.get('endDate')
     if not end_date: 
-        return [] # ongoing?
+        return # ongoing?
         
     end = parse_date(end_date)
     
@@ -47,8 +51,6 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
     period_count = periods['periods15Day']
     remainder = periods['remainderDays']
     
-    items = []
-    
     current_date = start
     
     # Generate 15-day items
@@ -56,7 +58,7 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
         period_end = current_date + timedelta(days=14)
         
         # 1. Standard 15-Day CLIN
-        items.append({
+        yield {
             "id": f"{d['id']}_15_{i}",
             "deploymentId": d['id'],
             "deploymentName": d['name'],
@@ -64,11 +66,11 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
             "startDate": current_date.isoformat(),
             "endDate": period_end.isoformat(),
             "amount": rate_15
-        })
+        }
 
         # 2. Over & Above for Land (parallel to 15-day CLIN)
         if d.get('type') == 'Land' and rate_oa > 0:
-            items.append({
+            yield {
                 "id": f"{d['id']}_oa_15_{i}",
                 "deploymentId": d['id'],
                 "deploymentName": d['name'],
@@ -77,7 +79,7 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
                 "endDate": period_end.isoformat(),
                 "amount": rate_oa, # User confirmed this is PER 15-day period (assuming 150 was typo for 15)
                 "description": f"Over & Above (Period {i+1})"
-            })
+            }
 
         current_date = period_end + timedelta(days=1)
         
@@ -89,7 +91,7 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
         # User requested separate lines for each 1day CLIN
         for i in range(remainder):
             day_date = current_date + timedelta(days=i)
-            items.append({
+            yield {
                 "id": f"{d['id']}_daily_{day_date.strftime('%Y%m%d')}",
                 "deploymentId": d['id'],
                 "deploymentName": d['name'],
@@ -98,7 +100,7 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
                 "endDate": day_date.isoformat(),
                 "amount": rate_daily,
                 "description": f"Day {i+1} of remainder"
-            })
+            }
             
     # Note: Land remainder O&A is not needed because Land is forced to 15-day increments in UI.
     # But if data exists with remainder, we can leave it or ignore it. 
@@ -109,7 +111,7 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
     if d.get('type') == 'Other':
         price = float(d.get('price', 0) or 0)
         if price > 0:
-            items.append({
+            yield {
                 "id": f"{d['id']}_other",
                 "deploymentId": d['id'],
                 "deploymentName": d['name'],
@@ -118,9 +120,10 @@ def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, A
                 "endDate": end_date, # Use full duration
                 "amount": price,
                 "description": "Flat rate event"
-            })
+            }
 
-    return items
+def generate_billing_items_for_deployment(d: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(iter_billing_items_for_deployment(d))
 
 def generate_all_billing_items(deployments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     all_items = []
@@ -128,3 +131,24 @@ def generate_all_billing_items(deployments: List[Dict[str, Any]]) -> List[Dict[s
         all_items.extend(generate_billing_items_for_deployment(d))
     return all_items
 
+
+def billing_item_matches(item: Dict[str, Any], types: Optional[Iterable[str]] = None,
+                         start: Optional[date] = None, end: Optional[date] = None) -> bool:
+    """True if `item` has one of `types` and overlaps [start, end]; None means no limit."""
+    if types is not None and item["type"] not in types:
+        return False
+    if start is not None and parse_date(item["endDate"]) < start:
+        return False
+    if end is not None and parse_date(item["startDate"]) > end:
+        return False
+    return True
+
+def iter_billing_items(deployments: Iterable[Dict[str, Any]], types: Optional[Iterable[str]] = None,
+                       start: Optional[date] = None, end: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    """Billing items of `deployments` one at a time, optionally limited to
+    the given item types and to items overlapping [start, end]."""
+    types = set(types) if types else None
+    for d in deployments:
+        for item in iter_billing_items_for_deployment(d):
+            if billing_item_matches(item, types, start, end):
+                yield item
@@ -1,10 +1,15 @@
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Generator
+from datetime import date, timedelta
+from typing import List, Dict, Any, Generator, NamedTuple, Optional, Tuple
 from collections import defaultdict
-import math
+import os
+from date_utils import month_key, parse_date
+from work_calendar import WorkCalendar, calendar_from_spec
 
-def parse_date(d: str) -> date:
-    return datetime.strptime(d, "%Y-%m-%d").date()
+# "python" runs the generator pipeline below; "numpy" the vectorized engine in
+# labor_engine.py; "auto" picks numpy when it is installed. Output is identical.
+# "timeline" (numpy) sums difference arrays instead of per-day entries: memory
+# scales with days x categories, results agree up to floating-point rounding.
+LABOR_ENGINE = os.environ.get("LABOR_ENGINE", "auto")
 
 def generate_daily_plan_entries(deployments: List[Dict]) -> Generator[Dict, None, None]:
     for d in deployments:
@@ -67,6 +72,42 @@ def generate_daily_plan_entries(deployments: List[Dict]) -> Generator[Dict, None
                         'isOvertimeEligible': seg.get('isOvertimeEligible', False)
                     }
 
+def deployment_labor_span(d: Dict) -> Optional[Tuple[date, date]]:
+    # First and last day generate_daily_plan_entries books hours for a deployment,
+    # or None if its plan books none. Used to index deployments by labor window.
+    plan = d.get('laborPlan', {})
+    if not plan or not d.get('endDate'): return None
+    start_date = parse_date(d['startDate'])
+    end_date = parse_date(d['endDate'])
+
+    spans = []
+    if plan.get('during') and end_date >= start_date:
+        spans.append((start_date, end_date))
+    for seg in plan.get('pre', []):
+        duration = int(seg.get('duration', 0) or 0)
+        offset = int(seg.get('offset', 0) or 0)
+        if duration > 0:
+            pre_end = start_date - timedelta(days=offset)
+            spans.append((pre_end - timedelta(days=duration), pre_end - timedelta(days=1)))
+    for seg in plan.get('post', []):
+        duration = int(seg.get('duration', 0) or 0)
+        offset = int(seg.get('offset', 0) or 0)
+        if duration > 0:
+            post_start = end_date + timedelta(days=offset)
+            spans.append((post_start, post_start + timedelta(days=duration - 1)))
+
+    if not spans: return None
+    return min(s for s, _ in spans), max(e for _, e in spans)
+
+def custom_allocation_span(a: Dict) -> Optional[Tuple[date, date]]:
+    # First and last day a custom spread books hours on. perDayAllocations
+    # carry their own dates, which may fall outside the item's span, so
+    # windowed queries index these assignments by them.
+    if (a.get('spread') or 'uniform') != 'custom' or not a.get('perDayAllocations'):
+        return None
+    days = [parse_date(day) for day in a['perDayAllocations']]
+    return min(days), max(days)
+
 def calculate_weekly_plan_stats(entries: Generator[Dict, None, None]) -> List[Dict]:
     weeks = defaultdict(list)
     for entry in entries:
@@ -101,105 +142,171 @@ def calculate_weekly_plan_stats(entries: Generator[Dict, None, None]) -> List[Di
         })
     return results
 
-def generate_assignment_entries(assignments: List[Dict], deployments: List[Dict], schedule_items: List[Dict] = []) -> Generator[Dict, None, None]:
-    # Need to look up item dates. 
-    # If item is deployment-backed, find deployment. 
-    # If local, find schedule item.
-    # Note: caller must pass deployments and schedule_items.
-    # We'll update the signature of aggregate_monthly_hours to receive them.
-    
-    # helper to find dates
-    def get_dates(item_id):
-        # 1 schema: deployments
-        d = next((x for x in deployments if x['id'] == item_id or f"dep_{x['id']}" == item_id), None)
-        if d: return parse_date(d['startDate']), parse_date(d['endDate'])
-        
-        # 2 schema: local items
-        # We need schedule_items passed in.
-        # For now, let's assume assignments might have dates or we fetch them?
-        # The assignment links to scheduleItemId.
-        if schedule_items:
-            s = next((x for x in schedule_items if x['id'] == item_id), None)
-            if s and s.get('startAt') and s.get('endAt'):
-                 return parse_date(s['startAt']), parse_date(s['endAt'])
-        
-        return None, None
-
-    for a in assignments:
-        start, end = get_dates(a['scheduleItemId'])
-        if not start or not end: continue
-        
+def generate_overhead_entries(overhead_segments: List[Dict]) -> Generator[Dict, None, None]:
+    for seg in overhead_segments:
+        start = parse_date(seg['startDate'])
+        end = parse_date(seg['endDate'])
         days = (end - start).days + 1
         if days <= 0: continue
         
-        allocation = float(a.get('allocationValue', 0))
-        mode = a.get('allocationMode', 'hours')
-        
-        # Calculate daily hours
-        daily_hours = 0
-        if mode == 'hours':
-            # Total hours spread over days? Or hours PER DAY?
-            # Requirement: "allocation_value (numeric) // e.g., 16 hours total, 0.5 FTE"
-            # It says "16 hours total". So spread it.
-            # BUT, usually people say "Allocated 50%" = 4 hours/day.
-            # Let's assume 'hours' = TOTAL HOURS for the duration.
-            # 'fte' = Fraction of day (e.g. 1.0 = 8 hours).
-            # 'percent' = Percent of day (e.g. 50 = 4 hours).
-            daily_hours = allocation / days
-        elif mode == 'fte':
-            daily_hours = allocation * 8.0 # Assuming 8h day
-        elif mode == 'percent':
-            daily_hours = (allocation / 100.0) * 8.0
-            
         for i in range(days):
             curr = start + timedelta(days=i)
-            # Skip weekends? Resource calendar?
-            # For MVP, simple spread. logic_labor.py doesn't seem to skip weekends in `generate_daily_plan_entries`
-            # except implicitly if days_during counts all days.
-            # Let's stick to simple spread for now.
-            
             yield {
                 'date': curr,
-                'categoryId': a['resourceId'], # Using resourceId as categoryId for aggregation if they line up? 
-                # Wait, charts group by "category". 
-                # If resourceId is a person "Matt", but chart expects "Senior Engineer".
-                # We need to map Resource -> Role/Category?
-                # The existing charts use `laborCategories` (id: lc_1).
-                # New resources have `type`.
-                # If we want it to show up, we might need to map it or just use the resource name as a new category.
-                # Let's yield the resourceId and assume the frontend handles dynamic keys or we look up resource name.
-                'hours': daily_hours,
-                'isOvertimeEligible': False # Look up resource?
+                'categoryId': seg['categoryId'],
+                'hours': float(seg['hours']),
+                'isOvertimeEligible': False
             }
 
-def aggregate_monthly_hours(deployments: List[Dict], overhead: List[Dict], categories: List[Dict], assignments: List[Dict] = [], schedule_items: List[Dict] = []) -> Dict[str, Dict[str, float]]:
+class ResourceProfile(NamedTuple):
+    capacity: float        # hours per working day
+    calendar: WorkCalendar # working days and per-day capacity
+
+DEFAULT_RESOURCE = ResourceProfile(8.0, calendar_from_spec(None, 8.0))
+
+class ItemDateIndex:
+    """Resolves an assignment's scheduleItemId to its dates, and its resource to a profile.
+
+    Built once per aggregation from the same lists the linear lookups used:
+    deployments match on their id or f"dep_{id}" (first match wins), then
+    local schedule items on their id. Dates are parsed on first use and kept.
+
+    Capacity comes from Resource.defaultCapacityHoursPerDay and working days
+    from Resource.calendar (see work_calendar).
+    """
+
+    def __init__(self, deployments: List[Dict], schedule_items: List[Dict] = [], resources: List[Dict] = []):
+        self._deployments: Dict[str, Dict] = {}
+        for d in deployments:
+            self._deployments.setdefault(d['id'], d)
+            self._deployments.setdefault(f"dep_{d['id']}", d)
+        self._items: Dict[str, Dict] = {}
+        for s in schedule_items or []:
+            self._items.setdefault(s['id'], s)
+        self._resources: Dict[str, Dict] = {}
+        for r in resources or []:
+            self._resources.setdefault(r['id'], r)
+        self._dates: Dict[str, Tuple[Optional[date], Optional[date]]] = {}
+        self._profiles: Dict[str, ResourceProfile] = {}
+
+    def dates(self, item_id: str) -> Tuple[Optional[date], Optional[date]]:
+        if item_id not in self._dates:
+            self._dates[item_id] = self._resolve(item_id)
+        return self._dates[item_id]
+
+    def _resolve(self, item_id: str) -> Tuple[Optional[date], Optional[date]]:
+        d = self._deployments.get(item_id)
+        if d: return parse_date(d['startDate']), parse_date(d['endDate'])
+        s = self._items.get(item_id)
+        if s and s.get('startAt') and s.get('endAt'):
+            return parse_date(s['startAt']), parse_date(s['endAt'])
+        return None, None
+
+    def resource(self, resource_id: str) -> ResourceProfile:
+        profile = self._profiles.get(resource_id)
+        if profile is None:
+            profile = self._profiles[resource_id] = resource_profile(self._resources.get(resource_id))
+        return profile
+
+def resource_profile(resource: Optional[Dict]) -> ResourceProfile:
+    if not resource:
+        return DEFAULT_RESOURCE
+    capacity = resource.get('defaultCapacityHoursPerDay')
+    capacity = float(capacity) if capacity is not None else DEFAULT_RESOURCE.capacity
+    return ResourceProfile(capacity, calendar_from_spec(resource.get('calendar'), capacity))
+
+def assignment_hours(assignment: Dict[str, Any], start: int, end: int, profile: ResourceProfile, shift: int = 0) -> Dict[int, float]:
+    """Hours per day (ordinal -> hours, ascending) of an assignment on an item running start..end, moved `shift` days.
+
+    Hours land on the resource's working days, shaped by the spread:
+    uniform; front_loaded / back_loaded, weights falling / rising linearly
+    and scaled to the uniform total; or custom perDayAllocations
+    ({"YYYY-MM-DD": hours}) taken as given. allocationMode "hours" is the
+    total, "fte" a fraction of each day's capacity and "percent" a
+    percentage of it. With no working days in the range the hours fall on
+    the calendar days instead of disappearing.
+    """
+    start += shift
+    end += shift
+    if end < start:
+        return {}
+    spread = assignment.get('spread') or 'uniform'
+    if spread == 'custom':
+        hours_by_day: Dict[int, float] = defaultdict(float)
+        for day, hours in (assignment.get('perDayAllocations') or {}).items():
+            hours_by_day[parse_date(day).toordinal() + shift] += float(hours)
+        return dict(sorted(hours_by_day.items()))
+
+    calendar = profile.calendar
+    days = calendar.days(start, end)
+    fallback = not days
+    if fallback:
+        days = list(range(start, end + 1))
+    allocation = float(assignment.get('allocationValue', 0) or 0)
+    mode = assignment.get('allocationMode', 'hours')
+    if mode in ('fte', 'percent'):
+        fraction = allocation if mode == 'fte' else allocation / 100.0
+        if calendar.every_day or fallback:
+            daily = [fraction * profile.capacity] * len(days)
+        else:
+            daily = [fraction * calendar.hours_on(day) for day in days]
+    else:
+        # Unknown modes book zero hours, as they always have
+        daily = [allocation / len(days) if mode == 'hours' else 0.0] * len(days)
+
+    if spread in ('front_loaded', 'back_loaded'):
+        n = len(days)
+        weights = range(n, 0, -1) if spread == 'front_loaded' else range(1, n + 1)
+        scale = sum(daily) / (n * (n + 1) / 2)
+        return {day: weight * scale for day, weight in zip(days, weights)}
+    return dict(zip(days, daily))
+
+def generate_assignment_entries(assignments: List[Dict], deployments: List[Dict], schedule_items: List[Dict] = [], index: Optional[ItemDateIndex] = None, resources: List[Dict] = []) -> Generator[Dict, None, None]:
+    # Item dates come from the deployment (matched on id or dep_<id>) or the
+    # local schedule item the assignment points at; see ItemDateIndex. Hours
+    # follow the resource's calendar and the assignment's spread, see
+    # assignment_hours; an unknown resource works every day, 8 hours.
+    if index is None:
+        index = ItemDateIndex(deployments, schedule_items, resources)
+    get_dates = index.dates
+
+    for a in assignments:
+        start, end = get_dates(a['scheduleItemId'])
+        if not start or not end: continue
+
+        hours_by_day = assignment_hours(a, start.toordinal(), end.toordinal(), index.resource(a['resourceId']))
+        for day, hours in hours_by_day.items():
+            yield {
+                'date': date.fromordinal(day),
+                # Resources show up in the charts as their own category
+                'categoryId': a['resourceId'],
+                'hours': hours,
+                'isOvertimeEligible': False
+            }
+
+def aggregate_monthly_hours(deployments: List[Dict], overhead: List[Dict], categories: List[Dict], assignments: List[Dict] = [], schedule_items: List[Dict] = [], engine: Optional[str] = None, resources: List[Dict] = []) -> Dict[str, Dict[str, float]]:
+    engine = engine or LABOR_ENGINE
+    if engine not in ("auto", "python", "numpy", "timeline"):
+        raise ValueError(f"Unknown labor engine: {engine}")
+    if engine != "python":
+        import labor_engine
+        if labor_engine.available():
+            aggregate = labor_engine.aggregate_monthly_hours_timeline if engine == "timeline" else labor_engine.aggregate_monthly_hours
+            return aggregate(deployments, overhead, categories, assignments, schedule_items, resources)
+        if engine != "auto":
+            raise RuntimeError(f"The {engine} labor engine needs numpy installed")
+
     # Generate daily stream from plans (Deployments)
     deployment_stream = generate_daily_plan_entries(deployments)
     
     # Generate daily stream from overhead
-    def generate_overhead_entries(overhead_segments: List[Dict]) -> Generator[Dict, None, None]:
-        for seg in overhead_segments:
-            start = parse_date(seg['startDate'])
-            end = parse_date(seg['endDate'])
-            days = (end - start).days + 1
-            if days <= 0: continue
-            
-            for i in range(days):
-                curr = start + timedelta(days=i)
-                yield {
-                    'date': curr,
-                    'categoryId': seg['categoryId'],
-                    'hours': float(seg['hours']),
-                    'isOvertimeEligible': False
-                }
-
     import itertools
     overhead_stream = generate_overhead_entries(overhead)
     
     # Scheduler stream
     # Note: We need schedule_items to resolve dates for local items. 
     # main.py needs to pass this.
-    assignment_stream = generate_assignment_entries(assignments, deployments, schedule_items)
+    assignment_stream = generate_assignment_entries(assignments, deployments, schedule_items, resources=resources)
     
     all_stream = itertools.chain(deployment_stream, overhead_stream, assignment_stream)
     
@@ -213,7 +320,6 @@ def aggregate_monthly_hours(deployments: List[Dict], overhead: List[Dict], categ
         extra_equivalent_hours = week['overtimeHours'] * 0.5
         
         for entry in week['entries']:
-            month_key = entry['date'].strftime("%Y-%m")
             cat_id = entry['categoryId']
             hours = entry['hours']
             
@@ -222,7 +328,7 @@ def aggregate_monthly_hours(deployments: List[Dict], overhead: List[Dict], categ
                 share = entry['hours'] / week['eligibleHours']
                 hours += extra_equivalent_hours * share
             
-            months[month_key][cat_id] += hours
+            months[month_key(entry['date'])][cat_id] += hours
             
     return {k: dict(v) for k, v in months.items()}
 
@@ -1,15 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import base64
 import json
 import os
-import shutil
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from itertools import islice
+import fastjson
 from models import AppData, LaborCategory
 from date_utils import get_fiscal_year, get_ordering_period
+from store import DataStore, delta_ops, open_storage
+from schedule_assembler import ScheduleAssembler
+from interval_index import CollectionIntervals, date_ordinal, span_of
+from logic_labor import DEFAULT_RESOURCE, custom_allocation_span, deployment_labor_span
+from labor_cache import MonthlyLaborCache
+from billing_cache import BillingItems
+from critical_path import CriticalPath, DependencyCycleError
+from resource_load import ResourceLoad
+from work_calendar import calendar_from_spec
+from timeline import MAX_BARS, ZOOMS, build_timeline
 
-app = FastAPI()
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by fastjson (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return fastjson.dumps(content)
+
+app = FastAPI(default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,10 +36,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Revision", "ETag"],
 )
 
 DATA_FILE = "data.json"
 BACKUP_DIR = "backups"
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+
+def read_config() -> Dict[str, Any]:
+    if not os.path.exists(CONFIG_FILE):
+        return {}
+    with open(CONFIG_FILE, "r") as f:
+        return json.load(f)
+
+# Organization working calendar (same shape as Resource.calendar), if configured
+WORKING_CALENDAR = read_config().get("workingCalendar")
+business_calendar = calendar_from_spec(WORKING_CALENDAR) if WORKING_CALENDAR else None
 
 if not os.path.exists(BACKUP_DIR):
     os.makedirs(BACKUP_DIR)
@@ -53,46 +84,147 @@ INITIAL_DATA = {
     "timelineViews": []
 }
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return INITIAL_DATA
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+def labor_span(d):
+    span = deployment_labor_span(d)
+    return (span[0].toordinal(), span[1].toordinal()) if span else None
+
+def allocation_span(a):
+    span = custom_allocation_span(a)
+    return (span[0].toordinal(), span[1].toordinal()) if span else None
+
+def use_store(new_store: DataStore):
+    """Point the API, and every view derived from the store, at `new_store`."""
+    global store, assembler, critical_path, resource_load, labor_cache, billing, deployment_windows, labor_windows, overhead_windows, item_windows, allocation_windows
+    store = new_store
+    assembler = ScheduleAssembler(store)
+    critical_path = CriticalPath(store, assembler)
+    resource_load = ResourceLoad(store, critical_path)
+    labor_cache = MonthlyLaborCache(store)
+    billing = BillingItems(store)
+    # Date-window indexes backing ?from=&to= queries
+    deployment_windows = CollectionIntervals(store, "deployments", lambda d: span_of(d.get("startDate"), d.get("endDate")))
+    labor_windows = CollectionIntervals(store, "deployments", labor_span)
+    overhead_windows = CollectionIntervals(store, "overhead", lambda o: span_of(o.get("startDate"), o.get("endDate")))
+    item_windows = CollectionIntervals(store, "scheduleItems", lambda i: span_of(i.get("startAt"), i.get("endAt")))
+    allocation_windows = CollectionIntervals(store, "resourceAssignments", allocation_span)
+    derived_cache.clear()
+
+# Derived payloads memoized for the current data revision: name -> value
+derived_cache: Dict[str, Any] = {}
+
+# Authoritative in-memory copy of the data. With the default JSON storage edits
+# go to data.journal and are folded back into data.json by the store's
+# compactor; config.json can select SQLite instead ("storageBackend").
+use_store(DataStore(DATA_FILE, INITIAL_DATA, storage=open_storage(read_config(), DATA_FILE)))
+
+@app.on_event("startup")
+async def load_store():
+    store.load()
+
+@app.on_event("shutdown")
+async def flush_store():
+    await store.flush()
+    store.close()
+
+def not_modified(request: Request, response: Response) -> Optional[Response]:
+    # Everything served from the store is a function of the data revision, so
+    # the revision doubles as the ETag. Returns a 304 if the client is current.
+    etag = f'"{store.revision}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Revision": str(store.revision)}
+    client_tags = [t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")]
+    if etag in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def cached_by_revision(name: str, compute):
+    # Entries from older revisions can never hit again, so drop them all at once
+    if derived_cache.get("revision") != store.revision:
+        derived_cache.clear()
+        derived_cache["revision"] = store.revision
+    if name not in derived_cache:
+        derived_cache[name] = compute()
+    return derived_cache[name]
+
+def cached_json(request: Request, response: Response, name: str, compute) -> Response:
+    """not_modified, else compute() encoded once per revision and served as-is.
+
+    Returning the bytes in a Response skips FastAPI's jsonable_encoder pass
+    over the payload as well as the encoding itself.
+    """
+    unchanged = not_modified(request, response)
+    if unchanged is not None:
+        return unchanged
+    body = cached_by_revision(f"json:{name}", lambda: fastjson.dumps(compute()))
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+def window_bounds(start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+    # Inclusive ordinal bounds for ?from=&to=; an omitted side is unbounded
+    lo = date_ordinal(start) if start else 1
+    hi = date_ordinal(end) if end else date.max.toordinal()
+    if lo is None or hi is None:
+        raise HTTPException(status_code=400, detail="from/to must be ISO dates (YYYY-MM-DD)")
+    return lo, hi
 
 @app.get("/api/data")
-async def get_data():
-    return load_data()
+async def get_data(request: Request, response: Response):
+    return cached_json(request, response, "data", lambda: store.data)
+
+@app.get("/api/changes")
+async def get_changes(since: int):
+    # Records modified after revision `since`, in the same shape PATCH /api/data accepts.
+    # full=True means the client is too far behind and should reload /api/data.
+    changes = store.changes_since(since)
+    if changes is None:
+        return {"revision": store.revision, "full": True}
+    return {"revision": store.revision, "full": False, **changes}
 
 @app.post("/api/data")
 async def update_data(data: Dict[str, Any]):
     # In a real app we'd update specific resources, but for migration compatibility
     # we allow full state update or partial sync
-    current_data = load_data()
-    # Simple merge for now, or just overwrite if client is source of truth
-    # Assuming client pushes strict updates? 
     # Let's just overwrite for now to mimic simple localStorage behavior
-    save_data(data)
-    save_data(data)
-    return {"status": "success"}
+    store.replace(data)
+    return {"status": "success", "revision": store.revision}
+
+class DataDelta(BaseModel):
+    revision: int
+    upserts: Dict[str, Any] = {}
+    deletes: Dict[str, List[str]] = {}
+    replace: Dict[str, Any] = {}
+
+@app.patch("/api/data")
+async def patch_data(delta: DataDelta):
+    # Per-collection delta sync: the client sends only what changed since the
+    # revision it last saw. If any touched record changed after that revision
+    # the whole patch is rejected so the client can reload and retry.
+    try:
+        ops = delta_ops(store.data, delta.upserts, delta.deletes, delta.replace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    conflicts = store.conflicts(ops, delta.revision)
+    if conflicts:
+        return JSONResponse(status_code=409, content={
+            "status": "conflict",
+            "revision": store.revision,
+            "conflicts": conflicts,
+        })
+    if ops:
+        store.apply_batch(ops)
+    return {"status": "success", "revision": store.revision}
 
 @app.post("/api/backup")
 async def backup_data():
-    if not os.path.exists(DATA_FILE):
-        return {"status": "error", "message": "No data file to backup"}
-    
+    # Make sure the file on disk reflects the in-memory state before copying it
+    await store.flush()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"data_{timestamp}.json"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
-    
     try:
-        shutil.copy2(DATA_FILE, backup_path)
-        return {"status": "success", "file": backup_filename}
+        backup_filename = store.storage.backup(BACKUP_DIR, f"data_{timestamp}")
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    if backup_filename is None:
+        return {"status": "error", "message": "No data file to backup"}
+    return {"status": "success", "file": backup_filename}
 
 @app.get("/api/calculate-date-info")
 async def calculate_date_info(date: str):
@@ -100,6 +232,21 @@ async def calculate_date_info(date: str):
     period = get_ordering_period(date)
     return {"fiscalYear": fy, "orderingPeriod": period}
 
+class DateInfoBatchRequest(BaseModel):
+    dates: List[str]
+
+@app.post("/api/calculate-date-info/batch")
+async def calculate_date_info_batch(req: DateInfoBatchRequest):
+    # One result per input, in order; table rows share dates, so each distinct
+    # date is computed once. A bad date fails its own row, not the batch.
+    results = {}
+    for value in dict.fromkeys(req.dates):
+        try:
+            results[value] = {"date": value, "fiscalYear": get_fiscal_year(value), "orderingPeriod": get_ordering_period(value)}
+        except ValueError:
+            results[value] = {"date": value, "error": "Invalid date"}
+    return [results[value] for value in req.dates]
+
 from logic_billing import calculate_billing_periods
 # from logic_labor import calculate_weekly_overtime # Deprecated
 
@@ -110,7 +257,21 @@ class BillingRequest(BaseModel):
 
 @app.post("/api/calculations/billing-periods")
 async def api_billing_periods(req: BillingRequest):
-    return calculate_billing_periods(req.startDate, req.endDate, req.type)
+    return calculate_billing_periods(req.startDate, req.endDate, req.type, business_calendar)
+
+class BillingBatchRequest(BaseModel):
+    ranges: List[BillingRequest]
+
+@app.post("/api/calculations/billing-periods/batch")
+async def api_billing_periods_batch(req: BillingBatchRequest):
+    results = {}
+    keys = [(r.startDate, r.endDate, r.type) for r in req.ranges]
+    for key in dict.fromkeys(keys):
+        try:
+            results[key] = calculate_billing_periods(*key, business_calendar)
+        except ValueError:
+            results[key] = {"error": "Invalid date range"}
+    return [results[key] for key in keys]
 
 # Overtime endpoint deprecated in favor of internal plan aggregation
 # class OvertimeRequest(BaseModel):
@@ -121,190 +282,423 @@ async def api_billing_periods(req: BillingRequest):
 # async def api_overtime(req: OvertimeRequest):
 #     return calculate_weekly_overtime(req.entries, req.categories)
 
-from logic_billing import generate_all_billing_items
+BILLING_PAGE_MAX = 1000
+
+def encode_cursor(item: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps([item["deploymentId"], item["id"]]).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        deployment_id, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(deployment_id), str(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+
+def items_after(items: Iterator[Dict[str, Any]], deployment_id: str, item_id: str) -> Iterator[Dict[str, Any]]:
+    # Skip the cursor's deployment up to and including the cursor item. If that
+    # item no longer exists (the deployment was shortened), skip the rest of it.
+    passed = False
+    for item in items:
+        if not passed:
+            if item["deploymentId"] == deployment_id:
+                passed = item["id"] == item_id
+                continue
+            passed = True
+        yield item
+
+def billing_item_stream(start: Optional[str] = None, end: Optional[str] = None, deployment_id: Optional[str] = None,
+                        types: Optional[List[str]] = None, cursor: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily generated billing items matching the filters, resuming after `cursor`.
+
+    Arguments are validated here, before any item is produced, so errors
+    surface as HTTP errors rather than mid-stream. Items come in deployment
+    list order, or deployment start order when a date window is given.
+    """
+    lo, hi = window_bounds(start, end)
+    if deployment_id is not None:
+        d = store.find("deployments", deployment_id)
+        deployments = [d] if d else []
+    elif start or end:
+        # Billing items fall inside their deployment's dates, so only overlapping deployments are expanded
+        deployments = deployment_windows.overlapping(lo, hi)
+    else:
+        deployments = list(store.get("deployments", [])) # the list may change while a stream is in flight
+    resume = decode_cursor(cursor) if cursor else None
+    if resume:
+        position = next((i for i, d in enumerate(deployments) if d["id"] == resume[0]), None)
+        if position is None:
+            raise HTTPException(status_code=400, detail="Cursor no longer valid; restart from the first page")
+        deployments = deployments[position:]
+    items = billing.iter_items(deployments, types, date.fromordinal(lo) if start else None,
+                               date.fromordinal(hi) if end else None)
+    return items_after(items, *resume) if resume else items
+
+async def ndjson_lines(items: Iterator[Dict[str, Any]], chunk: int = 200):
+    # Generated on the event loop, between sends, so no store edit runs mid-item
+    lines = []
+    for item in items:
+        lines.append(fastjson.dumps(item))
+        if len(lines) == chunk:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
 
 @app.get("/api/billing-items")
-async def get_billing_items():
-    data = load_data()
-    items = generate_all_billing_items(data.get("deployments", []))
-    return items
+async def get_billing_items(request: Request, response: Response,
+                            from_: Optional[str] = Query(None, alias="from"), to: Optional[str] = None,
+                            deploymentId: Optional[str] = None, type_: Optional[List[str]] = Query(None, alias="type"),
+                            limit: Optional[int] = Query(None, ge=1, le=BILLING_PAGE_MAX), cursor: Optional[str] = None,
+                            format: Optional[str] = None):
+    """Billing items, optionally filtered by deploymentId, type (repeatable) and from/to.
+
+    Plain requests return a JSON array. With limit and/or cursor the result
+    is a page, {"items": [...], "nextCursor": str | None}. format=ndjson (or
+    Accept: application/x-ndjson) streams one item per line instead.
+    """
+    if format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", ""):
+        items = billing_item_stream(from_, to, deploymentId, type_, cursor)
+        return StreamingResponse(ndjson_lines(islice(items, limit) if limit else items),
+                                 media_type="application/x-ndjson", headers={"X-Revision": str(store.revision)})
+    if limit or cursor:
+        limit = limit or BILLING_PAGE_MAX
+        items = billing_item_stream(from_, to, deploymentId, type_, cursor) # validates; generates nothing yet
+        unchanged = not_modified(request, response)
+        if unchanged is not None:
+            return unchanged
+        page = list(islice(items, limit + 1))
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return {"items": page[:limit], "nextCursor": next_cursor}
+    if not (from_ or to or deploymentId or type_):
+        return cached_json(request, response, "billing-items", billing.all_items)
+    key = f"billing-items:{from_}:{to}:{deploymentId}:{type_}"
+    return cached_json(request, response, key, lambda: list(billing_item_stream(from_, to, deploymentId, type_)))
+
+@app.get("/api/billing-items/summary")
+async def get_billing_summary(request: Request, response: Response):
+    # deploymentId -> {"count", "total"} of its billing items
+    return cached_json(request, response, "billing-summary", billing.summary)
+
+from billing_totals import GROUP_FIELDS, billing_totals
+
+@app.get("/api/billing-totals")
+async def get_billing_totals(request: Request, response: Response, groupBy: str = ",".join(GROUP_FIELDS)):
+    """Billing item counts and amounts grouped by any of deploymentId, type,
+    fiscalYear and orderingPeriod (comma-separated), computed without
+    expanding line items."""
+    group_by = tuple(field for field in groupBy.split(",") if field)
+    if set(group_by) - set(GROUP_FIELDS):
+        raise HTTPException(status_code=400, detail=f"groupBy must be a subset of {','.join(GROUP_FIELDS)}")
+    return cached_json(request, response, f"billing-totals:{groupBy}",
+                       lambda: billing_totals(store.get("deployments", []), group_by))
+
+from forecast import RevenueForecast
+
+# Revenue forecaster for the current pricing table; its per-deployment cache
+# survives edits to deployments and is dropped when the pricing changes.
+forecasters: Dict[str, RevenueForecast] = {}
+
+def forecaster(pricing: Optional[Dict[str, Any]]) -> RevenueForecast:
+    key = json.dumps(pricing or {}, sort_keys=True)
+    if key not in forecasters:
+        forecasters.clear()
+        forecasters[key] = RevenueForecast(pricing or {})
+    return forecasters[key]
+
+class ForecastRequest(BaseModel):
+    deployments: List[Dict[str, Any]] = []
+    pricing: Optional[Dict[str, Dict[str, Any]]] = None # defaults to the stored table
+    includeExisting: bool = True
+
+@app.get("/api/forecast/revenue")
+async def get_revenue_forecast(request: Request, response: Response):
+    return cached_json(request, response, "revenue-forecast", lambda: forecaster(
+        store.get("pricing")).cube(store.get("deployments", [])))
+
+@app.post("/api/forecast/revenue")
+async def what_if_revenue_forecast(req: ForecastRequest):
+    """Revenue cube for what-if deployments, optionally on top of the stored ones and under other pricing."""
+    deployments = (store.get("deployments", []) if req.includeExisting else []) + req.deployments
+    try:
+        return forecaster(req.pricing if req.pricing is not None else store.get("pricing")).cube(deployments)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid deployment or pricing: {e}")
 
 from logic_labor import aggregate_monthly_hours
 
-@app.get("/api/stats/monthly-labor")
-async def get_monthly_labor():
-    data = load_data()
-    return aggregate_monthly_hours(
-        data.get("deployments", []), 
-        data.get("overhead", []), 
-        data.get("laborCategories", []),
-        data.get("resourceAssignments", []), # NEW: Pass assignments
-        data.get("scheduleItems", []) # NEW: Pass items for date lookup
+def monthly_labor_in_window(start: Optional[str], end: Optional[str]):
+    lo, hi = window_bounds(start, end)
+    # Widen to whole months (the unit of output), then whole ISO weeks (the unit
+    # of overtime), so every month in range sees every record that feeds it.
+    if start:
+        first = date.fromordinal(lo).replace(day=1)
+        lo = first.toordinal() - first.weekday()
+    if end:
+        last = date.fromordinal(hi)
+        last = (last.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        hi = last.toordinal() + 6 - last.weekday()
+
+    deployments = {d["id"]: d for d in labor_windows.overlapping(lo, hi)}
+    # Assignments are dated by their schedule item or deployment
+    dated = deployment_windows.overlapping(lo, hi)
+    deployments.update((d["id"], d) for d in dated)
+    item_ids = {i["id"] for i in item_windows.overlapping(lo, hi)}
+    item_ids.update(d["id"] for d in dated)
+    item_ids.update(f"dep_{d['id']}" for d in dated)
+    assignments_index = store.index("resourceAssignments")
+    assignments = {a["id"]: a for item_id in item_ids for a in assignments_index.by("scheduleItemId", item_id)}
+    # Custom spreads book hours on their own dates, whatever the item's span;
+    # their item must still resolve, so bring in its deployment too
+    for a in allocation_windows.overlapping(lo, hi):
+        assignments[a["id"]] = a
+        item_id = a["scheduleItemId"]
+        d = store.find("deployments", item_id) or (item_id.startswith("dep_") and store.find("deployments", item_id[4:]))
+        if d:
+            deployments.setdefault(d["id"], d)
+
+    months = aggregate_monthly_hours(
+        list(deployments.values()),
+        overhead_windows.overlapping(lo, hi),
+        store.get("laborCategories", []),
+        list(assignments.values()),
+        store.get("scheduleItems", []),
+        resources=store.get("resources", []),
     )
+    first_month = start[:7] if start else ""
+    last_month = end[:7] if end else "9999-12"
+    return {k: v for k, v in months.items() if first_month <= k <= last_month}
+
+@app.get("/api/stats/monthly-labor")
+async def get_monthly_labor(request: Request, response: Response,
+                            from_: Optional[str] = Query(None, alias="from"), to: Optional[str] = None):
+    if from_ or to:
+        return cached_json(request, response, f"monthly-labor:{from_}:{to}", lambda: monthly_labor_in_window(from_, to))
+    # Per-record contributions are cached; an edit only recombines the weeks it touches
+    return cached_json(request, response, "monthly-labor", labor_cache.monthly)
 
 
 # --- Scheduler Endpoints ---
 
 @app.get("/api/scheduler/items")
-async def get_scheduler_items():
-    data = load_data()
-    # Merge deployments + local items? 
-    # For v1, the frontend will request deployments separately or we merge here.
-    # Let's keep distinct API for flexibility, but maybe the frontend wants one list.
-    # The requirement says "Server-side ScheduleAssembler that merges".
-    
-    deployments = data.get("deployments", [])
-    local_items = data.get("scheduleItems", [])
-    
-    # Convert deployments to schedule items structure on the fly
-    merged = []
-    for d in deployments:
-        # Check if we have a local override or metadata
-        # Find local item with deploymentId == d.id
-        local = next((i for i in local_items if i.get('deploymentId') == d['id']), None)
-        
-        if local:
-            # Merge: deployment is source of truth for dates/title
-            # But local might have metadata, sortOrder, parentId
-            item = local.copy()
-            item['title'] = d['name']
-            item['startAt'] = d['startDate']
-            item['endAt'] = d['endDate'] # Using endDate as endAt
-            item['type'] = 'deployment'
-            merged.append(item)
-        else:
-            # Create transient item
-            item = {
-                "id": f"dep_{d['id']}", # transient ID
-                "deploymentId": d['id'],
-                "type": 'deployment',
-                "title": d['name'],
-                "startAt": d['startDate'],
-                "endAt": d['endDate'],
-                "percentComplete": 0,
-                "parentId": None, 
-                "sortOrder": 0,
-                "metadata": { "status": "Synced" } # Default
-            }
-            merged.append(item)
-            
-    # Add purely local items (that aren't linked to deployments)
-    for i in local_items:
-        if not i.get('deploymentId'):
-            merged.append(i)
-            
-    return merged
+async def get_scheduler_items(startWindow: Optional[str] = None, endWindow: Optional[str] = None,
+                              swimlaneKey: Optional[str] = None, viewId: Optional[str] = None,
+                              from_: Optional[str] = Query(None, alias="from"), to: Optional[str] = None):
+    # Deployments merged with local items, kept materialized by the ScheduleAssembler.
+    # Optional window/filter narrow the result, e.g. to what the Gantt shows;
+    # viewId applies a saved TimelineView's startWindow/endWindow/filter.
+    _, startWindow, endWindow, filters = timeline_query(viewId, startWindow or from_, endWindow or to, swimlaneKey)
+    window_bounds(startWindow, endWindow) # validate before querying
+    return assembler.items(startWindow, endWindow, filters)
+
+def timeline_query(viewId: Optional[str], startWindow: Optional[str], endWindow: Optional[str],
+                   swimlaneKey: Optional[str]) -> Tuple[Dict[str, Any], Optional[str], Optional[str], Dict[str, Any]]:
+    # A saved TimelineView's window and filter, under any explicit parameters
+    view: Dict[str, Any] = {}
+    if viewId:
+        view = store.find("timelineViews", viewId)
+        if view is None:
+            raise HTTPException(status_code=404, detail=f"Timeline view '{viewId}' not found")
+    filters = dict(view.get("filter") or {})
+    if swimlaneKey:
+        filters["swimlaneKey"] = swimlaneKey
+    return view, startWindow or view.get("startWindow"), endWindow or view.get("endWindow"), filters
+
+@app.get("/api/scheduler/timeline")
+async def get_timeline(request: Request, response: Response, viewId: Optional[str] = None,
+                       startWindow: Optional[str] = None, endWindow: Optional[str] = None,
+                       from_: Optional[str] = Query(None, alias="from"), to: Optional[str] = None,
+                       zoom: Optional[str] = None, grouping: Optional[str] = None,
+                       laneOrder: Optional[List[str]] = Query(None), swimlaneKey: Optional[str] = None,
+                       density: Optional[bool] = None, maxBars: int = Query(MAX_BARS, ge=0)):
+    """Schedule items bucketed for a TimelineView (viewId) or ad-hoc parameters, which override the view's.
+
+    Items are grouped into lanes by `grouping` (default swimlane_key),
+    listed lanes first, and clipped to the window; without one the window
+    spans the matching items. Coarse zooms (month and up), or more than
+    maxBars items, return per-bucket density counts instead of bars.
+    """
+    view, startWindow, endWindow, filters = timeline_query(viewId, startWindow or from_, endWindow or to, swimlaneKey)
+    zoom = zoom or view.get("zoom") or "month"
+    grouping = grouping or view.get("grouping") or "swimlane_key"
+    lanes = laneOrder if laneOrder is not None else view.get("laneOrder") or []
+    lo, hi = window_bounds(startWindow, endWindow)
+    if zoom not in ZOOMS:
+        raise HTTPException(status_code=400, detail=f"zoom must be one of {', '.join(ZOOMS)}")
+
+    def compute():
+        items = assembler.items(startWindow, endWindow, filters)
+        start, end = lo, hi
+        if not (startWindow and endWindow):
+            spans = [span for span in (span_of(i.get("startAt"), i.get("endAt")) for i in items) if span]
+            if not spans:
+                return {"start": None, "end": None, "zoom": zoom, "mode": "bars", "buckets": [], "lanes": []}
+            start = lo if startWindow else min(span[0] for span in spans)
+            end = hi if endWindow else max(span[1] for span in spans)
+        return build_timeline(items, start, end, zoom, grouping, lanes, density, maxBars)
+
+    key = fastjson.dumps([viewId, startWindow, endWindow, zoom, grouping, lanes, filters, density, maxBars]).decode()
+    try:
+        return cached_json(request, response, f"timeline:{key}", compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/scheduler/critical-path")
+async def get_critical_path(request: Request, response: Response, criticalOnly: bool = False):
+    """Early/late start and finish, total and free float (minutes) and the critical path.
+
+    Dependencies are honored with their type (FS/SS/FF/SF) and lag; an item
+    starts no earlier than its planned startAt. Returns 409 if the
+    dependencies form a cycle.
+    """
+    try:
+        return cached_json(request, response, f"critical-path:{criticalOnly}",
+                           lambda: critical_path.network().results(criticalOnly))
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "cycle": e.ids})
 
 @app.post("/api/scheduler/items")
 async def upsert_scheduler_item(item: Dict[str, Any]):
-    data = load_data()
-    items = data.get("scheduleItems", [])
-    
-    # Check if exists
-    idx = next((index for (index, d) in enumerate(items) if d["id"] == item["id"]), None)
-    
-    if idx is not None:
-        items[idx] = item
-    else:
-        items.append(item)
-        
-    data["scheduleItems"] = items
+    store.upsert("scheduleItems", item)
     
     # Sync back to deployment if linked
     if item.get('deploymentId'):
-        deps = data.get("deployments", [])
-        d_idx = next((index for (index, d) in enumerate(deps) if d["id"] == item["deploymentId"]), None)
-        if d_idx is not None:
-            # Update deployment source of truth
-            deps[d_idx]['startDate'] = item['startAt']
-            deps[d_idx]['endDate'] = item['endAt']
-            # Optionally update name if changed
-            deps[d_idx]['name'] = item['title']
+        # Update deployment source of truth
+        # Optionally update name if changed
+        store.update("deployments", item["deploymentId"], {
+            'startDate': item['startAt'],
+            'endDate': item['endAt'],
+            'name': item['title'],
+        })
             
-    save_data(data)
     return {"status": "success", "item": item}
 
 @app.delete("/api/scheduler/items/{item_id}")
 async def delete_scheduler_item(item_id: str):
-    data = load_data()
-    items = data.get("scheduleItems", [])
-    data["scheduleItems"] = [i for i in items if i["id"] != item_id]
-    save_data(data)
+    store.delete("scheduleItems", item_id)
     return {"status": "success"}
 
 @app.get("/api/scheduler/dependencies")
 async def get_scheduler_dependencies():
-    data = load_data()
-    return data.get("scheduleDependencies", [])
+    return store.get("scheduleDependencies", [])
 
 @app.post("/api/scheduler/dependencies")
 async def save_dependency(dep: Dict[str, Any]):
-    data = load_data()
-    deps = data.get("scheduleDependencies", [])
-    # Upsert
-    idx = next((index for (index, d) in enumerate(deps) if d["id"] == dep["id"]), None)
-    if idx is not None:
-        deps[idx] = dep
-    else:
-        deps.append(dep)
-    data["scheduleDependencies"] = deps
-    save_data(data)
+    """Add or replace a dependency.
+
+    Returns 400 if it names unknown items or has a bad type or lag, and 409
+    with the offending item ids if it would create a cycle.
+    """
+    try:
+        critical_path.check_link(dep)
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "cycle": e.ids})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    store.upsert("scheduleDependencies", dep)
     return {"status": "success"}
 
+class DependencyBatch(BaseModel):
+    dependencies: List[Dict[str, Any]]
+
+@app.post("/api/scheduler/dependencies/batch")
+async def save_dependencies(batch: DependencyBatch):
+    """Add or replace many dependencies at once (plan imports), validated together.
+
+    All or nothing: the same 400/409 errors as a single save.
+    """
+    try:
+        critical_path.check_links(batch.dependencies)
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "cycle": e.ids})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if batch.dependencies:
+        store.apply_batch([{"op": "upsert", "collection": "scheduleDependencies", "record": dep}
+                           for dep in batch.dependencies])
+    return {"status": "success", "count": len(batch.dependencies)}
+
 @app.delete("/api/scheduler/dependencies/{dep_id}")
 async def delete_dependency(dep_id: str):
-    data = load_data()
-    deps = data.get("scheduleDependencies", [])
-    data["scheduleDependencies"] = [d for d in deps if d["id"] != dep_id]
-    save_data(data)
+    store.delete("scheduleDependencies", dep_id)
     return {"status": "success"}
 
 # --- Resources ---
 
 @app.get("/api/scheduler/resources")
 async def get_resources():
-    data = load_data()
-    return data.get("resources", [])
+    return store.get("resources", [])
 
 @app.post("/api/scheduler/resources")
 async def upsert_resource(res: Dict[str, Any]):
-    data = load_data()
-    resources = data.get("resources", [])
-    idx = next((index for (index, r) in enumerate(resources) if r["id"] == res["id"]), None)
-    if idx is not None:
-        resources[idx] = res
-    else:
-        resources.append(res)
-    data["resources"] = resources
-    save_data(data)
+    store.upsert("resources", res)
     return {"status": "success"}
 
 @app.get("/api/scheduler/assignments")
 async def get_assignments():
-    data = load_data()
-    return data.get("resourceAssignments", [])
+    return store.get("resourceAssignments", [])
 
 @app.post("/api/scheduler/assignments")
 async def upsert_assignment(assign: Dict[str, Any]):
-    data = load_data()
-    assigns = data.get("resourceAssignments", [])
-    idx = next((index for (index, a) in enumerate(assigns) if a["id"] == assign["id"]), None)
-    if idx is not None:
-        assigns[idx] = assign
-    else:
-        assigns.append(assign)
-    data["resourceAssignments"] = assigns
-    save_data(data)
+    store.upsert("resourceAssignments", assign)
     return {"status": "success"}
 
 @app.delete("/api/scheduler/assignments/{assign_id}")
 async def delete_assignment(assign_id: str):
-    data = load_data()
-    assigns = data.get("resourceAssignments", [])
-    data["resourceAssignments"] = [a for a in assigns if a["id"] != assign_id]
-    save_data(data)
+    store.delete("resourceAssignments", assign_id)
     return {"status": "success"}
 
+def calendar_for(resource_id: Optional[str]):
+    if resource_id:
+        if store.find("resources", resource_id) is None:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        return resource_load.profile(resource_id).calendar
+    return business_calendar or DEFAULT_RESOURCE.calendar
+
+@app.get("/api/scheduler/calendar/working-days")
+async def get_working_days(from_: str = Query(..., alias="from"), to: str = Query(...), resourceId: Optional[str] = None):
+    """Working days and capacity hours in from..to, for a resource or the organization calendar."""
+    lo, hi = window_bounds(from_, to)
+    calendar = calendar_for(resourceId)
+    try:
+        return {"workingDays": calendar.count(lo, hi), "capacityHours": calendar.hours(lo, hi)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/scheduler/calendar/add-working-days")
+async def add_working_days(date_: str = Query(..., alias="date"), days: int = Query(..., ge=-36500, le=36500),
+                           resourceId: Optional[str] = None):
+    """The date `days` working days after `date` (before, if negative)."""
+    start = window_bounds(date_, None)[0]
+    try:
+        return {"date": date.fromordinal(calendar_for(resourceId).add(start, days)).isoformat()}
+    except (OverflowError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/scheduler/resource-load")
+async def get_resource_load(request: Request, response: Response,
+                            from_: Optional[str] = Query(None, alias="from"), to: Optional[str] = None,
+                            resourceId: Optional[List[str]] = Query(None)):
+    """Daily load and capacity per resource over from..to, with over-allocated days.
+
+    Assignments follow their resource's calendar and spread; see resource_load.
+    Without from/to the range covers every loaded day.
+    """
+    start = window_bounds(from_, None)[0] if from_ else None
+    end = window_bounds(None, to)[1] if to else None
+    key = f"resource-load:{from_}:{to}:{','.join(resourceId or [])}"
+    try:
+        return cached_json(request, response, key, lambda: resource_load.report(start, end, resourceId))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/scheduler/resource-load/leveling")
+async def get_resource_leveling(resourceId: Optional[List[str]] = Query(None)):
+    """Proposed item shifts, within free float, that clear over-allocated days. Nothing is changed."""
+    try:
+        return resource_load.level(resourceId)
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "cycle": e.ids})
+
 
 
 
@@ -314,12 +708,6 @@ if __name__ == "__main__":
     # Priority: Env Var > Config File > Default
     port = int(os.environ.get("PORT", 0))
     if port == 0:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.json")
-        if os.path.exists(config_path):
-            with open(config_path, "r") as f:
-                config = json.load(f)
-                port = int(config.get("serverPort", 8000))
-        else:
-            port = 8000
+        port = int(read_config().get("serverPort", 8000))
             
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -1,7 +1,11 @@
+import argparse
 import json
 import os
 import shutil
 from datetime import datetime
+from fileio import atomic_write
+from sqlite_storage import SQLITE_FILE, SqliteStorage
+from store import DataStore
 
 DATA_FILE = "data.json"
 BACKUP_DIR = "backups"
@@ -48,8 +52,7 @@ def migrate():
                 updated = True
         
         if updated:
-            with open(DATA_FILE, "w") as f:
-                json.dump(data, f, indent=4)
+            atomic_write(DATA_FILE, json.dumps(data, indent=4))
             print("Migration completed successfully.")
         else:
             print("Data already up to date. No changes made.")
@@ -57,5 +60,37 @@ def migrate():
     except Exception as e:
         print(f"Error during migration: {e}")
 
-if __name__ == "__main__":
+def import_to_sqlite(db_path=SQLITE_FILE, force=False):
+    """Copy data.json (plus any unfolded journal edits) into a SQLite database."""
     migrate()
+    if not os.path.exists(DATA_FILE):
+        return
+
+    target = SqliteStorage(db_path)
+    try:
+        if target.read() is not None and not force:
+            print(f"{db_path} already holds data. Use --force to overwrite it.")
+            return
+        source = DataStore(DATA_FILE, {})
+        source.load()
+        source.close()
+        target.write_all(source.data)
+        for name, rows in target.table_sizes():
+            print(f"  {name}: {rows} rows")
+        print(f"Imported {DATA_FILE} into {db_path}.")
+        print('Set "storageBackend": "sqlite" in config.json to use it.')
+    except Exception as e:
+        print(f"Error during SQLite import: {e}")
+    finally:
+        target.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upgrade data.json, optionally importing it into SQLite.")
+    parser.add_argument("--sqlite", nargs="?", const=SQLITE_FILE, metavar="DB",
+                        help=f"import data.json into a SQLite database (default {SQLITE_FILE})")
+    parser.add_argument("--force", action="store_true", help="overwrite a database that already holds data")
+    args = parser.parse_args()
+    if args.sqlite:
+        import_to_sqlite(args.sqlite, args.force)
+    else:
+        migrate()
@@ -0,0 +1,299 @@
+"""Per-resource daily load, over-allocation and leveling proposals.
+
+An assignment's hours per day come from logic_labor.assignment_hours: the
+working days of its resource's calendar within the dates of its item, shaped
+by its spread. Capacity per day is the calendar's, so hours that had to fall
+on days off (an item with no working days) show as over capacity.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from critical_path import DAY_MINUTES
+from logic_labor import ItemDateIndex, ResourceProfile, assignment_hours, resource_profile
+
+SPREADS = ("uniform", "front_loaded", "back_loaded", "custom")
+EPSILON = 1e-9
+
+Load = Dict[int, float] # date ordinal -> hours
+
+class ResourceLoad:
+    """Daily load per resource, kept current with the store.
+
+    Each assignment keeps its own contribution; an edit recomputes only the
+    assignments it affects (the assignment itself, those on an edited item or
+    deployment, or those of an edited resource) and re-sums the resources
+    they belong to.
+    """
+
+    def __init__(self, store, critical_path=None):
+        self.store = store
+        self.critical_path = critical_path
+        self._contributions: Dict[str, Tuple[Any, Load]] = {} # assignment id -> (resourceId, load)
+        self._assignments: Dict[Any, Set[str]] = defaultdict(set) # resourceId -> assignment ids
+        self._loads: Dict[Any, Load] = {}
+        self._over: Dict[Any, List[int]] = {} # resourceId -> over-capacity ordinals, sorted
+        self._profiles: Dict[Any, ResourceProfile] = {}
+        self._dirty: Set[str] = set()
+        self._dirty_resources: Set[Any] = set()
+        self._stale = True
+        store.subscribe(self._on_change)
+
+    # --- Queries ---
+
+    def profile(self, resource_id: Any) -> ResourceProfile:
+        profile = self._profiles.get(resource_id)
+        if profile is None:
+            profile = self._profiles[resource_id] = resource_profile(self.store.find("resources", resource_id))
+        return profile
+
+    def load(self, resource_id: Any) -> Load:
+        self._refresh()
+        return self._loads.get(resource_id, {})
+
+    def over_allocated(self, resource_id: Any) -> List[int]:
+        """Ordinals on which the resource's load exceeds its capacity."""
+        self._refresh()
+        return self._over.get(resource_id, [])
+
+    def resource_ids(self) -> List[Any]:
+        self._refresh()
+        ids = [r["id"] for r in self.store.get("resources", [])]
+        known = set(ids)
+        return ids + sorted((rid for rid in self._loads if rid not in known), key=str)
+
+    def report(self, start: Optional[int] = None, end: Optional[int] = None,
+               resource_ids: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
+        """Load and capacity arrays per resource over [start, end] (default: every loaded day)."""
+        self._refresh()
+        ids = list(resource_ids) if resource_ids is not None else self.resource_ids()
+        if start is None or end is None:
+            days = [day for rid in ids for day in self._loads.get(rid, ())]
+            if start is None:
+                start = min(days, default=None)
+            if end is None:
+                end = max(days, default=None)
+        if start is None or end is None or end < start:
+            return {"start": None, "end": None, "resources": []}
+
+        resources = []
+        for rid in ids:
+            profile = self.profile(rid)
+            load = self._loads.get(rid, {})
+            resource = self.store.find("resources", rid) or {}
+            resources.append({
+                "id": rid,
+                "name": resource.get("name"),
+                "capacityHoursPerDay": profile.capacity,
+                "load": [round(load.get(day, 0.0), 6) for day in range(start, end + 1)],
+                "capacity": profile.calendar.daily(start, end),
+                "capacityHours": profile.calendar.hours(start, end),
+                "overAllocated": [{
+                    "date": date.fromordinal(day).isoformat(),
+                    "load": round(load[day], 6),
+                    "capacity": profile.calendar.hours_on(day),
+                } for day in self._over.get(rid, ()) if start <= day <= end],
+            })
+        return {
+            "start": date.fromordinal(start).isoformat(),
+            "end": date.fromordinal(end).isoformat(),
+            "resources": resources,
+        }
+
+    # --- Leveling ---
+
+    def level(self, resource_ids: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
+        """Propose moving items later, within their free float, to clear over-allocated days.
+
+        Greedy: for each over-allocated day, try the assignments on it with
+        the most free float first and take the whole-day shift of their item
+        that best lowers this resource's overload without raising any
+        other's. Free float never delays a successor, so proposals don't
+        interact through the schedule. Needs a CriticalPath; raises
+        DependencyCycleError if the dependencies loop.
+        """
+        self._refresh()
+        network = self.critical_path.network()
+        finish = network.finish()
+        loads = {rid: dict(load) for rid, load in self._loads.items()}
+        contributions = dict(self._contributions) # proposals are applied to these copies only
+        index = self.store.index("resourceAssignments")
+        slack_days: Dict[str, int] = {}
+        proposals = []
+
+        def float_days(item_id: str) -> int:
+            if item_id not in slack_days:
+                i = network.index.get(item_id)
+                if i is None:
+                    i = network.index.get(f"dep_{item_id}")
+                slack_days[item_id] = network.free_float(i, finish) // DAY_MINUTES if i is not None else 0
+            return slack_days[item_id]
+
+        def overload(rid: Any, days: Iterable[int]) -> float:
+            load, profile = loads.get(rid, {}), self.profile(rid)
+            return sum(max(0.0, load.get(day, 0.0) - profile.calendar.hours_on(day)) for day in days)
+
+        targets = list(resource_ids) if resource_ids is not None else self.resource_ids()
+        for rid in targets:
+            for day in self.over_allocated(rid):
+                for assignment in self._candidates(rid, day, index, contributions, float_days):
+                    if loads[rid].get(day, 0.0) <= self.profile(rid).calendar.hours_on(day) + EPSILON:
+                        break
+                    item_id = assignment["scheduleItemId"]
+                    shift = self._best_shift(item_id, float_days(item_id), rid, loads, contributions, overload, index)
+                    if shift:
+                        start, end = self._item_dates(item_id)
+                        slack_days[item_id] = 0 # moved once; its float is spent
+                        proposals.append({
+                            "scheduleItemId": item_id,
+                            "resourceId": rid,
+                            "date": date.fromordinal(day).isoformat(),
+                            "shiftDays": shift,
+                            "newStart": date.fromordinal(start + shift).isoformat(),
+                            "newEnd": date.fromordinal(end + shift).isoformat(),
+                        })
+
+        remaining = sum(1 for rid in targets for day in loads.get(rid, {})
+                        if loads[rid][day] > self.profile(rid).calendar.hours_on(day) + EPSILON)
+        return {"proposals": proposals, "remainingOverAllocatedDays": remaining}
+
+    def _candidates(self, rid: Any, day: int, index, contributions, float_days) -> List[Dict[str, Any]]:
+        candidates = []
+        for assignment in index.by("resourceId", rid):
+            contribution = contributions.get(assignment["id"])
+            if contribution and contribution[1].get(day) and float_days(assignment["scheduleItemId"]) > 0:
+                candidates.append(assignment)
+        candidates.sort(key=lambda a: (-float_days(a["scheduleItemId"]), str(a["id"])))
+        return candidates
+
+    def _best_shift(self, item_id: str, max_shift: int, rid: Any, loads, contributions, overload, index) -> int:
+        """The shift in 1..max_shift that most lowers `rid`'s overload without raising any other's, or 0.
+
+        Ties go to the smaller shift, and a shift that clears the days it
+        touches ends the search. The winner is applied to `loads` and
+        `contributions`.
+        """
+        start, end = self._item_dates(item_id)
+        if start is None:
+            return 0
+        assignments = [a for a in index.by("scheduleItemId", item_id) if a["id"] in contributions]
+        best, best_gain, best_changes = 0, EPSILON, None
+        for shift in range(1, max_shift + 1):
+            changes = []
+            for a in assignments:
+                resource_id, old = contributions[a["id"]]
+                changes.append((resource_id, old, assignment_hours(a, start, end, self.profile(resource_id), shift)))
+            touched: Dict[Any, Set[int]] = defaultdict(set)
+            for resource_id, old, new in changes:
+                touched[resource_id].update(old, new)
+            before = {r: overload(r, days) for r, days in touched.items()}
+            self._apply(loads, changes, 1)
+            after = {r: overload(r, days) for r, days in touched.items()}
+            self._apply(loads, changes, -1)
+            gain = before[rid] - after[rid]
+            if gain > best_gain and all(after[r] <= before[r] + EPSILON for r in touched):
+                best, best_gain, best_changes = shift, gain, changes
+                if after[rid] <= EPSILON:
+                    break
+        if best_changes is not None:
+            self._apply(loads, best_changes, 1)
+            for a, (resource_id, _, new) in zip(assignments, best_changes):
+                contributions[a["id"]] = (resource_id, new)
+        return best
+
+    @staticmethod
+    def _apply(loads, changes, sign: int):
+        old_index, new_index = (1, 2) if sign > 0 else (2, 1)
+        for change in changes:
+            load = loads.setdefault(change[0], {})
+            for day, hours in change[old_index].items():
+                load[day] = load.get(day, 0.0) - hours
+            for day, hours in change[new_index].items():
+                load[day] = load.get(day, 0.0) + hours
+
+    # --- Maintenance ---
+
+    def _item_dates(self, item_id: str) -> Tuple[Optional[int], Optional[int]]:
+        deployment = self.store.find("deployments", item_id)
+        if deployment is None and item_id.startswith("dep_"):
+            deployment = self.store.find("deployments", item_id[4:])
+        item = self.store.find("scheduleItems", item_id)
+        try:
+            start, end = ItemDateIndex([deployment] if deployment else [], [item] if item else []).dates(item_id)
+        except (KeyError, TypeError, ValueError):
+            return None, None
+        if not start or not end:
+            return None, None
+        return start.toordinal(), end.toordinal()
+
+    def _refresh(self):
+        if self._stale:
+            self._contributions.clear()
+            self._assignments.clear()
+            self._loads.clear()
+            self._over.clear()
+            self._profiles.clear()
+            self._dirty = {a["id"] for a in self.store.get("resourceAssignments", [])}
+            self._stale = False
+        if self._dirty:
+            for assignment_id in self._dirty:
+                old = self._contributions.pop(assignment_id, None)
+                if old is not None:
+                    self._assignments[old[0]].discard(assignment_id)
+                    self._dirty_resources.add(old[0])
+                assignment = self.store.find("resourceAssignments", assignment_id)
+                if assignment is None:
+                    continue
+                rid = assignment.get("resourceId")
+                start, end = self._item_dates(assignment.get("scheduleItemId") or "")
+                try:
+                    load = assignment_hours(assignment, start, end, self.profile(rid)) if start is not None else {}
+                except (KeyError, TypeError, ValueError):
+                    load = {} # a malformed record adds nothing, as in the labor aggregation
+                self._contributions[assignment_id] = (rid, load)
+                self._assignments[rid].add(assignment_id)
+                self._dirty_resources.add(rid)
+            self._dirty.clear()
+        if self._dirty_resources:
+            for rid in self._dirty_resources:
+                total: Load = defaultdict(float)
+                # In assignment id order, so the floats don't depend on edit history
+                for assignment_id in sorted(self._assignments.get(rid, ()), key=str):
+                    for day, hours in self._contributions[assignment_id][1].items():
+                        total[day] += hours
+                profile = self.profile(rid)
+                if total:
+                    self._loads[rid] = dict(total)
+                    self._over[rid] = sorted(day for day, hours in total.items()
+                                             if hours > profile.calendar.hours_on(day) + EPSILON)
+                else:
+                    self._loads.pop(rid, None)
+                    self._over.pop(rid, None)
+            self._dirty_resources.clear()
+
+    def _on_change(self, op: Dict[str, Any]):
+        collection = op.get("collection")
+        # Profiles are read even before the first build, so they are dropped regardless
+        if op["op"] in ("replace", "set"):
+            self._profiles.clear()
+        elif collection == "resources":
+            self._profiles.pop(op["record"]["id"] if op["op"] == "upsert" else op["id"], None)
+        if self._stale:
+            return
+        if op["op"] == "replace" or (op["op"] == "set" and collection in ("deployments", "scheduleItems", "resources", "resourceAssignments")):
+            self._stale = True
+            return
+        if op["op"] not in ("upsert", "update", "delete"):
+            return
+        record_id = op["record"]["id"] if op["op"] == "upsert" else op["id"]
+        assignments = self.store.index("resourceAssignments")
+        if collection == "resourceAssignments":
+            self._dirty.add(record_id)
+        elif collection == "resources":
+            self._dirty.update(assignments.ids_by("resourceId", record_id))
+            self._dirty_resources.add(record_id)
+        elif collection == "scheduleItems":
+            self._dirty.update(assignments.ids_by("scheduleItemId", record_id))
+        elif collection == "deployments":
+            self._dirty.update(assignments.ids_by("scheduleItemId", record_id))
+            self._dirty.update(assignments.ids_by("scheduleItemId", f"dep_{record_id}"))
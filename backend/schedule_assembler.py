@@ -0,0 +1,186 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from interval_index import IntervalIndex, date_ordinal, span_of
+
+def merge_deployment_item(d: Dict[str, Any], local: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Schedule item for a deployment, layered over its local item if one exists."""
+    if local:
+        # Merge: deployment is source of truth for dates/title
+        # But local might have metadata, sortOrder, parentId
+        item = local.copy()
+        item['title'] = d['name']
+        item['startAt'] = d['startDate']
+        item['endAt'] = d['endDate'] # Using endDate as endAt
+        item['type'] = 'deployment'
+        return item
+    # Create transient item
+    return {
+        "id": f"dep_{d['id']}", # transient ID
+        "deploymentId": d['id'],
+        "type": 'deployment',
+        "title": d['name'],
+        "startAt": d['startDate'],
+        "endAt": d['endDate'],
+        "percentComplete": 0,
+        "parentId": None,
+        "sortOrder": 0,
+        "metadata": { "status": "Synced" } # Default
+    }
+
+def item_matches(item: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """TimelineView-style filter: each key must equal the value, or be one of a list of values."""
+    for key, wanted in filters.items():
+        value = item.get(key)
+        if isinstance(wanted, list):
+            if value not in wanted:
+                return False
+        elif value != wanted:
+            return False
+    return True
+
+class ScheduleAssembler:
+    """Materialized merge of deployments and local schedule items.
+
+    Deployments always appear as schedule items (merged over their linked local
+    item when there is one); local items not linked to a deployment follow
+    them. The merged entries are kept between requests and the assembler
+    subscribes to the store, so a change to one deployment or schedule item
+    only rebuilds the entries it affects.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Both dicts follow the order of the underlying store lists: new
+        # records append, upserts keep their slot, deletes drop out.
+        self._deployment_items: Dict[str, Dict[str, Any]] = {}
+        self._local_items: Dict[str, Dict[str, Any]] = {}
+        # scheduleItem id -> deploymentId it is linked to (None if free-standing)
+        self._item_links: Dict[str, Optional[str]] = {}
+        self._stale = True
+        self._local_order_stale = False
+        # ("dep", deploymentId) / ("item", scheduleItemId) -> span of the merged
+        # entry; built on the first windowed query, then kept in sync
+        self._windows = IntervalIndex()
+        self._windows_built = False
+        store.subscribe(self._on_change)
+
+    def items(self, start: Optional[str] = None, end: Optional[str] = None,
+              filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Merged items, optionally limited to a date window and a TimelineView-style filter.
+
+        Without a window items come in list order (deployments, then local
+        items); windowed results come from the interval index ordered by start.
+        """
+        if self._stale:
+            self._rebuild()
+        if self._local_order_stale:
+            self._local_items = {i["id"]: i for i in self.store.get("scheduleItems", []) if not i.get("deploymentId")}
+            self._local_order_stale = False
+        if start or end:
+            lo = date_ordinal(start) if start else 1
+            hi = date_ordinal(end) if end else date.max.toordinal()
+            if lo is None or hi is None:
+                raise ValueError("Window bounds must be ISO dates")
+            if not self._windows_built:
+                self._build_windows()
+            merged = [self._entry(key) for key in self._windows.overlapping(lo, hi)]
+        else:
+            merged = list(self._deployment_items.values()) + list(self._local_items.values())
+        if filters:
+            merged = [i for i in merged if item_matches(i, filters)]
+        return merged
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """The merged entry with this id: a local item, a deployment's linked item or its dep_ item."""
+        if self._stale:
+            self._rebuild()
+        if item_id in self._local_items:
+            return self._local_items[item_id]
+        deployment_id = self._item_links.get(item_id) or (item_id[4:] if item_id.startswith("dep_") else None)
+        entry = self._deployment_items.get(deployment_id) if deployment_id else None
+        return entry if entry is not None and entry["id"] == item_id else None
+
+    # --- Maintenance ---
+
+    def _entry(self, key) -> Dict[str, Any]:
+        kind, record_id = key
+        return self._deployment_items[record_id] if kind == "dep" else self._local_items[record_id]
+
+    def _index_entry(self, key, entry: Optional[Dict[str, Any]]):
+        if not self._windows_built:
+            return
+        span = span_of(entry.get("startAt"), entry.get("endAt")) if entry is not None else None
+        if span is None:
+            self._windows.remove(key)
+        else:
+            self._windows.add(key, span[0], span[1])
+
+    def _rebuild(self):
+        self._deployment_items.clear()
+        self._local_items.clear()
+        self._item_links.clear()
+        items_index = self.store.index("scheduleItems")
+        for item in self.store.get("scheduleItems", []):
+            self._item_links.setdefault(item["id"], item.get("deploymentId"))
+        for d in self.store.get("deployments", []):
+            local = items_index.first("deploymentId", d["id"])
+            self._deployment_items[d["id"]] = merge_deployment_item(d, local)
+        for item in self.store.get("scheduleItems", []):
+            if not item.get("deploymentId"):
+                self._local_items[item["id"]] = item
+
+        self._windows_built = False
+        self._stale = False
+
+    def _build_windows(self):
+        spans = []
+        for kind, entries in (("dep", self._deployment_items), ("item", self._local_items)):
+            for record_id, entry in entries.items():
+                span = span_of(entry.get("startAt"), entry.get("endAt"))
+                if span is not None:
+                    spans.append(((kind, record_id), span[0], span[1]))
+        self._windows.build(spans)
+        self._windows_built = True
+
+    def _refresh_deployment(self, deployment_id: str):
+        d = self.store.find("deployments", deployment_id)
+        if d is None:
+            self._deployment_items.pop(deployment_id, None)
+            self._windows.remove(("dep", deployment_id))
+            return
+        local = self.store.index("scheduleItems").first("deploymentId", deployment_id)
+        entry = merge_deployment_item(d, local)
+        self._deployment_items[deployment_id] = entry
+        self._index_entry(("dep", deployment_id), entry)
+
+    def _refresh_item(self, item_id: str):
+        previous_link = self._item_links.pop(item_id, None)
+        item = self.store.find("scheduleItems", item_id)
+        link = item.get("deploymentId") if item else None
+        if item is not None:
+            self._item_links[item_id] = link
+        if item is not None and not link:
+            if item_id not in self._local_items and self.store.collection("scheduleItems")[-1] is not item:
+                # An existing item was unlinked mid-list; re-read the order rather than append it
+                self._local_order_stale = True
+            self._local_items[item_id] = item # keeps its slot if already listed
+            self._index_entry(("item", item_id), item)
+        else:
+            self._local_items.pop(item_id, None)
+            self._windows.remove(("item", item_id))
+        for deployment_id in {previous_link, link} - {None}:
+            self._refresh_deployment(deployment_id)
+
+    def _on_change(self, op: Dict[str, Any]):
+        if self._stale:
+            return
+        collection = op.get("collection")
+        if op["op"] in ("replace", "set") and collection in (None, "deployments", "scheduleItems"):
+            self._stale = True
+            return
+        record_id = op["record"]["id"] if op["op"] == "upsert" else op.get("id")
+        if collection == "deployments":
+            self._refresh_deployment(record_id)
+        elif collection == "scheduleItems":
+            self._refresh_item(record_id)
@@ -0,0 +1,257 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import fastjson
+from indexes import SECONDARY_INDEXES
+
+SQLITE_FILE = "data.db"
+
+REGISTRY = "_collections"
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _dumps(value: Any) -> str:
+    return fastjson.dumps(value).decode("utf-8")
+
+def _column(value: Any) -> Any:
+    return value if value is None or isinstance(value, (str, int, float)) else _dumps(value)
+
+def collection_kind(name: str, value: Any) -> str:
+    """How a collection is laid out: "records" (rows by id), "map" (rows by key) or "value" (one JSON blob).
+
+    Lists of records with unique ids get a table keyed by id, dicts a table
+    keyed by dict key. Anything else, such as fiscalYearRates, is kept whole
+    in the registry.
+    """
+    if name == REGISTRY or name.startswith("sqlite_"):
+        return "value"
+    if isinstance(value, dict):
+        return "map"
+    if isinstance(value, list):
+        ids = [r.get("id") if isinstance(r, dict) else None for r in value]
+        if None not in ids and len(set(map(str, ids))) == len(ids):
+            return "records"
+    return "value"
+
+class SqliteStorage:
+    """Storage backend keeping each collection in its own SQLite table.
+
+    List collections become tables of (id, seq, body) rows, with a column
+    and index per foreign key in SECONDARY_INDEXES; dict collections such as
+    pricing become (key, seq, value) tables. `seq` preserves the order the
+    records have in memory. A registry table records each collection's
+    layout and position, and holds collections that fit neither shape.
+
+    Every committed operation is written as one transaction touching only
+    the rows it changed, so an edit costs O(log n) however large the data
+    grows. The database runs in WAL mode, which makes those small commits
+    cheap and lets backups read while the server writes. There is nothing to
+    fold, so flush() and compact() only checkpoint the WAL.
+    """
+
+    def __init__(self, path: str = SQLITE_FILE):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._kinds: Dict[str, str] = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Handlers run on the event loop, possibly not the thread that loaded the store.
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {REGISTRY} "
+                "(name TEXT PRIMARY KEY, kind TEXT NOT NULL, pos INTEGER NOT NULL, value TEXT)"
+            )
+            self._kinds = dict(self._conn.execute(f"SELECT name, kind FROM {REGISTRY}"))
+        return self._conn
+
+    # --- Reading ---
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        rows = self.conn.execute(f"SELECT name, kind, value FROM {REGISTRY} ORDER BY pos").fetchall()
+        if not rows:
+            return None
+        data: Dict[str, Any] = {}
+        for name, kind, value in rows:
+            table = _quote(name)
+            if kind == "records":
+                data[name] = [fastjson.loads(body) for (body,) in self.conn.execute(f"SELECT body FROM {table} ORDER BY seq")]
+            elif kind == "map":
+                data[name] = {key: fastjson.loads(v) for key, v in self.conn.execute(f"SELECT key, value FROM {table} ORDER BY seq")}
+            else:
+                data[name] = fastjson.loads(value)
+        return data
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        return iter(())
+
+    def seed(self, store):
+        self.write_all(store.data)
+
+    # --- Writing ---
+
+    def append(self, op: Dict[str, Any], store):
+        with self._transaction():
+            self._write(op, store.data, store.find)
+
+    def write_all(self, data: Dict[str, Any]):
+        """Replace the whole database contents with `data`."""
+        with self._transaction():
+            self._write_all(data)
+
+    @contextmanager
+    def _transaction(self):
+        # Explicit BEGIN so table drops and creates commit or roll back with the rows
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            self._kinds = dict(conn.execute(f"SELECT name, kind FROM {REGISTRY}"))
+            raise
+        conn.execute("COMMIT")
+
+    def _write(self, op: Dict[str, Any], data: Dict[str, Any], find):
+        kind = op["op"]
+        if kind == "batch":
+            for sub in op["ops"]:
+                self._write(sub, data, find)
+            return
+        if kind == "replace":
+            self._write_all(data)
+            return
+
+        name = op["collection"]
+        layout = self._kinds.get(name)
+        if kind in ("upsert", "update", "delete") and layout == "records":
+            if kind == "delete":
+                self.conn.execute(f"DELETE FROM {_quote(name)} WHERE id = ?", (str(op["id"]),))
+                return
+            # The row takes the record as it is in memory now; a later op in
+            # the same batch that removed it writes its own change.
+            record = op["record"] if kind == "upsert" else find(name, op["id"])
+            if record is not None:
+                self._put_record(name, record)
+        elif kind in ("put", "remove") and layout == "map":
+            if kind == "remove":
+                self.conn.execute(f"DELETE FROM {_quote(name)} WHERE key = ?", (op["key"],))
+            elif op["key"] in data.get(name, {}):
+                self._put_entry(name, op["key"], data[name][op["key"]])
+        else:
+            # "set", or an op the collection's layout can't take row by row
+            self._write_collection(name, data.get(name))
+
+    def _write_all(self, data: Dict[str, Any]):
+        for name in list(self._kinds):
+            self._drop(name)
+        self.conn.execute(f"DELETE FROM {REGISTRY}")
+        for name, value in data.items():
+            self._write_collection(name, value)
+
+    def _write_collection(self, name: str, value: Any):
+        if name in self._kinds:
+            self._drop(name)
+        if value is None:
+            self.conn.execute(f"DELETE FROM {REGISTRY} WHERE name = ?", (name,))
+            self._kinds.pop(name, None)
+            return
+        kind = collection_kind(name, value)
+        self._create(name, kind)
+        if kind == "records":
+            for record in value:
+                self._put_record(name, record)
+        elif kind == "map":
+            for key, entry in value.items():
+                self._put_entry(name, key, entry)
+        self.conn.execute(
+            f"INSERT INTO {REGISTRY} (name, kind, pos, value) "
+            f"VALUES (?, ?, COALESCE((SELECT pos FROM {REGISTRY} WHERE name = ?), "
+            f"(SELECT COALESCE(MAX(pos), 0) + 1 FROM {REGISTRY})), ?) "
+            "ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, value = excluded.value",
+            (name, kind, name, _dumps(value) if kind == "value" else None),
+        )
+        self._kinds[name] = kind
+
+    def _create(self, name: str, kind: str):
+        table = _quote(name)
+        if kind == "records":
+            fields = SECONDARY_INDEXES.get(name, ())
+            columns = "".join(f", {_quote(field)} TEXT" for field in fields)
+            self.conn.execute(f"CREATE TABLE {table} (id TEXT PRIMARY KEY, seq INTEGER NOT NULL, body TEXT NOT NULL{columns})")
+            for field in fields:
+                self.conn.execute(f"CREATE INDEX {_quote(f'{name}_{field}')} ON {table} ({_quote(field)})")
+        elif kind == "map":
+            self.conn.execute(f"CREATE TABLE {table} (key TEXT PRIMARY KEY, seq INTEGER NOT NULL, value TEXT NOT NULL)")
+        else:
+            return
+        self.conn.execute(f"CREATE INDEX {_quote(f'{name}_seq')} ON {table} (seq)")
+
+    def _drop(self, name: str):
+        if self._kinds.pop(name, None) in ("records", "map"):
+            self.conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+
+    def _put_record(self, name: str, record: Dict[str, Any]):
+        fields = SECONDARY_INDEXES.get(name, ())
+        table = _quote(name)
+        columns = "".join(f", {_quote(field)}" for field in fields)
+        updates = "".join(f", {_quote(field)} = excluded.{_quote(field)}" for field in fields)
+        params: List[Any] = [str(record["id"]), _dumps(record)]
+        params.extend(_column(record.get(field)) for field in fields)
+        self.conn.execute(
+            f"INSERT INTO {table} (id, seq, body{columns}) "
+            f"VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM {table}), ?{', ?' * len(fields)}) "
+            f"ON CONFLICT(id) DO UPDATE SET body = excluded.body{updates}",
+            params,
+        )
+
+    def _put_entry(self, name: str, key: str, value: Any):
+        table = _quote(name)
+        self.conn.execute(
+            f"INSERT INTO {table} (key, seq, value) VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM {table}), ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, _dumps(value)),
+        )
+
+    # --- Maintenance ---
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    async def flush(self, store):
+        self.checkpoint()
+
+    def compact(self, store):
+        self.checkpoint()
+
+    def checkpoint(self):
+        if self._conn is not None:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def backup(self, directory: str, stem: str) -> Optional[str]:
+        """Copy the database, consistently even mid-write, to `directory`/`stem`.db."""
+        if self._conn is None and not os.path.exists(self.path):
+            return None
+        name = f"{stem}.db"
+        target = sqlite3.connect(os.path.join(directory, name))
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+        return name
+
+    def table_sizes(self) -> List[Tuple[str, int]]:
+        """(collection, row count) for every table-backed collection."""
+        return [(name, self.conn.execute(f"SELECT COUNT(*) FROM {_quote(name)}").fetchone()[0])
+                for name, kind in self._kinds.items() if kind != "value"]
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,398 @@
+import asyncio
+import copy
+import os
+import shutil
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import fastjson
+from fileio import atomic_write
+from indexes import SECONDARY_INDEXES, IndexedCollection
+from journal import Journal, journal_path_for
+from sqlite_storage import SQLITE_FILE, SqliteStorage
+
+# Fold the journal into the snapshot once it grows past this many bytes.
+COMPACT_THRESHOLD = 1024 * 1024
+
+STORAGE_BACKENDS = ("json", "sqlite")
+DATA_FORMATS = ("pretty", "compact")
+
+class DataStore:
+    """Process-resident copy of the application data.
+
+    The JSON snapshot is read once by load(); after that every read is served
+    from memory. Each mutation is applied in memory and appended to the
+    journal next to the snapshot, so an edit costs O(change) on disk. When the
+    journal passes the compaction threshold a background task rewrites the
+    snapshot and drops the folded operations. On startup the journal is
+    replayed over the snapshot to recover edits made since the last compaction.
+
+    Journal operations only ever set state (upsert, update, delete, replace),
+    so replaying operations that already reached the snapshot is harmless.
+
+    Handlers mutate the store synchronously on the event loop thread, so each
+    read-modify-write is atomic with respect to other requests. Snapshot
+    writes are serialized by a lock, go through a temp file plus rename, and
+    a burst of compaction requests collapses into a single pending flush.
+
+    That describes the default JsonStorage. Persistence goes through the
+    `storage` object, so a SqliteStorage can stand in for the snapshot and
+    journal: it writes each operation to its rows as it commits, and reads
+    are still served from memory either way. If persisting an operation
+    fails, memory is reloaded from storage so it never serves an edit that
+    would vanish on restart.
+
+    Every commit bumps `revision`, and the store remembers the revision at
+    which each record (or dict key) last changed so stale delta patches can be
+    detected. Revisions are seeded from the wall clock in microseconds at
+    load, so they keep increasing across restarts without being persisted.
+    """
+
+    def __init__(self, path: str, initial_data: Dict[str, Any], compact_threshold: int = COMPACT_THRESHOLD,
+                 storage: Optional["Storage"] = None):
+        self.path = path
+        self.initial_data = initial_data
+        self.storage = storage if storage is not None else JsonStorage(path, compact_threshold)
+        self.data: Dict[str, Any] = {}
+        self._compact_task: Optional[asyncio.Task] = None
+        self.revision = 0
+        self.base_revision = 0
+        self._record_revs: Dict[Tuple[str, str], int] = {}
+        self._collection_revs: Dict[str, int] = {}
+        self._indexed: Dict[str, IndexedCollection] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def load(self):
+        data = self.storage.read()
+        if data is None:
+            self.data = copy.deepcopy(self.initial_data)
+            self.storage.seed(self)
+        else:
+            self.data = data
+        for op in self.storage.replay():
+            self._apply(op)
+        self.base_revision = self.revision = int(time.time() * 1_000_000)
+        self._record_revs.clear()
+        self._collection_revs.clear()
+        self._notify({"op": "replace"})
+
+    # --- Reads ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def collection(self, name: str) -> List[Dict[str, Any]]:
+        # Treat as read-only: changes must go through the mutation methods so
+        # the journal and indexes stay in sync.
+        return self.data.setdefault(name, [])
+
+    def index(self, name: str) -> IndexedCollection:
+        """Id and secondary indexes over a list collection, rebuilt if the list was replaced."""
+        records = self.collection(name)
+        indexed = self._indexed.get(name)
+        if indexed is None or indexed.records is not records:
+            indexed = IndexedCollection(records, SECONDARY_INDEXES.get(name, ()))
+            self._indexed[name] = indexed
+        return indexed
+
+    def find(self, name: str, record_id: str) -> Optional[Dict[str, Any]]:
+        return self.index(name).get(record_id)
+
+    # --- Mutations ---
+
+    def replace(self, data: Dict[str, Any]):
+        self._commit({"op": "replace", "data": data})
+
+    def upsert(self, name: str, record: Dict[str, Any]):
+        self._commit({"op": "upsert", "collection": name, "record": record})
+
+    def update(self, name: str, record_id: str, fields: Dict[str, Any]) -> bool:
+        if self.find(name, record_id) is None:
+            return False
+        self._commit({"op": "update", "collection": name, "id": record_id, "fields": fields})
+        return True
+
+    def delete(self, name: str, record_id: str) -> bool:
+        if self.find(name, record_id) is None:
+            return False
+        self._commit({"op": "delete", "collection": name, "id": record_id})
+        return True
+
+    def apply_batch(self, ops: List[Dict[str, Any]]):
+        """Apply several operations as one revision and one journal entry."""
+        self._commit({"op": "batch", "ops": ops})
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call `listener` with every applied operation (batches are flattened).
+
+        Listeners run synchronously after the operation is applied, so derived
+        views can update just the records it touched. A "replace" operation
+        means everything may have changed.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, op: Dict[str, Any]):
+        if op["op"] == "batch":
+            for sub in op["ops"]:
+                self._notify(sub)
+            return
+        for listener in self._listeners:
+            listener(op)
+
+    def _commit(self, op: Dict[str, Any]):
+        self._apply(op)
+        self.revision += 1
+        for collection, key in touched_keys(op):
+            if key is None:
+                self._collection_revs[collection] = self.revision
+            else:
+                self._record_revs[(collection, key)] = self.revision
+        try:
+            self.storage.append(op, self)
+        except Exception:
+            self._restore_persisted()
+            raise
+        self._notify(op)
+        if self.storage.needs_compaction():
+            self._schedule_compaction()
+
+    def _restore_persisted(self):
+        """Reload what storage holds after a failed write; views and clients see a replace."""
+        data = self.storage.read()
+        self.data = data if data is not None else copy.deepcopy(self.initial_data)
+        for op in self.storage.replay():
+            self._apply(op)
+        self._collection_revs["*"] = self.revision
+        self._notify({"op": "replace"})
+
+    # --- Revisions ---
+
+    def record_revision(self, collection: str, key: str) -> int:
+        """Revision at which a record last changed, or base_revision if not since load."""
+        return max(
+            self._record_revs.get((collection, key), 0),
+            self._collection_revs.get(collection, 0),
+            self._collection_revs.get("*", 0),
+            self.base_revision,
+        )
+
+    def conflicts(self, ops: List[Dict[str, Any]], base_revision: int) -> List[Dict[str, Any]]:
+        """Records touched by `ops` that changed after the client's base revision."""
+        if base_revision < self.base_revision:
+            # The client synced against an earlier process; nothing it holds is trustworthy.
+            return [{"collection": "*", "id": None}]
+        found = []
+        for op in ops:
+            for collection, key in touched_keys(op):
+                if key is None:
+                    changed = max(self._collection_revs.get(collection, 0), self._collection_revs.get("*", 0))
+                    changed = max([changed] + [rev for (c, _), rev in self._record_revs.items() if c == collection])
+                else:
+                    changed = self.record_revision(collection, key)
+                if changed > base_revision:
+                    found.append({"collection": collection, "id": key})
+        return found
+
+    def changes_since(self, since: int) -> Optional[Dict[str, Any]]:
+        """Records changed after revision `since`, shaped like a PATCH /api/data payload.
+
+        Returns None when the changes cannot be expressed as a delta (the
+        revision predates this process or the whole state was replaced), in
+        which case the caller should fetch the full data again.
+        """
+        if since < self.base_revision or self._collection_revs.get("*", 0) > since:
+            return None
+        upserts: Dict[str, Any] = {}
+        deletes: Dict[str, List[str]] = {}
+        replace = {name: self.data.get(name) for name, rev in self._collection_revs.items() if rev > since}
+        for (name, key), rev in self._record_revs.items():
+            if rev <= since or name in replace:
+                continue
+            current = self.data.get(name)
+            if isinstance(current, dict):
+                if key in current:
+                    upserts.setdefault(name, {})[key] = current[key]
+                    continue
+            else:
+                record = self.find(name, key)
+                if record is not None:
+                    upserts.setdefault(name, []).append(record)
+                    continue
+            deletes.setdefault(name, []).append(key)
+        return {"upserts": upserts, "deletes": deletes, "replace": replace}
+
+    def _apply(self, op: Dict[str, Any]):
+        kind = op["op"]
+        if kind == "batch":
+            for sub in op["ops"]:
+                self._apply(sub)
+            return
+        if kind == "replace":
+            self.data = op["data"]
+            return
+        if kind == "set":
+            self.data[op["collection"]] = op["value"]
+            return
+        if kind == "put":
+            self.data.setdefault(op["collection"], {})[op["key"]] = op["value"]
+            return
+        if kind == "remove":
+            self.data.setdefault(op["collection"], {}).pop(op["key"], None)
+            return
+
+        records = self.index(op["collection"])
+        if kind == "upsert":
+            records.upsert(op["record"])
+        elif kind == "update":
+            records.update(op["id"], op["fields"])
+        elif kind == "delete":
+            records.delete(op["id"])
+        else:
+            raise ValueError(f"Unknown journal operation: {kind}")
+
+    # --- Compaction ---
+
+    def _schedule_compaction(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, tests): compact inline.
+            self.compact()
+            return
+        if self._compact_task is None or self._compact_task.done():
+            self._compact_task = loop.create_task(self.flush())
+
+    async def flush(self):
+        """Bring the persisted copy up to date without blocking the event loop."""
+        await self.storage.flush(self)
+
+    def compact(self):
+        self.storage.compact(self)
+
+    def close(self):
+        self.storage.close()
+
+class JsonStorage:
+    """The data.json snapshot and its journal: the default storage backend.
+
+    Every storage backend offers the same methods. read() returns the
+    persisted data (None if there is none yet) and replay() any operations
+    still to be applied over it; seed() persists the initial data of a fresh
+    store. append() persists one committed operation, flush() and compact()
+    fold pending operations into the durable copy, and backup() copies that
+    copy into a directory.
+    """
+
+    def __init__(self, path: str, compact_threshold: int = COMPACT_THRESHOLD, pretty: bool = True):
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.pretty = pretty # False writes the snapshot without indentation
+        self.journal = Journal(journal_path_for(path))
+        self._write_lock = asyncio.Lock()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            return fastjson.loads(f.read())
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        return self.journal.replay()
+
+    def seed(self, store: DataStore):
+        pass # the snapshot is first written by compaction
+
+    def append(self, op: Dict[str, Any], store: DataStore):
+        self.journal.append(op)
+
+    def needs_compaction(self) -> bool:
+        return self.journal.size >= self.compact_threshold
+
+    async def flush(self, store: DataStore):
+        """Fold the journal into the snapshot."""
+        async with self._write_lock:
+            # Callers that queued behind a running flush find nothing left to do
+            # unless new edits arrived meanwhile, so bursts collapse into one write.
+            mark = self.journal.size
+            if mark == 0 and os.path.exists(self.path):
+                return
+            # Serialize on the loop thread so no handler mutates the data
+            # mid-dump, then hand the file write to a worker thread.
+            payload = fastjson.dumps(store.data, pretty=self.pretty)
+            await asyncio.to_thread(atomic_write, self.path, payload)
+            self.journal.discard_prefix(mark)
+
+    def compact(self, store: DataStore):
+        mark = self.journal.size
+        atomic_write(self.path, fastjson.dumps(store.data, pretty=self.pretty))
+        self.journal.discard_prefix(mark)
+
+    def backup(self, directory: str, stem: str) -> Optional[str]:
+        """Copy the snapshot to `directory`/`stem`.json; None if nothing is on disk yet."""
+        if not os.path.exists(self.path):
+            return None
+        name = f"{stem}.json"
+        shutil.copy2(self.path, os.path.join(directory, name))
+        return name
+
+    def close(self):
+        self.journal.close()
+
+Storage = Union[JsonStorage, SqliteStorage]
+
+def open_storage(config: Dict[str, Any], data_file: str) -> Storage:
+    """The storage backend named by config["storageBackend"] ("json" unless set).
+
+    config["dataFormat"] = "compact" writes data.json without indentation.
+    """
+    backend = config.get("storageBackend", "json")
+    if backend == "json":
+        data_format = config.get("dataFormat", "pretty")
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f"Unknown data format '{data_format}'; expected one of: {', '.join(DATA_FORMATS)}")
+        return JsonStorage(data_file, pretty=data_format == "pretty")
+    if backend == "sqlite":
+        return SqliteStorage(config.get("sqliteFile", SQLITE_FILE))
+    raise ValueError(f"Unknown storage backend '{backend}'; expected one of: {', '.join(STORAGE_BACKENDS)}")
+
+def touched_keys(op: Dict[str, Any]) -> List[Tuple[str, Optional[str]]]:
+    """(collection, key) pairs an operation changes; key None means the whole collection."""
+    kind = op["op"]
+    if kind == "batch":
+        return [pair for sub in op["ops"] for pair in touched_keys(sub)]
+    if kind == "replace":
+        return [("*", None)]
+    if kind == "set":
+        return [(op["collection"], None)]
+    if kind == "upsert":
+        return [(op["collection"], op["record"]["id"])]
+    if kind in ("update", "delete"):
+        return [(op["collection"], op["id"])]
+    return [(op["collection"], op["key"])]
+
+def delta_ops(current: Dict[str, Any], upserts: Dict[str, Any], deletes: Dict[str, List[str]],
+              replace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Translate a delta sync payload into store operations.
+
+    List collections (deployments, invoices, ...) take records to upsert by id
+    and ids to delete. Dict collections (billingState, pricing) take a mapping
+    of keys to new values and keys to remove. Anything without ids, such as
+    fiscalYearRates, is sent whole under `replace`.
+    """
+    ops = []
+    for name, records in upserts.items():
+        if name in current and isinstance(current[name], dict) != isinstance(records, dict):
+            raise ValueError(f"Upserts for '{name}' must be a {type(current[name]).__name__}")
+    for name, value in replace.items():
+        ops.append({"op": "set", "collection": name, "value": value})
+    for name, records in upserts.items():
+        if isinstance(records, dict):
+            ops.extend({"op": "put", "collection": name, "key": k, "value": v} for k, v in records.items())
+        else:
+            ops.extend({"op": "upsert", "collection": name, "record": r} for r in records)
+    for name, ids in deletes.items():
+        if isinstance(current.get(name), dict):
+            ops.extend({"op": "remove", "collection": name, "key": k} for k in ids)
+        else:
+            ops.extend({"op": "delete", "collection": name, "id": i} for i in ids)
+    return ops
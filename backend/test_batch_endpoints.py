@@ -0,0 +1,34 @@
+import unittest
+
+from api_testing import TestClient, main
+
+class TestBatchEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(main.app) # no startup/shutdown: never touches data.json
+
+    def test_date_info_batch_matches_single(self):
+        dates = ["2025-03-31", "2025-10-01", "2025-03-31", "2030-01-01"]
+        res = self.client.post("/api/calculate-date-info/batch", json={"dates": dates})
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+        self.assertEqual([r["date"] for r in body], dates)
+        for value, result in zip(dates, body):
+            single = self.client.get("/api/calculate-date-info", params={"date": value}).json()
+            self.assertEqual({k: result[k] for k in single}, single)
+
+    def test_date_info_batch_reports_bad_rows(self):
+        body = self.client.post("/api/calculate-date-info/batch", json={"dates": ["2026-02-30", "2026-01-01"]}).json()
+        self.assertEqual(body[0], {"date": "2026-02-30", "error": "Invalid date"})
+        self.assertEqual(body[1]["fiscalYear"], 2026)
+
+    def test_billing_periods_batch(self):
+        ranges = [{"startDate": "2026-01-01", "endDate": "2026-01-31", "type": "Land"},
+                  {"startDate": "2026-01-01", "endDate": "2026-01-15", "type": "Ship"},
+                  {"startDate": "bad", "endDate": "2026-01-15", "type": "Ship"}]
+        body = self.client.post("/api/calculations/billing-periods/batch", json={"ranges": ranges}).json()
+        self.assertEqual(body[0], self.client.post("/api/calculations/billing-periods", json=ranges[0]).json())
+        self.assertEqual(body[1], {"periods15Day": 1, "remainderDays": 0, "totalDays": 15})
+        self.assertEqual(body[2], {"error": "Invalid date range"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import billing_cache
+from billing_cache import BillingItems
+from logic_billing import generate_all_billing_items
+from store import DataStore
+
+class TestBillingItems(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = DataStore(os.path.join(tmp.name, "data.json"), {"deployments": []})
+        self.billing = BillingItems(self.store)
+        self.store.load()
+        self.addCleanup(self.store.close)
+        self.rng = random.Random(3)
+        for i in range(20):
+            self.store.upsert("deployments", self.deployment(f"d{i}"))
+
+    def deployment(self, deployment_id):
+        start = date(2026, 1, 1) + timedelta(days=self.rng.randrange(300))
+        return {"id": deployment_id, "name": deployment_id.upper(), "type": self.rng.choice(["Land", "Ship", "Shore", "Other"]),
+                "startDate": start.isoformat(), "endDate": (start + timedelta(days=self.rng.randrange(1, 80))).isoformat(),
+                "clinPrice15": 1500, "clinPriceSingle": 100, "clinPriceOverAbove": self.rng.choice([0, 50]), "price": 900}
+
+    def test_matches_generation_through_edits(self):
+        self.assertEqual(self.billing.all_items(), generate_all_billing_items(self.store.get("deployments")))
+        for _ in range(60):
+            i = self.rng.randrange(25)
+            roll = self.rng.random()
+            if roll < 0.4:
+                self.store.upsert("deployments", self.deployment(f"d{i}"))
+            elif roll < 0.6:
+                self.store.delete("deployments", f"d{i}")
+            else:
+                self.store.update("deployments", f"d{i % 20}", {"clinPrice15": self.rng.choice([1000, 2000])})
+            self.assertEqual(self.billing.all_items(), generate_all_billing_items(self.store.get("deployments")))
+        for d in self.store.get("deployments"):
+            items = [i for i in self.billing.all_items() if i["deploymentId"] == d["id"]]
+            self.assertEqual(self.billing.summary()[d["id"]], {"count": len(items), "total": sum(i["amount"] for i in items)})
+
+    def test_unrelated_edits_do_not_regenerate(self):
+        first = self.billing.all_items()
+        with mock.patch.object(billing_cache, "generate_billing_items_for_deployment",
+                               wraps=billing_cache.generate_billing_items_for_deployment) as generate:
+            self.store.update("deployments", "d1", {"laborPlan": {"during": []}, "notes": "x"})
+            self.assertIs(self.billing.all_items(), first)
+            self.store.update("deployments", "d2", {"endDate": "2027-06-30"})
+            self.billing.all_items()
+        self.assertEqual([c.args[0]["id"] for c in generate.call_args_list], ["d2"])
+
+    def test_stable_ids(self):
+        ids = [i["id"] for i in self.billing.items_for("d5")]
+        self.store.update("deployments", "d5", {"name": "Renamed"})
+        self.assertEqual([i["id"] for i in self.billing.items_for("d5")], ids)
+        self.assertTrue(all(i["deploymentName"] == "Renamed" for i in self.billing.items_for("d5")))
+
+    def test_malformed_deployment_has_no_items(self):
+        self.store.update("deployments", "d0", {"startDate": "soon"})
+        self.assertEqual(self.billing.items_for("d0"), [])
+        self.assertEqual(self.billing.summary()["d0"], {"count": 0, "total": 0})
+
+if __name__ == '__main__':
+    unittest.main()
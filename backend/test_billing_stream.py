@@ -0,0 +1,75 @@
+import json
+import unittest
+from unittest import mock
+
+from api_testing import TestClient, main, use_temp_store
+from logic_billing import generate_all_billing_items
+
+class TestBillingItemStream(unittest.TestCase):
+    def setUp(self):
+        self.store = use_temp_store(self)
+        for i, (kind, start, end) in enumerate([("Ship", "2026-01-01", "2026-02-20"), ("Land", "2026-03-01", "2026-04-29"),
+                                               ("Shore", "2026-02-10", "2026-02-26"), ("Other", "2026-05-01", "2026-05-03")]):
+            self.store.upsert("deployments", {"id": f"d{i}", "name": f"D{i}", "type": kind, "startDate": start, "endDate": end,
+                                              "clinPrice15": 1500, "clinPriceSingle": 100, "clinPriceOverAbove": 50, "price": 900})
+        self.client = TestClient(main.app)
+        self.all_items = generate_all_billing_items(self.store.get("deployments"))
+
+    def pages(self, limit, **params):
+        items, cursor = [], None
+        while True:
+            res = self.client.get("/api/billing-items", params=dict(params, limit=limit, **({"cursor": cursor} if cursor else {})))
+            self.assertEqual(res.status_code, 200)
+            body = res.json()
+            self.assertLessEqual(len(body["items"]), limit)
+            items.extend(body["items"])
+            cursor = body["nextCursor"]
+            if cursor is None:
+                return items
+
+    def test_pages_concatenate_to_full_list(self):
+        self.assertEqual(self.client.get("/api/billing-items").json(), self.all_items)
+        for limit in (1, 3, 7, 1000):
+            self.assertEqual(self.pages(limit), self.all_items)
+
+    def test_ndjson_stream(self):
+        res = self.client.get("/api/billing-items", params={"format": "ndjson"})
+        self.assertEqual(res.headers["content-type"], "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in res.text.splitlines()], self.all_items)
+        res = self.client.get("/api/billing-items", params={"limit": 2}, headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(len(res.text.splitlines()), 2)
+
+    def test_filters(self):
+        daily = self.client.get("/api/billing-items", params={"type": ["Daily Rate", "Other"]}).json()
+        self.assertEqual(daily, [i for i in self.all_items if i["type"] in ("Daily Rate", "Other")])
+        one = self.client.get("/api/billing-items", params={"deploymentId": "d1"}).json()
+        self.assertEqual(one, [i for i in self.all_items if i["deploymentId"] == "d1"])
+        window = self.pages(2, **{"from": "2026-02-15", "to": "2026-03-10", "type": "15-Day CLIN"})
+        expected = [i for i in self.all_items if i["type"] == "15-Day CLIN"
+                    and i["startDate"] <= "2026-03-10" and i["endDate"] >= "2026-02-15"]
+        self.assertEqual(sorted(i["id"] for i in window), sorted(i["id"] for i in expected))
+
+    def test_cursor_survives_edits_elsewhere(self):
+        first = self.client.get("/api/billing-items", params={"limit": 2}).json()
+        self.store.delete("deployments", "d3")
+        res = self.client.get("/api/billing-items", params={"limit": 1000, "cursor": first["nextCursor"]}).json()
+        remaining = generate_all_billing_items(self.store.get("deployments"))[2:]
+        self.assertEqual(res["items"], remaining)
+
+    def test_unchanged_page_is_not_generated(self):
+        first = self.client.get("/api/billing-items", params={"limit": 2})
+        with mock.patch.object(main.billing, "items_for", wraps=main.billing.items_for) as items_for:
+            res = self.client.get("/api/billing-items", params={"limit": 2}, headers={"If-None-Match": first.headers["etag"]})
+            self.assertEqual(res.status_code, 304)
+            self.assertEqual(items_for.call_count, 0)
+            self.client.get("/api/billing-items", params={"limit": 2})
+            self.assertGreater(items_for.call_count, 0)
+
+    def test_bad_cursor(self):
+        self.assertEqual(self.client.get("/api/billing-items", params={"cursor": "???"}).status_code, 400)
+        cursor = self.client.get("/api/billing-items", params={"limit": 1}).json()["nextCursor"]
+        self.store.delete("deployments", "d0")
+        self.assertEqual(self.client.get("/api/billing-items", params={"cursor": cursor}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import math
+import random
+import unittest
+from datetime import date, timedelta
+
+from billing_totals import GROUP_FIELDS, billing_totals
+from date_utils import get_fiscal_year, get_ordering_period
+from logic_billing import generate_all_billing_items
+
+def random_deployments(rng, n):
+    deployments = []
+    for i in range(n):
+        start = date(2024, 1, 1) + timedelta(days=rng.randrange(365 * 7))
+        deployments.append({
+            "id": f"d{i}", "name": f"D{i}", "type": rng.choice(["Land", "Ship", "Shore", "Other", "Unknown"]),
+            "startDate": start.isoformat(),
+            "endDate": (start + timedelta(days=rng.randrange(-3, 700))).isoformat() if rng.random() < 0.95 else "",
+            "clinPrice15": rng.choice([0, "", 360321.0, "181406.10", 0.1]),
+            "clinPriceSingle": rng.choice([0, 10600.91, "10499.75", 0.3]),
+            "clinPriceOverAbove": rng.choice([0, 315803.0, 0.7, None]),
+            "price": rng.choice([0, 900, 12.34]),
+        })
+    return deployments
+
+def expected_totals(deployments, group_by):
+    groups = {}
+    for item in generate_all_billing_items(deployments):
+        period = get_ordering_period(item["startDate"])
+        fields = {"deploymentId": item["deploymentId"], "type": item["type"],
+                  "fiscalYear": get_fiscal_year(item["startDate"]), "orderingPeriod": period["id"] if period else None}
+        groups.setdefault(tuple(fields[f] for f in group_by), []).append(item["amount"])
+    return {key: (len(amounts), math.fsum(amounts)) for key, amounts in groups.items()}
+
+class TestBillingTotals(unittest.TestCase):
+    def test_agrees_with_line_items(self):
+        # Property test over seeded random portfolios: every grouping must
+        # match the expanded line items exactly (counts and fsum of amounts).
+        groupings = [GROUP_FIELDS, ("type",), ("fiscalYear", "orderingPeriod"), ("deploymentId",), ()]
+        for seed in range(25):
+            deployments = random_deployments(random.Random(seed), 40)
+            for group_by in groupings:
+                rows = billing_totals(deployments, group_by)
+                actual = {tuple(r[f] for f in group_by): (r["count"], r["amount"]) for r in rows}
+                self.assertEqual(actual, expected_totals(deployments, group_by), (seed, group_by))
+
+    def test_splits_at_fiscal_year_boundary(self):
+        d = {"id": "d1", "name": "D1", "type": "Ship", "startDate": "2026-03-20", "endDate": "2026-04-20",
+             "clinPrice15": 100, "clinPriceSingle": 1}
+        rows = {(r["type"], r["fiscalYear"]): (r["count"], r["amount"]) for r in billing_totals([d], ("type", "fiscalYear"))}
+        # 15-day items start 03-20 (FY2026) and 04-04 (FY2027); two remainder days 04-19/20
+        self.assertEqual(rows, {("15-Day CLIN", 2026): (1, 100.0), ("15-Day CLIN", 2027): (1, 100.0),
+                                ("Daily Rate", 2027): (2, 2.0)})
+
+    def test_rejects_unknown_group(self):
+        with self.assertRaises(ValueError):
+            billing_totals([], ("month",))
+
+    def test_endpoint(self):
+        from api_testing import TestClient, main, use_temp_store
+        store = use_temp_store(self)
+        deployments = random_deployments(random.Random(99), 10)
+        for d in deployments:
+            store.upsert("deployments", d)
+        client = TestClient(main.app)
+        self.assertEqual(client.get("/api/billing-totals", params={"groupBy": "type"}).json(),
+                         billing_totals(deployments, ("type",)))
+        self.assertEqual(client.get("/api/billing-totals", params={"groupBy": "month"}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import random
+import unittest
+from unittest import mock
+
+import critical_path
+from api_testing import TestClient, main, use_temp_store
+from critical_path import DAY_MINUTES, LINK_TYPES, DependencyCycleError, ScheduleNetwork, cyclic_ids, find_cycle, item_times
+
+def item(item_id, start, end=None, **fields):
+    return {"id": item_id, "title": item_id, "type": "task", "startAt": start, "endAt": end, **fields}
+
+def link(link_id, pred, succ, kind="FS", lag=0):
+    return {"id": link_id, "predecessorId": pred, "successorId": succ, "type": kind, "lagMinutes": lag}
+
+ITEMS = [
+    item("A", "2026-01-05", "2026-01-07"),
+    item("B", "2026-01-05", "2026-01-06"),
+    item("C", "2026-01-05", "2026-01-05"),
+    item("D", "2026-01-05", "2026-01-05"),
+]
+LINKS = [
+    link("l1", "A", "B", "FS"),
+    link("l2", "A", "C", "SS", DAY_MINUTES),
+    link("l3", "C", "D", "FF"),
+]
+
+def random_network(rng, n, m):
+    items = [item(f"i{k}", f"2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}", None,
+                  durationMinutes=rng.choice([0, 60, DAY_MINUTES, 5 * DAY_MINUTES])) for k in range(n)]
+    links = []
+    for k in range(m):
+        a, b = sorted(rng.sample(range(n), 2))
+        links.append(link(f"l{k}", f"i{a}", f"i{b}", rng.choice(LINK_TYPES), rng.choice([0, 0, 120, -60, DAY_MINUTES])))
+    return items, links
+
+class TestScheduleNetwork(unittest.TestCase):
+    def rows(self, network):
+        return {row["id"]: row for row in network.results()["items"]}
+
+    def test_forward_and_backward_pass(self):
+        network = ScheduleNetwork(ITEMS, LINKS)
+        rows = self.rows(network)
+        self.assertEqual(rows["B"]["earlyStart"], "2026-01-08T00:00") # after A finishes
+        self.assertEqual(rows["C"]["earlyStart"], "2026-01-06T00:00") # A's start + 1 day
+        self.assertEqual(rows["D"]["earlyFinish"], "2026-01-07T00:00") # finishes with C
+        self.assertEqual(network.results()["projectFinish"], "2026-01-10T00:00")
+        self.assertEqual(network.results()["criticalPath"], ["A", "B"])
+
+        self.assertEqual(rows["A"]["lateFinish"], "2026-01-08T00:00")
+        self.assertEqual(rows["C"]["lateStart"], "2026-01-09T00:00")
+        self.assertEqual(rows["C"]["totalFloatMinutes"], 3 * DAY_MINUTES)
+        self.assertEqual(rows["C"]["freeFloatMinutes"], 0) # D finishes with it
+        self.assertEqual(rows["D"]["freeFloatMinutes"], 3 * DAY_MINUTES)
+
+    def test_start_to_finish_and_negative_lag(self):
+        items = [item("E", "2026-03-10", "2026-03-10"), item("F", "2026-03-01", "2026-03-02")]
+        rows = self.rows(ScheduleNetwork(items, [link("l", "E", "F", "SF", -60)]))
+        # F must finish no earlier than an hour before E starts
+        self.assertEqual(rows["F"]["earlyFinish"], "2026-03-09T23:00")
+        self.assertEqual(rows["F"]["earlyStart"], "2026-03-07T23:00")
+
+    def test_cycle_is_reported(self):
+        with self.assertRaises(DependencyCycleError) as caught:
+            ScheduleNetwork(ITEMS, LINKS + [link("l4", "D", "A")])
+        self.assertEqual(sorted(caught.exception.ids), ["A", "B", "C", "D"])
+
+    def test_links_to_unknown_items_are_skipped(self):
+        network = ScheduleNetwork(ITEMS, LINKS + [link("l5", "A", "missing"), link("l6", "A", "B", "XX")])
+        self.assertEqual(network.results()["skippedLinks"], ["l5", "l6"])
+
+    def test_move_matches_full_recompute(self):
+        rng = random.Random(7)
+        items, links = random_network(rng, 300, 900)
+        network = ScheduleNetwork(items, links)
+        for _ in range(200):
+            moved = rng.choice(items)
+            moved["startAt"] = f"2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"
+            if rng.random() < 0.5:
+                moved["durationMinutes"] = rng.choice([0, 30, DAY_MINUTES, 3 * DAY_MINUTES])
+            self.assertTrue(network.move(moved["id"], *item_times(moved)))
+            fresh = ScheduleNetwork(items, links)
+            self.assertEqual(network.early, fresh.early)
+            self.assertEqual(network.tail, fresh.tail)
+        self.assertFalse(network.move("missing", 0, 0))
+
+    def test_links_added_online_match_full_recompute(self):
+        rng = random.Random(11)
+        items, _ = random_network(rng, 200, 0)
+        network = ScheduleNetwork(items, [])
+        links = {}
+        for k in range(600):
+            a, b = rng.sample(range(200), 2)
+            new = link(f"l{rng.randint(0, 400)}", f"i{a}", f"i{b}", rng.choice(LINK_TYPES), rng.choice([0, 120, -60]))
+            cycle = network.cycle_with(new)
+            self.assertEqual(cycle is not None, bool(cyclic_ids({**links, new["id"]: new}.values())))
+            if cycle:
+                self.assertRaises(DependencyCycleError, network.add_link, new)
+                self.assertEqual(cycle[0], cycle[-1])
+            else:
+                network.add_link(new)
+                links[new["id"]] = new
+            if k % 50 == 0 and links:
+                network.remove_link(rng.choice(list(links)))
+                links.pop(next(i for i in links if i not in network.links))
+            fresh = ScheduleNetwork(items, list(links.values()))
+            self.assertEqual(network.early, fresh.early)
+            self.assertEqual(network.tail, fresh.tail)
+            for e in network.links.values():
+                self.assertLess(network.position[network.link_from[e]], network.position[network.link_to[e]])
+
+    def test_adjacency_without_numpy(self):
+        items, links = random_network(random.Random(5), 200, 600)
+        with mock.patch.object(critical_path, "np", None):
+            plain = ScheduleNetwork(items, links)
+        network = ScheduleNetwork(items, links)
+        for adjacency, expected in ((plain.succ, network.succ), (plain.pred, network.pred)):
+            self.assertEqual((adjacency.links, adjacency.offsets), (expected.links, expected.offsets))
+        self.assertEqual(plain.results(), network.results())
+
+    def test_results_are_built_once_per_change(self):
+        network = ScheduleNetwork(ITEMS, LINKS)
+        rows = network.results()["items"]
+        self.assertIs(network.results()["items"], rows)
+        self.assertEqual(network.results(critical_only=True)["items"], [rows[0], rows[1]])
+        network.move("C", *item_times(item("C", "2026-01-20", "2026-01-22")))
+        moved = network.results()["items"]
+        self.assertIsNot(moved, rows)
+        self.assertEqual(moved, ScheduleNetwork([*ITEMS[:2], item("C", "2026-01-20", "2026-01-22"), ITEMS[3]],
+                                                LINKS).results()["items"])
+
+    def test_find_cycle(self):
+        self.assertIsNone(find_cycle(LINKS, link("l4", "A", "D")))
+        self.assertEqual(find_cycle(LINKS, link("l4", "D", "A")), ["D", "A", "C", "D"])
+        self.assertIsNone(find_cycle(LINKS, link("l3", "D", "C"))) # replaces C -> D
+
+class TestCriticalPathView(unittest.TestCase):
+    def setUp(self):
+        self.store = use_temp_store(self, {
+            "deployments": [{"id": "d1", "name": "Dep", "startDate": "2026-01-01", "endDate": "2026-01-04"}],
+            "scheduleItems": [dict(i) for i in ITEMS],
+            "scheduleDependencies": LINKS + [link("l0", "dep_d1", "A")],
+        })
+        self.client = TestClient(main.app)
+
+    def assert_matches_rebuild(self):
+        network = main.critical_path.network()
+        fresh = ScheduleNetwork(main.assembler.items(), self.store.get("scheduleDependencies"))
+        self.assertEqual(network.results(), fresh.results())
+        return network
+
+    def test_edits_move_nodes_in_place(self):
+        network = self.assert_matches_rebuild()
+        self.store.update("deployments", "d1", {"endDate": "2026-01-09"}) # pushes A, then B
+        self.store.upsert("scheduleItems", item("C", "2026-01-20", "2026-01-22"))
+        self.assertIs(self.assert_matches_rebuild(), network)
+        self.assertEqual(network.results()["criticalPath"], ["C", "D"]) # C now ends last
+
+    def test_structural_edits_rebuild(self):
+        network = self.assert_matches_rebuild()
+        self.store.upsert("scheduleItems", item("E", "2026-02-01", "2026-02-01"))
+        rebuilt = self.assert_matches_rebuild()
+        self.assertIsNot(rebuilt, network)
+        # Linking an item to the deployment replaces dep_d1 with the item's id
+        self.store.upsert("scheduleItems", item("E", "2026-02-01", "2026-02-01", deploymentId="d1"))
+        self.assertNotIn("dep_d1", self.assert_matches_rebuild().index)
+        self.store.upsert("scheduleItems", item("E", "2026-02-01", "2026-02-01"))
+        self.assertIn("dep_d1", self.assert_matches_rebuild().index)
+        self.store.delete("scheduleDependencies", "l0")
+        self.assert_matches_rebuild()
+
+    def test_endpoint(self):
+        body = self.client.get("/api/scheduler/critical-path").json()
+        self.assertEqual(body["criticalPath"], ["dep_d1", "A", "B"])
+        self.assertEqual(len(body["items"]), 5)
+        critical = self.client.get("/api/scheduler/critical-path", params={"criticalOnly": True}).json()
+        self.assertEqual([row["id"] for row in critical["items"]], ["dep_d1", "A", "B"])
+
+        self.store.upsert("scheduleDependencies", link("loop", "B", "dep_d1"))
+        res = self.client.get("/api/scheduler/critical-path")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(sorted(res.json()["detail"]["cycle"]), ["A", "B", "C", "D", "dep_d1"])
+
+    def test_save_dependency_is_validated(self):
+        network = main.critical_path.network()
+        res = self.client.post("/api/scheduler/dependencies", json=link("l9", "B", "missing"))
+        self.assertEqual(res.status_code, 400)
+        res = self.client.post("/api/scheduler/dependencies", json=link("l9", "B", "D", "XX"))
+        self.assertEqual(res.status_code, 400)
+        res = self.client.post("/api/scheduler/dependencies", json=link("l9", "D", "dep_d1"))
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.json()["detail"]["cycle"], ["D", "dep_d1", "A", "C", "D"])
+        self.assertIsNone(self.store.find("scheduleDependencies", "l9"))
+
+        res = self.client.post("/api/scheduler/dependencies", json=link("l9", "B", "D"))
+        self.assertEqual(res.status_code, 200)
+        self.assertIs(self.assert_matches_rebuild(), network) # applied in place
+        self.client.delete("/api/scheduler/dependencies/l9")
+        self.assertIs(self.assert_matches_rebuild(), network)
+
+    def test_undated_items_are_checked_too(self):
+        self.store.upsert("scheduleItems", {"id": "U", "title": "U", "type": "task"})
+        self.client.post("/api/scheduler/dependencies", json=link("lu", "D", "U"))
+        res = self.client.post("/api/scheduler/dependencies", json=link("lv", "U", "A"))
+        self.assertEqual(res.status_code, 409)
+
+    def test_batch(self):
+        res = self.client.post("/api/scheduler/dependencies/batch", json={"dependencies": [
+            link("b1", "B", "D"), link("b2", "D", "dep_d1")]})
+        self.assertEqual(res.status_code, 409)
+        self.assertIsNone(self.store.find("scheduleDependencies", "b1"))
+        res = self.client.post("/api/scheduler/dependencies/batch", json={"dependencies": [
+            link("b1", "B", "D"), link("b2", "dep_d1", "D")]})
+        self.assertEqual(res.json(), {"status": "success", "count": 2})
+        self.assert_matches_rebuild()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from date_utils import ORDERING_PERIODS, get_fiscal_year, get_ordering_period, parse_date
+
+class TestDateUtils(unittest.TestCase):
+    def test_parse_date_matches_strptime(self):
+        for value in ["2026-01-05", "2024-02-29", "2026-1-5", "2026-01-5", "0999-12-31"]:
+            self.assertEqual(parse_date(value), datetime.strptime(value, "%Y-%m-%d").date(), value)
+        for value in ["2026-02-30", "2026-01-05T08:00", "20260105", "2026-W01-1", "", "soon"]:
+            with self.assertRaises(ValueError, msg=value):
+                parse_date(value)
+        with self.assertRaises(TypeError):
+            parse_date(None)
+
+    def test_ordering_period_matches_linear_scan(self):
+        def linear(value):
+            dt = datetime.strptime(value, "%Y-%m-%d").date()
+            return next((p for p in ORDERING_PERIODS
+                         if datetime.strptime(p["start"], "%Y-%m-%d").date() <= dt <= datetime.strptime(p["end"], "%Y-%m-%d").date()), None)
+
+        day = date(2024, 7, 1)
+        while day <= date(2029, 10, 15):
+            self.assertEqual(get_ordering_period(day.isoformat()), linear(day.isoformat()), day)
+            day += timedelta(days=1)
+        self.assertIsNone(get_ordering_period(""))
+
+    def test_fiscal_year(self):
+        self.assertEqual(get_fiscal_year("2026-03-31"), 2026)
+        self.assertEqual(get_fiscal_year("2026-04-01"), 2027)
+        self.assertEqual(get_fiscal_year(""), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fastjson
+from api_testing import TestClient, main, use_temp_store
+from store import DataStore, JsonStorage, open_storage
+
+class TestFastJson(unittest.TestCase):
+    def test_round_trip(self):
+        value = {"name": "Déploiement", "n": [1, 2.5, None, True], "nested": {"a": {}}}
+        self.assertIsInstance(fastjson.dumps(value), bytes)
+        self.assertEqual(fastjson.loads(fastjson.dumps(value)), value)
+        self.assertEqual(fastjson.loads(fastjson.dumps(value).decode("utf-8")), value)
+        self.assertNotIn(b" ", fastjson.dumps({"a": [1, 2]}))
+        self.assertIn(b"\n", fastjson.dumps({"a": [1, 2]}, pretty=True))
+
+class TestDataFormat(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "data.json")
+
+    def write_snapshot(self, storage):
+        store = DataStore(self.path, {"deployments": []}, storage=storage)
+        store.load()
+        store.upsert("deployments", {"id": "d1", "name": "A"})
+        store.compact()
+        store.close()
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_compact_snapshot_is_smaller_and_equivalent(self):
+        pretty = self.write_snapshot(open_storage({}, self.path))
+        os.remove(self.path)
+        compact = self.write_snapshot(open_storage({"dataFormat": "compact"}, self.path))
+        self.assertLess(len(compact), len(pretty))
+        self.assertNotIn(b"\n", compact)
+        self.assertEqual(fastjson.loads(compact), fastjson.loads(pretty))
+
+        reloaded = DataStore(self.path, {}, storage=JsonStorage(self.path, pretty=False))
+        reloaded.load()
+        self.addCleanup(reloaded.close)
+        self.assertEqual(reloaded.find("deployments", "d1")["name"], "A")
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            open_storage({"dataFormat": "yaml"}, self.path)
+
+class TestPreEncodedResponses(unittest.TestCase):
+    def setUp(self):
+        self.store = use_temp_store(self, {"deployments": [{"id": "d1"}]})
+        self.client = TestClient(main.app)
+
+    def test_data_is_encoded_once_per_revision(self):
+        with mock.patch("main.fastjson.dumps", wraps=fastjson.dumps) as dumps:
+            first = self.client.get("/api/data")
+            second = self.client.get("/api/data")
+            self.assertEqual(dumps.call_count, 1)
+            self.assertEqual(first.content, second.content)
+            self.assertEqual(first.json(), {"deployments": [{"id": "d1"}]})
+            self.assertEqual(first.headers["content-type"], "application/json")
+            self.assertEqual(first.headers["etag"], f'"{self.store.revision}"')
+
+            self.assertEqual(self.client.get("/api/data", headers={"If-None-Match": first.headers["etag"]}).status_code, 304)
+
+            self.store.upsert("deployments", {"id": "d2"})
+            dumps.reset_mock() # the journal encodes the edit too
+            third = self.client.get("/api/data")
+            self.assertEqual(dumps.call_count, 1)
+            self.assertEqual([d["id"] for d in third.json()["deployments"]], ["d1", "d2"])
+
+if __name__ == '__main__':
+    unittest.main()
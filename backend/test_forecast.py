@@ -0,0 +1,54 @@
+import math
+import random
+import unittest
+from collections import defaultdict
+
+from forecast import RevenueForecast
+from logic_billing import generate_all_billing_items
+from test_billing_totals import random_deployments
+
+PRICING = {"1": {"land15": "1500", "landOA": "300", "ship15": "900", "ship1": "70"},
+           "2": {"land15": "3000", "landOA": 0, "ship15": "1800", "ship1": "140"}}
+
+def total(rows, **match):
+    return math.fsum(r["amount"] for r in rows if all(r[k] == v for k, v in match.items()))
+
+class TestRevenueForecast(unittest.TestCase):
+    def test_prices_from_ordering_period_table(self):
+        d = {"id": "d1", "type": "Ship", "startDate": "2025-01-01", "endDate": "2025-02-01"}  # 2 periods + 2 days, all OP1
+        rows = RevenueForecast(PRICING).cube([d])
+        self.assertAlmostEqual(total(rows, type="15-Day CLIN"), 2 * 900)
+        self.assertAlmostEqual(total(rows, type="Daily Rate"), 2 * 70)
+        self.assertEqual({r["month"] for r in rows}, {"2025-01", "2025-02"})
+        self.assertAlmostEqual(total(rows, month="2025-01"), 30 * 60 + 70)  # Jan 31 is a remainder day
+
+    def test_period_straddling_op_boundary_is_split(self):
+        # OP1 ends 2025-09-30: one 15-day period with 5 days in OP1 and 10 in OP2
+        d = {"id": "d1", "type": "Land", "startDate": "2025-09-26", "endDate": "2025-10-10"}
+        rows = RevenueForecast(PRICING).cube([d])
+        self.assertAlmostEqual(total(rows, orderingPeriod="1", type="15-Day CLIN"), 1500 * 5 / 15)
+        self.assertAlmostEqual(total(rows, orderingPeriod="2", type="15-Day CLIN"), 3000 * 10 / 15)
+        self.assertAlmostEqual(total(rows, orderingPeriod="1", type="Over & Above"), 300 * 5 / 15)
+        # OP2 has no O&A rate: falls back to the deployment's own (none here)
+        self.assertEqual(total(rows, orderingPeriod="2", type="Over & Above"), 0)
+        self.assertEqual({r["fiscalYear"] for r in rows}, {2026})
+
+    def test_without_table_matches_billing_items(self):
+        # No pricing table: every rate falls back to the deployment, so per-type
+        # revenue equals the billing line items.
+        deployments = random_deployments(random.Random(4), 60)
+        rows = RevenueForecast({}).cube(deployments)
+        expected = defaultdict(list)
+        for item in generate_all_billing_items(deployments):
+            expected[item["type"]].append(item["amount"])
+        for kind, amounts in expected.items():
+            self.assertAlmostEqual(total(rows, type=kind), math.fsum(amounts), places=3)
+
+    def test_cache_reuses_shapes(self):
+        forecast = RevenueForecast(PRICING)
+        shape = {"type": "Ship", "startDate": "2025-03-01", "endDate": "2025-06-30"}
+        forecast.cube([dict(shape, id=f"w{i}") for i in range(100)])
+        self.assertEqual(len(forecast._cells), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from indexes import IndexedCollection
+
+class TestIndexedCollection(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"id": "a1", "scheduleItemId": "s1", "resourceId": "r1"},
+            {"id": "a2", "scheduleItemId": "s1", "resourceId": "r2"},
+            {"id": "a3", "scheduleItemId": "s2", "resourceId": "r1"},
+        ]
+        self.coll = IndexedCollection(self.records, ("scheduleItemId", "resourceId"))
+
+    def test_lookups(self):
+        self.assertEqual(self.coll.get("a2")["resourceId"], "r2")
+        self.assertIsNone(self.coll.get("missing"))
+        self.assertEqual([r["id"] for r in self.coll.by("scheduleItemId", "s1")], ["a1", "a2"])
+        self.assertEqual(self.coll.first("resourceId", "r1")["id"], "a1")
+        self.assertEqual(self.coll.by("resourceId", "nobody"), [])
+
+    def test_upsert_moves_secondary_entries(self):
+        self.coll.upsert({"id": "a1", "scheduleItemId": "s2", "resourceId": "r1"})
+        self.coll.upsert({"id": "a4", "scheduleItemId": "s3"})
+        self.assertEqual(self.coll.ids_by("scheduleItemId", "s1"), ["a2"])
+        self.assertEqual(self.coll.ids_by("scheduleItemId", "s2"), ["a1", "a3"])
+        self.assertEqual(self.records[-1]["id"], "a4")
+        self.assertEqual(len(self.records), 4)
+
+    def test_lookups_follow_list_order_after_moves(self):
+        # a3 moves into s1's bucket after a1 and a2, but a1 leaves and returns
+        self.coll.upsert({"id": "a1", "scheduleItemId": "s2", "resourceId": "r1"})
+        self.coll.upsert({"id": "a3", "scheduleItemId": "s1", "resourceId": "r1"})
+        self.coll.upsert({"id": "a1", "scheduleItemId": "s1", "resourceId": "r1"})
+        self.assertEqual(self.coll.ids_by("scheduleItemId", "s1"), ["a1", "a2", "a3"])
+        self.assertEqual(self.coll.first("scheduleItemId", "s1")["id"], "a1")
+        self.assertEqual(self.coll.first("resourceId", "r1"),
+                         next(r for r in self.records if r.get("resourceId") == "r1"))
+        self.coll.delete("a1")
+        self.assertEqual(self.coll.first("scheduleItemId", "s1")["id"], "a2")
+
+    def test_update_reindexes_changed_fields(self):
+        self.assertTrue(self.coll.update("a3", {"resourceId": "r2"}))
+        self.assertFalse(self.coll.update("missing", {"resourceId": "r2"}))
+        self.assertEqual(self.coll.ids_by("resourceId", "r1"), ["a1"])
+        self.assertEqual(self.coll.ids_by("resourceId", "r2"), ["a2", "a3"])
+
+    def test_delete_keeps_positions_in_sync(self):
+        self.assertTrue(self.coll.delete("a1"))
+        self.assertFalse(self.coll.delete("a1"))
+        self.assertEqual([r["id"] for r in self.records], ["a2", "a3"])
+        self.assertEqual(self.coll.get("a3")["scheduleItemId"], "s2")
+        self.assertEqual(self.coll.ids_by("scheduleItemId", "s1"), ["a2"])
+
+    def test_duplicate_ids_first_wins_and_delete_removes_all(self):
+        records = [{"id": "x", "n": 1}, {"id": "y"}, {"id": "x", "n": 2}]
+        coll = IndexedCollection(records)
+        self.assertEqual(coll.get("x")["n"], 1)
+        coll.delete("x")
+        self.assertEqual(records, [{"id": "y"}])
+        self.assertEqual(coll.get("y"), {"id": "y"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from api_testing import main, use_temp_store
+from interval_index import CollectionIntervals, IntervalIndex, span_of
+from logic_billing import generate_all_billing_items
+from store import DataStore
+
+def brute_force(spans, lo, hi):
+    return sorted(k for k, (s, e) in spans.items() if s <= hi and e >= lo)
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_matches_brute_force_under_random_edits(self):
+        rng = random.Random(7)
+        index = IntervalIndex()
+        spans = {}
+        for step in range(3000):
+            key = f"k{rng.randrange(400)}"
+            if rng.random() < 0.25:
+                self.assertEqual(index.remove(key), spans.pop(key, None) is not None)
+            else:
+                start = rng.randrange(1000)
+                end = start + rng.randrange(60)
+                index.add(key, start, end)
+                spans[key] = (start, end)
+            if step % 50 == 0:
+                lo = rng.randrange(1000)
+                hi = lo + rng.randrange(100)
+                self.assertEqual(sorted(index.overlapping(lo, hi)), brute_force(spans, lo, hi))
+        self.assertEqual(len(index), len(spans))
+
+    def test_build_then_edit(self):
+        rng = random.Random(3)
+        spans = {}
+        for i in range(500):
+            start = rng.randrange(1000)
+            spans[f"k{i}"] = (start, start + rng.randrange(30))
+        index = IntervalIndex()
+        index.build((k, s, e) for k, (s, e) in spans.items())
+        for i in range(0, 500, 3):
+            index.remove(f"k{i}")
+            del spans[f"k{i}"]
+        index.add("new", 10, 990)
+        spans["new"] = (10, 990)
+        for lo in range(0, 1000, 97):
+            result = index.overlapping(lo, lo + 20)
+            self.assertEqual(sorted(result), brute_force(spans, lo, lo + 20))
+            starts = [index.span(k)[0] for k in result]
+            self.assertEqual(starts, sorted(starts))
+
+    def test_span_of(self):
+        jan1 = date(2026, 1, 1).toordinal()
+        self.assertEqual(span_of("2026-01-01", "2026-01-03"), (jan1, jan1 + 2))
+        self.assertEqual(span_of("2026-01-01T08:00", None), (jan1, jan1))
+        self.assertIsNone(span_of("", "2026-01-03"))
+
+class TestCollectionIntervals(unittest.TestCase):
+    def test_follows_store_edits(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = DataStore(os.path.join(tmp.name, "data.json"), {"overhead": []})
+        windows = CollectionIntervals(store, "overhead", lambda o: span_of(o.get("startDate"), o.get("endDate")))
+        store.load()
+        self.addCleanup(store.close)
+        store.upsert("overhead", {"id": "o1", "startDate": "2026-01-01", "endDate": "2026-01-31"})
+        store.upsert("overhead", {"id": "o2", "startDate": "2026-03-01", "endDate": "2026-03-31"})
+        feb = (date(2026, 2, 1).toordinal(), date(2026, 2, 28).toordinal())
+        self.assertEqual(windows.overlapping(*feb), [])
+
+        store.update("overhead", "o2", {"startDate": "2026-02-20"})
+        store.upsert("overhead", {"id": "o3", "startDate": "bad"})
+        self.assertEqual([o["id"] for o in windows.overlapping(*feb)], ["o2"])
+        store.delete("overhead", "o2")
+        self.assertEqual(windows.overlapping(*feb), [])
+
+class TestWindowedEndpoints(unittest.TestCase):
+    """?from=&to= results must equal the full computation restricted to the window."""
+
+    def setUp(self):
+        store = use_temp_store(self)
+
+        rng = random.Random(11)
+        base = date(2025, 1, 1)
+        for i in range(40):
+            start = base + timedelta(days=rng.randrange(700))
+            end = start + timedelta(days=rng.randrange(5, 90))
+            seg = lambda: {"categoryId": rng.choice(["lc_1", "lc_2"]), "hours": rng.choice([4, 8, 10]),
+                           "isOvertimeEligible": rng.random() < 0.5,
+                           "duration": rng.randrange(0, 20), "offset": rng.randrange(0, 10)}
+            store.upsert("deployments", {
+                "id": f"d{i}", "name": f"D{i}", "type": rng.choice(["Land", "Ship", "Other"]),
+                "startDate": start.isoformat(), "endDate": end.isoformat(),
+                "clinPrice15": 1500, "clinPriceSingle": 100, "clinPriceOverAbove": 50, "price": 900,
+                "laborPlan": {"pre": [seg()], "during": [seg()], "post": [seg()]},
+            })
+            store.upsert("resourceAssignments", {"id": f"a{i}", "scheduleItemId": f"dep_d{i}", "resourceId": "res_1",
+                                                 "allocationMode": "fte", "allocationValue": 0.5})
+        store.upsert("overhead", {"id": "o1", "categoryId": "lc_1", "startDate": "2025-06-10",
+                                  "endDate": "2025-09-20", "hours": 2})
+
+    def test_monthly_labor_window(self):
+        full = main.aggregate_monthly_hours(*(main.store.get(k, []) for k in (
+            "deployments", "overhead", "laborCategories", "resourceAssignments", "scheduleItems")))
+        windowed = main.monthly_labor_in_window("2025-05-17", "2025-11-03")
+        expected = {k: v for k, v in full.items() if "2025-05" <= k <= "2025-11"}
+        self.assertEqual(sorted(windowed), sorted(expected))
+        for month, cats in expected.items():
+            for cat, hours in cats.items():
+                self.assertAlmostEqual(windowed[month][cat], hours, places=6)
+
+    def test_custom_allocations_outside_item_span(self):
+        store = main.store
+        rng = random.Random(12)
+        store.upsert("scheduleItems", {"id": "s1", "title": "S", "startAt": "2025-01-01", "endAt": "2025-01-10"})
+        store.upsert("resourceAssignments", {"id": "c0", "scheduleItemId": "s1", "resourceId": "r",
+                                             "spread": "custom", "perDayAllocations": {"2025-03-15": 5}})
+        for i in range(20):
+            day = lambda: (date(2025, 1, 1) + timedelta(days=rng.randrange(900))).isoformat()
+            store.upsert("resourceAssignments", {
+                "id": f"c{i + 1}", "scheduleItemId": rng.choice(["s1", f"dep_d{rng.randrange(40)}"]),
+                "resourceId": rng.choice(["r", "res_1"]), "spread": "custom",
+                "perDayAllocations": {day(): rng.choice([2, 5, 8]) for _ in range(rng.randrange(1, 4))}})
+
+        self.assertEqual(main.monthly_labor_in_window("2025-03-01", "2025-03-31")["2025-03"]["r"],
+                         main.labor_cache.monthly()["2025-03"]["r"])
+        full = main.labor_cache.monthly()
+        for _ in range(10):
+            start = date(2025, 1, 1) + timedelta(days=rng.randrange(800))
+            end = start + timedelta(days=rng.randrange(1, 200))
+            windowed = main.monthly_labor_in_window(start.isoformat(), end.isoformat())
+            expected = {k: v for k, v in full.items() if start.isoformat()[:7] <= k <= end.isoformat()[:7]}
+            self.assertEqual(sorted(windowed), sorted(expected))
+            for month, cats in expected.items():
+                self.assertEqual(sorted(windowed[month]), sorted(cats))
+                for cat, hours in cats.items():
+                    self.assertAlmostEqual(windowed[month][cat], hours, places=6)
+
+    def test_billing_items_window(self):
+        full = generate_all_billing_items(main.store.get("deployments"))
+        expected = [i for i in full if i["startDate"] <= "2025-08-31" and i["endDate"] >= "2025-08-01"]
+        windowed = list(main.billing_item_stream("2025-08-01", "2025-08-31"))
+        self.assertEqual(sorted(i["id"] for i in windowed), sorted(i["id"] for i in expected))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from labor_cache import MonthlyLaborCache
+from logic_labor import aggregate_monthly_hours
+from store import DataStore
+
+INITIAL = {"deployments": [], "overhead": [], "laborCategories": [], "resourceAssignments": [], "scheduleItems": [], "resources": []}
+
+class TestMonthlyLaborCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = DataStore(os.path.join(tmp.name, "data.json"), INITIAL)
+        self.cache = MonthlyLaborCache(self.store)
+        self.store.load()
+        self.addCleanup(self.store.close)
+        self.rng = random.Random(5)
+        for i in range(30):
+            self.store.upsert("deployments", self.deployment(f"d{i}"))
+            self.store.upsert("resourceAssignments", {"id": f"a{i}", "scheduleItemId": f"dep_d{i}", "resourceId": "res_1",
+                                                      "allocationMode": "fte", "allocationValue": 0.5})
+        self.store.upsert("scheduleItems", {"id": "s1", "title": "Task", "startAt": "2025-03-03", "endAt": "2025-03-20"})
+        self.store.upsert("resourceAssignments", {"id": "a_s1", "scheduleItemId": "s1", "resourceId": "res_2",
+                                                  "allocationMode": "hours", "allocationValue": 36})
+        self.store.upsert("overhead", {"id": "o1", "categoryId": "lc_1", "hours": 2, "startDate": "2025-01-01", "endDate": "2025-12-31"})
+        self.store.upsert("laborCategories", {"id": "lc_1", "name": "Engineer"})
+
+    def deployment(self, deployment_id):
+        rng = self.rng
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(300))
+        seg = lambda: {"categoryId": rng.choice(["lc_1", "lc_2"]), "hours": rng.choice([4, 8, 12]),
+                       "isOvertimeEligible": rng.random() < 0.6, "duration": rng.randrange(0, 20), "offset": rng.randrange(0, 5)}
+        return {"id": deployment_id, "name": deployment_id, "startDate": start.isoformat(),
+                "endDate": (start + timedelta(days=rng.randrange(10, 60))).isoformat(),
+                "laborPlan": {"pre": [seg()], "during": [seg(), seg()], "post": [seg()]}}
+
+    def assertMatchesFullAggregation(self):
+        expected = aggregate_monthly_hours(*(self.store.get(k, []) for k in (
+            "deployments", "overhead", "laborCategories", "resourceAssignments", "scheduleItems")), engine="python",
+            resources=self.store.get("resources", []))
+        actual = self.cache.monthly()
+        self.assertEqual(sorted(actual), sorted(expected))
+        for month, cats in expected.items():
+            self.assertEqual(sorted(actual[month]), sorted(cats))
+            for cat, hours in cats.items():
+                self.assertAlmostEqual(actual[month][cat], hours, places=6)
+
+    def test_matches_full_aggregation_through_edits(self):
+        self.assertMatchesFullAggregation()
+        for step in range(40):
+            i = self.rng.randrange(35)
+            roll = self.rng.random()
+            if roll < 0.5:
+                self.store.upsert("deployments", self.deployment(f"d{i}"))
+            elif roll < 0.7:
+                self.store.delete("deployments", f"d{i}")
+            elif roll < 0.85:
+                self.store.update("resourceAssignments", f"a{i % 30}", {"allocationValue": self.rng.choice([0.25, 1])})
+            else:
+                self.store.update("scheduleItems", "s1", {"endAt": (date(2025, 3, 10) + timedelta(days=i)).isoformat()})
+            if step % 5 == 0:
+                self.assertMatchesFullAggregation()
+        self.assertMatchesFullAggregation()
+
+    def test_edit_recomputes_only_affected_records(self):
+        self.cache.monthly()
+        with mock.patch.object(self.cache, "_contribution", wraps=self.cache._contribution) as contribution:
+            self.store.update("deployments", "d3", {"endDate": "2025-12-01"})
+            self.cache.monthly()
+        self.assertEqual(sorted(c.args[0] for c in contribution.call_args_list),
+                         [("deployments", "d3"), ("resourceAssignments", "a3")])
+        self.assertMatchesFullAggregation()
+
+    def test_resource_calendar_edit(self):
+        self.cache.monthly()
+        self.store.upsert("resources", {"id": "res_2", "calendar": {"workingDays": [1, 2, 3, 4, 5]}})
+        self.assertMatchesFullAggregation()
+        self.assertAlmostEqual(self.cache.monthly()["2025-03"]["res_2"], 36)
+        self.store.update("resources", "res_1", {"defaultCapacityHoursPerDay": 6})
+        self.assertMatchesFullAggregation()
+
+    def test_category_edit_invalidates_users(self):
+        self.cache.monthly()
+        users = {("overhead", "o1")} | {("deployments", d["id"]) for d in self.store.get("deployments")
+                                         if "lc_1" in str(d["laborPlan"])}
+        with mock.patch.object(self.cache, "_contribution", wraps=self.cache._contribution) as contribution:
+            self.store.update("laborCategories", "lc_1", {"name": "Senior Engineer"})
+            self.cache.monthly()
+        self.assertEqual({c.args[0] for c in contribution.call_args_list}, users)
+
+    def test_replace_rebuilds(self):
+        self.cache.monthly()
+        self.store.replace(dict(INITIAL, overhead=[{"id": "o9", "categoryId": "lc_9", "hours": 1,
+                                                   "startDate": "2026-01-01", "endDate": "2026-01-31"}]))
+        self.assertEqual(self.cache.monthly(), {"2026-01": {"lc_9": 31.0}})
+
+    def test_malformed_record_contributes_nothing(self):
+        before = self.cache.monthly()
+        self.store.upsert("overhead", {"id": "bad", "categoryId": "lc_1", "hours": 2, "startDate": "soon", "endDate": "later"})
+        self.assertEqual(self.cache.monthly(), before)
+        self.store.delete("overhead", "bad")
+        self.assertMatchesFullAggregation()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import random
+import unittest
+from datetime import date, timedelta
+
+import labor_engine
+from logic_labor import ItemDateIndex, aggregate_monthly_hours, parse_date
+
+def random_plan(rng, n_deployments=60):
+    base = date(2025, 1, 1)
+    deployments, assignments, items = [], [], []
+    for i in range(n_deployments):
+        start = base + timedelta(days=rng.randrange(900))
+        end = start + timedelta(days=rng.randrange(-3, 120))
+        seg = lambda: {"categoryId": rng.choice(["lc_1", "lc_2", "lc_3"]), "hours": rng.choice([2, 4, 7.5, 8, 10, 12]),
+                       "isOvertimeEligible": rng.random() < 0.6,
+                       "duration": rng.randrange(0, 30), "offset": rng.randrange(0, 15)}
+        deployments.append({
+            "id": f"d{i}", "startDate": start.isoformat(),
+            "endDate": end.isoformat() if rng.random() < 0.95 else None,
+            "laborPlan": {k: [seg() for _ in range(rng.randrange(3))] for k in ("pre", "during", "post")},
+        })
+        items.append({"id": f"s{i}", "startAt": start.isoformat(), "endAt": (start + timedelta(days=rng.randrange(40))).isoformat()})
+        target = rng.choice([f"d{i}", f"dep_d{i}", f"s{i}", "missing"])
+        if not deployments[-1]["endDate"]:
+            target = f"s{i}"  # an open-ended deployment has no dates to spread over
+        assignments.append({"id": f"a{i}", "scheduleItemId": target, "resourceId": rng.choice(["res_1", "lc_1"]),
+                            "allocationMode": rng.choice(["hours", "fte", "percent", "other"]),
+                            "allocationValue": rng.choice([0.5, 1, 16, 50, 333])})
+    overhead = [{"id": f"o{i}", "categoryId": rng.choice(["lc_1", "lc_4"]), "hours": rng.choice([1, 2.5]),
+                 "startDate": (base + timedelta(days=30 * i)).isoformat(),
+                 "endDate": (base + timedelta(days=30 * i + rng.randrange(-5, 200))).isoformat()} for i in range(12)]
+    return deployments, overhead, [], assignments, items
+
+@unittest.skipUnless(labor_engine.available(), "numpy not installed")
+class TestNumpyLaborEngine(unittest.TestCase):
+    def test_identical_to_python_engine(self):
+        for seed in range(8):
+            args = random_plan(random.Random(seed))
+            expected = aggregate_monthly_hours(*args, engine="python")
+            actual = aggregate_monthly_hours(*args, engine="numpy")
+            self.assertEqual(actual, expected)
+            self.assertEqual(list(actual), list(expected))
+            self.assertEqual([list(v) for v in actual.values()], [list(v) for v in expected.values()])
+
+    def test_calendars_and_spreads_identical_to_python_engine(self):
+        resources = [{"id": "res_1", "defaultCapacityHoursPerDay": 6,
+                      "calendar": {"workingDays": [1, 2, 3, 4, 5], "nonWorkingDates": ["2025-07-04"],
+                                   "exceptions": {"2025-03-01": 3}}},
+                     {"id": "lc_1", "calendar": {"workingDays": [1, 3, 5]}}]
+        for seed in range(8):
+            rng = random.Random(seed)
+            args = random_plan(rng)
+            for a in args[3]:
+                a["spread"] = rng.choice(["uniform", "front_loaded", "back_loaded", "custom"])
+                a["perDayAllocations"] = {"2025-03-0" + str(rng.randint(1, 9)): 2}
+            expected = aggregate_monthly_hours(*args, engine="python", resources=resources)
+            actual = aggregate_monthly_hours(*args, engine="numpy", resources=resources)
+            self.assertEqual(actual, expected)
+            self.assertEqual([list(v) for v in actual.values()], [list(v) for v in expected.values()])
+            self.assertNotEqual(expected, aggregate_monthly_hours(*args, engine="python"))
+
+    def test_overtime_premium(self):
+        plan = {"during": [{"categoryId": "lc_1", "hours": 10, "isOvertimeEligible": True},
+                           {"categoryId": "lc_2", "hours": 2, "isOvertimeEligible": False}]}
+        # Mon 2026-01-05 .. Sun 2026-01-11: 70 eligible hours, 30 of them overtime
+        deployments = [{"id": "d1", "startDate": "2026-01-05", "endDate": "2026-01-11", "laborPlan": plan}]
+        result = aggregate_monthly_hours(deployments, [], [], engine="numpy")
+        self.assertEqual(list(result), ["2026-01"])
+        self.assertAlmostEqual(result["2026-01"]["lc_1"], 85.0)
+        self.assertEqual(result["2026-01"]["lc_2"], 14.0)
+
+    def test_timeline_matches_python_engine(self):
+        for seed in range(8):
+            args = random_plan(random.Random(seed))
+            expected = aggregate_monthly_hours(*args, engine="python")
+            actual = aggregate_monthly_hours(*args, engine="timeline")
+            self.assertEqual(sorted(actual), sorted(expected))
+            for month, cats in expected.items():
+                self.assertEqual(sorted(actual[month]), sorted(cats))
+                for cat, hours in cats.items():
+                    self.assertAlmostEqual(actual[month][cat], hours, places=6)
+
+    def test_timeline_memory_is_per_day(self):
+        during = [{"categoryId": "lc_1", "hours": 1} for _ in range(10)]
+        deployments = [{"id": f"d{i}", "startDate": "2026-01-01", "endDate": "2026-12-31", "laborPlan": {"during": during}}
+                       for i in range(20)]
+        timeline = labor_engine.LaborTimeline.build(deployments, [])
+        self.assertEqual(timeline.hours.shape, (1, 2, 365))
+        self.assertEqual(timeline.monthly_hours()["2026-02"], {"lc_1": 200.0 * 28})
+
+    def test_empty(self):
+        self.assertEqual(aggregate_monthly_hours([], [], [], engine="numpy"), {})
+        self.assertEqual(aggregate_monthly_hours([], [], [], engine="timeline"), {})
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            aggregate_monthly_hours([], [], [], engine="fortran")
+
+class TestItemDateIndex(unittest.TestCase):
+    def test_matches_linear_lookup(self):
+        deployments = [{"id": "d1", "startDate": "2026-01-01", "endDate": "2026-01-10"},
+                       {"id": "dep_d2", "startDate": "2026-02-01", "endDate": "2026-02-10"},
+                       {"id": "d2", "startDate": "2026-03-01", "endDate": "2026-03-10"}]
+        items = [{"id": "s1", "startAt": "2026-04-01", "endAt": "2026-04-03"},
+                 {"id": "s1", "startAt": "2026-05-01", "endAt": "2026-05-03"},
+                 {"id": "s2", "startAt": "2026-06-01", "endAt": ""}]
+
+        def linear(item_id):
+            d = next((x for x in deployments if x['id'] == item_id or f"dep_{x['id']}" == item_id), None)
+            if d: return parse_date(d['startDate']), parse_date(d['endDate'])
+            s = next((x for x in items if x['id'] == item_id), None)
+            if s and s.get('startAt') and s.get('endAt'):
+                return parse_date(s['startAt']), parse_date(s['endAt'])
+            return None, None
+
+        index = ItemDateIndex(deployments, items)
+        for item_id in ("d1", "dep_d1", "d2", "dep_d2", "s1", "s2", "missing"):
+            self.assertEqual(index.dates(item_id), linear(item_id), item_id)
+
+    def test_resource_profiles(self):
+        index = ItemDateIndex([], [], [
+            {"id": "r1", "defaultCapacityHoursPerDay": 6,
+             "calendar": {"workingDays": [1, 2, 3, 4, 5], "nonWorkingDates": ["2026-01-01"]}},
+            {"id": "r2", "defaultCapacityHoursPerDay": None},
+        ])
+        calendar = index.resource("r1").calendar
+        self.assertEqual(index.resource("r1").capacity, 6.0)
+        self.assertFalse(calendar.is_working(date(2026, 1, 1).toordinal()))  # holiday
+        self.assertTrue(calendar.is_working(date(2026, 1, 2).toordinal()))   # Friday
+        self.assertFalse(calendar.is_working(date(2026, 1, 3).toordinal()))  # Saturday
+        self.assertEqual(index.resource("r2").capacity, 8.0)
+        self.assertTrue(index.resource("r2").calendar.every_day)
+        self.assertTrue(index.resource("unknown").calendar.every_day)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import random
+import unittest
+from datetime import date
+
+from api_testing import TestClient, main, use_temp_store
+from logic_labor import resource_profile
+from resource_load import ResourceLoad, assignment_hours
+
+def ordinal(day):
+    return date.fromisoformat(day).toordinal()
+
+WEEKDAYS = resource_profile({"id": "r", "defaultCapacityHoursPerDay": 6, "calendar": {"workingDays": [1, 2, 3, 4, 5]}})
+MON, SUN = ordinal("2026-01-05"), ordinal("2026-01-11")
+
+class TestAssignmentHours(unittest.TestCase):
+    def test_hours_skip_non_working_days(self):
+        load = assignment_hours({"allocationMode": "hours", "allocationValue": 20}, MON, SUN, WEEKDAYS)
+        self.assertEqual(sorted(load), list(range(MON, MON + 5)))
+        self.assertEqual(set(load.values()), {4.0})
+
+    def test_fte_and_percent_use_resource_capacity(self):
+        fte = assignment_hours({"allocationMode": "fte", "allocationValue": 0.5}, MON, SUN, WEEKDAYS)
+        percent = assignment_hours({"allocationMode": "percent", "allocationValue": 50}, MON, SUN, WEEKDAYS)
+        self.assertEqual(fte, percent)
+        self.assertEqual(sum(fte.values()), 15.0)
+
+    def test_loaded_spreads_keep_the_total(self):
+        front = assignment_hours({"allocationValue": 30, "spread": "front_loaded"}, MON, SUN, WEEKDAYS)
+        back = assignment_hours({"allocationValue": 30, "spread": "back_loaded"}, MON, SUN, WEEKDAYS)
+        self.assertAlmostEqual(sum(front.values()), 30)
+        self.assertEqual([front[d] for d in sorted(front)], [10, 8, 6, 4, 2])
+        self.assertEqual([back[d] for d in sorted(back)], [2, 4, 6, 8, 10])
+
+    def test_custom_and_shift(self):
+        custom = {"spread": "custom", "perDayAllocations": {"2026-01-10": 3, "2026-01-06": 2}}
+        self.assertEqual(assignment_hours(custom, MON, SUN, WEEKDAYS), {MON + 5: 3.0, MON + 1: 2.0})
+        self.assertEqual(assignment_hours(custom, MON, SUN, WEEKDAYS, shift=2), {MON + 7: 3.0, MON + 3: 2.0})
+
+    def test_no_working_days_falls_back_to_calendar_days(self):
+        load = assignment_hours({"allocationValue": 8}, MON + 5, SUN, WEEKDAYS) # the weekend
+        self.assertEqual(load, {MON + 5: 4.0, SUN: 4.0})
+
+class TestResourceLoad(unittest.TestCase):
+    def setUp(self):
+        self.store = use_temp_store(self, {
+            "deployments": [{"id": "d1", "name": "Dep", "startDate": "2026-01-05", "endDate": "2026-01-09"}],
+            "scheduleItems": [
+                {"id": "A", "title": "A", "type": "task", "startAt": "2026-01-05", "endAt": "2026-01-06"},
+                {"id": "B", "title": "B", "type": "task", "startAt": "2026-01-05", "endAt": "2026-01-06"},
+                {"id": "C", "title": "C", "type": "task", "startAt": "2026-01-16", "endAt": "2026-01-16"},
+            ],
+            "scheduleDependencies": [],
+            "resources": [
+                {"id": "r1", "name": "Ann", "defaultCapacityHoursPerDay": 8, "calendar": {"workingDays": [1, 2, 3, 4, 5]}},
+                {"id": "r2", "name": "Bob", "defaultCapacityHoursPerDay": 8},
+            ],
+            "resourceAssignments": [
+                {"id": "a1", "resourceId": "r1", "scheduleItemId": "A", "allocationMode": "fte", "allocationValue": 1},
+                {"id": "a2", "resourceId": "r1", "scheduleItemId": "B", "allocationMode": "hours", "allocationValue": 8},
+                {"id": "a3", "resourceId": "r2", "scheduleItemId": "dep_d1", "allocationMode": "percent", "allocationValue": 50},
+            ],
+        })
+        self.client = TestClient(main.app)
+
+    def assert_matches_rebuild(self):
+        fresh = ResourceLoad(self.store)
+        for rid in ("r1", "r2"):
+            self.assertEqual(main.resource_load.load(rid), fresh.load(rid))
+            self.assertEqual(main.resource_load.over_allocated(rid), fresh.over_allocated(rid))
+
+    def test_over_allocation(self):
+        view = main.resource_load
+        self.assertEqual(view.over_allocated("r1"), [MON, MON + 1]) # 8h + 4h a day
+        self.assertEqual(view.load("r2"), {day: 4.0 for day in range(MON, MON + 5)})
+
+    def test_edits_are_applied_incrementally(self):
+        self.assert_matches_rebuild()
+        self.store.update("resourceAssignments", "a2", {"spread": "back_loaded"})
+        self.assert_matches_rebuild()
+        self.store.update("resources", "r1", {"defaultCapacityHoursPerDay": 12})
+        self.store.update("resourceAssignments", "a1", {"allocationMode": "hours", "allocationValue": 16})
+        self.assertEqual(main.resource_load.over_allocated("r1"), [MON + 1]) # back-loaded: 8h + 16/3h
+        self.assert_matches_rebuild()
+        self.store.update("deployments", "d1", {"endDate": "2026-01-20"})
+        self.store.upsert("scheduleItems", {"id": "B", "title": "B", "type": "task", "startAt": "2026-01-10", "endAt": "2026-01-12"})
+        self.assert_matches_rebuild()
+        self.store.delete("resourceAssignments", "a1")
+        self.assertEqual(main.resource_load.over_allocated("r1"), [])
+        self.assert_matches_rebuild()
+
+    def test_random_edits_match_rebuild(self):
+        rng = random.Random(3)
+        for k in range(60):
+            self.store.upsert("resourceAssignments", {
+                "id": f"x{rng.randint(0, 10)}", "resourceId": rng.choice(["r1", "r2", "r3"]),
+                "scheduleItemId": rng.choice(["A", "B", "C", "d1", "dep_d1", "missing"]),
+                "allocationMode": rng.choice(["hours", "fte", "percent"]), "allocationValue": rng.randint(1, 40),
+                "spread": rng.choice(["uniform", "front_loaded", "back_loaded"]),
+            })
+            if k % 7 == 0:
+                self.store.update("resources", "r1", {"calendar": {"workingDays": rng.sample(range(1, 8), 3)}})
+            if k % 11 == 0:
+                self.store.delete("resourceAssignments", f"x{rng.randint(0, 10)}")
+            self.assert_matches_rebuild()
+
+    def test_leveling_moves_the_item_with_float(self):
+        # B must finish before C starts (Jan 16), so it can slide by up to 9 days
+        self.store.upsert("scheduleDependencies", {"id": "l1", "predecessorId": "B", "successorId": "C", "type": "FS"})
+        self.store.upsert("scheduleDependencies", {"id": "l2", "predecessorId": "A", "successorId": "C", "type": "FS", "lagMinutes": 9 * 1440})
+        result = main.resource_load.level(["r1"])
+        self.assertEqual(result["remainingOverAllocatedDays"], 0)
+        self.assertEqual(len(result["proposals"]), 1)
+        proposal = result["proposals"][0]
+        self.assertEqual((proposal["scheduleItemId"], proposal["shiftDays"]), ("B", 2))
+        self.assertEqual((proposal["newStart"], proposal["newEnd"]), ("2026-01-07", "2026-01-08"))
+        self.assertEqual(main.resource_load.over_allocated("r1"), [MON, MON + 1]) # nothing applied
+
+    def test_endpoints(self):
+        body = self.client.get("/api/scheduler/resource-load", params={"from": "2026-01-05", "to": "2026-01-07"}).json()
+        self.assertEqual((body["start"], body["end"]), ("2026-01-05", "2026-01-07"))
+        r1 = body["resources"][0]
+        self.assertEqual((r1["id"], r1["name"]), ("r1", "Ann"))
+        self.assertEqual(r1["load"], [12.0, 12.0, 0.0])
+        self.assertEqual(r1["capacity"], [8.0, 8.0, 8.0])
+        self.assertEqual([d["date"] for d in r1["overAllocated"]], ["2026-01-05", "2026-01-06"])
+
+        only = self.client.get("/api/scheduler/resource-load", params={"resourceId": "r2"}).json()
+        self.assertEqual([r["id"] for r in only["resources"]], ["r2"])
+        self.assertEqual(only["end"], "2026-01-09")
+
+        leveling = self.client.get("/api/scheduler/resource-load/leveling").json()
+        self.assertIn("proposals", leveling)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from schedule_assembler import ScheduleAssembler
+from store import DataStore
+
+INITIAL = {"deployments": [], "scheduleItems": [], "timelineViews": []}
+
+class TestScheduleAssembler(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = DataStore(os.path.join(tmp.name, "data.json"), INITIAL)
+        self.assembler = ScheduleAssembler(self.store)
+        self.store.load()
+        self.addCleanup(self.store.close)
+
+        self.store.upsert("deployments", {"id": "d1", "name": "Alpha", "startDate": "2026-01-01", "endDate": "2026-01-31"})
+        self.store.upsert("deployments", {"id": "d2", "name": "Bravo", "startDate": "2026-03-01", "endDate": "2026-03-20"})
+        self.store.upsert("scheduleItems", {"id": "s1", "deploymentId": "d2", "title": "", "startAt": "", "endAt": "",
+                                            "sortOrder": 5, "swimlaneKey": "ships"})
+        self.store.upsert("scheduleItems", {"id": "t1", "title": "Task", "startAt": "2026-02-01", "endAt": "2026-02-05",
+                                            "swimlaneKey": "shore"})
+
+    def fresh(self, **kwargs):
+        return ScheduleAssembler(self.store).items(**kwargs)
+
+    def test_merges_deployments_and_local_items(self):
+        items = self.assembler.items()
+        self.assertEqual([i["id"] for i in items], ["dep_d1", "s1", "t1"])
+        self.assertEqual(items[1]["title"], "Bravo")
+        self.assertEqual(items[1]["startAt"], "2026-03-01")
+        self.assertEqual(items[1]["sortOrder"], 5)
+
+    def test_incremental_updates_match_rebuild(self):
+        self.assembler.items()  # materialize before editing
+        self.store.update("deployments", "d1", {"name": "Alpha 2", "endDate": "2026-02-15"})
+        self.store.upsert("scheduleItems", {"id": "s2", "deploymentId": "d1", "title": "", "startAt": "", "endAt": ""})
+        self.store.upsert("scheduleItems", {"id": "s1", "title": "Unlinked", "startAt": "2026-04-01", "endAt": "2026-04-02"})
+        self.store.update("scheduleItems", "t1", {"title": "Task 2"})
+        self.store.delete("deployments", "d2")
+        self.assertEqual(self.assembler.items(), self.fresh())
+        self.assertEqual([i["id"] for i in self.assembler.items()], ["s2", "s1", "t1"])
+
+    def test_unlinking_restores_transient_item(self):
+        self.assembler.items()
+        self.store.delete("scheduleItems", "s1")
+        self.assertEqual([i["id"] for i in self.assembler.items()], ["dep_d1", "dep_d2", "t1"])
+
+    def test_replace_rebuilds(self):
+        self.assembler.items()
+        self.store.replace({"deployments": [], "scheduleItems": [{"id": "x", "title": "", "startAt": "2026-01-01"}]})
+        self.assertEqual([i["id"] for i in self.assembler.items()], ["x"])
+
+    def test_window_and_filter(self):
+        window = self.assembler.items(start="2026-01-15", end="2026-02-01")
+        self.assertEqual([i["id"] for i in window], ["dep_d1", "t1"])
+        lanes = self.assembler.items(filters={"swimlaneKey": ["ships"]})
+        self.assertEqual([i["id"] for i in lanes], ["s1"])
+
+if __name__ == '__main__':
+    unittest.main()
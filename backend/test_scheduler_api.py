@@ -30,19 +30,34 @@ def test_scheduler_api():
     assert found['title'] == "Test Task 1"
     print("[PASS] Get Scheduler Items (Found created item)")
     
-    # 3. Create Dependency
+    # 3. Create Dependency between two created items
+    next_id = str(uuid.uuid4())
+    res = requests.post(f"{BASE_URL}/scheduler/items", json={**item, "id": next_id, "title": "Test Task 2",
+                                                             "startAt": "2026-02-06", "endAt": "2026-02-10"})
+    assert res.status_code == 200, f"Failed to create item: {res.text}"
+
     dep_id = str(uuid.uuid4())
     dep = {
         "id": dep_id,
         "predecessorId": item_id,
-        "successorId": "some-other-id",
+        "successorId": next_id,
         "type": "FS",
         "lagMinutes": 0
     }
     res = requests.post(f"{BASE_URL}/scheduler/dependencies", json=dep)
-    assert res.status_code == 200
+    assert res.status_code == 200, f"Failed to create dependency: {res.text}"
     print("[PASS] Create Dependency")
-    
+
+    res = requests.post(f"{BASE_URL}/scheduler/dependencies",
+                        json={**dep, "id": str(uuid.uuid4()), "successorId": "some-other-id"})
+    assert res.status_code == 400, f"Expected 400 for unknown successor, got {res.status_code}"
+    print("[PASS] Reject Dependency on unknown item")
+
+    res = requests.post(f"{BASE_URL}/scheduler/dependencies",
+                        json={**dep, "id": str(uuid.uuid4()), "predecessorId": next_id, "successorId": item_id})
+    assert res.status_code == 409, f"Expected 409 for a cycle, got {res.status_code}"
+    print("[PASS] Reject Dependency cycle")
+
     # 4. Create Resource Assignment
     res_id = "res_1"
     assign_id = str(uuid.uuid4())
@@ -79,6 +94,7 @@ def test_scheduler_api():
 
     # Cleanup
     requests.delete(f"{BASE_URL}/scheduler/items/{item_id}")
+    requests.delete(f"{BASE_URL}/scheduler/items/{next_id}")
     requests.delete(f"{BASE_URL}/scheduler/dependencies/{dep_id}")
     requests.delete(f"{BASE_URL}/scheduler/assignments/{assign_id}")
     print("[PASS] Cleanup")
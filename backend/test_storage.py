@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import migrate_db
+from sqlite_storage import SqliteStorage, collection_kind
+from store import DataStore, JsonStorage, open_storage
+
+INITIAL = {
+    "deployments": [],
+    "laborCategories": [{"id": "lc_1", "name": "Project Manager"}],
+    "fiscalYearRates": [{"year": 2025, "periodRates": {}}],
+    "pricing": {"1": {"land15": 0}},
+}
+
+class SqliteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, "data.db")
+
+    def open_store(self):
+        store = DataStore(os.path.join(self.tmp.name, "data.json"), INITIAL, storage=SqliteStorage(self.db_path))
+        store.load()
+        self.addCleanup(store.close)
+        return store
+
+class TestSqliteStorage(SqliteTestCase):
+    def test_fresh_database_is_seeded_with_initial_data(self):
+        self.open_store().close()
+        self.assertEqual(self.open_store().data, INITIAL)
+
+    def test_edits_survive_reopen_in_order(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1", "name": "A"})
+        store.upsert("deployments", {"id": "d2", "name": "B"})
+        store.upsert("deployments", {"id": "d3", "name": "C"})
+        store.update("deployments", "d1", {"name": "A2"})
+        store.delete("deployments", "d2")
+        store.apply_batch([
+            {"op": "upsert", "collection": "scheduleItems", "record": {"id": "s1", "deploymentId": "d1"}},
+            {"op": "update", "collection": "scheduleItems", "id": "s1", "fields": {"title": "Kickoff"}},
+            {"op": "put", "collection": "pricing", "key": "2", "value": {"land15": 5}},
+            {"op": "remove", "collection": "pricing", "key": "1"},
+            {"op": "set", "collection": "fiscalYearRates", "value": [{"year": 2026, "periodRates": {"1": 2}}]},
+        ])
+        store.close()
+
+        reopened = self.open_store()
+        self.assertEqual(reopened.data, store.data)
+        self.assertEqual([d["id"] for d in reopened.get("deployments")], ["d1", "d3"])
+        self.assertEqual(reopened.find("scheduleItems", "s1"), {"id": "s1", "deploymentId": "d1", "title": "Kickoff"})
+
+    def test_replace_and_layout_changes(self):
+        store = self.open_store()
+        store.replace({"deployments": [{"id": "d1"}], "notes": ["free", "text"], "billingState": {}})
+        store.apply_batch([
+            {"op": "set", "collection": "notes", "value": [{"id": "n1"}]},
+            {"op": "set", "collection": "deployments", "value": {"as": "map"}},
+        ])
+        store.close()
+        self.assertEqual(self.open_store().data, store.data)
+
+    def test_failed_write_leaves_memory_as_persisted(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1", "name": "A"})
+        seen = []
+        store.subscribe(seen.append)
+        with mock.patch.object(store.storage, "_put_record", side_effect=sqlite3.OperationalError("disk I/O error")):
+            with self.assertRaises(sqlite3.OperationalError):
+                store.apply_batch([
+                    {"op": "delete", "collection": "deployments", "id": "d1"},
+                    {"op": "upsert", "collection": "deployments", "record": {"id": "d2", "name": "B"}},
+                ])
+            with self.assertRaises(sqlite3.OperationalError):
+                store.update("deployments", "d1", {"name": "A2"})
+        self.assertEqual(store.get("deployments"), [{"id": "d1", "name": "A"}])
+        self.assertEqual(seen, [{"op": "replace"}, {"op": "replace"}])
+        self.assertIsNone(store.changes_since(store.revision - 1)) # clients must reload
+
+        store.upsert("deployments", {"id": "d3"})
+        store.close()
+        self.assertEqual(self.open_store().get("deployments"), [{"id": "d1", "name": "A"}, {"id": "d3"}])
+
+    def test_collections_get_tables_with_foreign_key_indexes(self):
+        store = self.open_store()
+        store.upsert("resourceAssignments", {"id": "a1", "scheduleItemId": "s1", "resourceId": "r1"})
+        conn = store.storage.conn
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({"deployments", "laborCategories", "pricing", "resourceAssignments"} <= tables)
+        self.assertNotIn("fiscalYearRates", tables)
+        indexes = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"resourceAssignments_scheduleItemId", "resourceAssignments_resourceId"} <= indexes)
+        row = conn.execute('SELECT "resourceId" FROM "resourceAssignments" WHERE id = ?', ("a1",)).fetchone()
+        self.assertEqual(row, ("r1",))
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone(), ("wal",))
+
+    def test_backup_is_a_readable_database(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1"})
+        self.assertEqual(store.storage.backup(self.tmp.name, "copy"), "copy.db")
+        restored = SqliteStorage(os.path.join(self.tmp.name, "copy.db"))
+        self.addCleanup(restored.close)
+        self.assertEqual(restored.read()["deployments"], [{"id": "d1"}])
+
+    def test_collection_kind(self):
+        self.assertEqual(collection_kind("deployments", [{"id": "a"}, {"id": "b"}]), "records")
+        self.assertEqual(collection_kind("deployments", [{"id": "a"}, {"id": "a"}]), "value")
+        self.assertEqual(collection_kind("fiscalYearRates", [{"year": 2025}]), "value")
+        self.assertEqual(collection_kind("pricing", {}), "map")
+        self.assertEqual(collection_kind("sqlite_master", []), "value")
+
+class TestOpenStorage(unittest.TestCase):
+    def test_backend_is_chosen_by_config(self):
+        self.assertIsInstance(open_storage({}, "data.json"), JsonStorage)
+        storage = open_storage({"storageBackend": "sqlite", "sqliteFile": "x.db"}, "data.json")
+        self.assertIsInstance(storage, SqliteStorage)
+        self.assertEqual(storage.path, "x.db")
+        with self.assertRaises(ValueError):
+            open_storage({"storageBackend": "csv"}, "data.json")
+
+class TestImportToSqlite(SqliteTestCase):
+    def test_imports_snapshot_and_journal(self):
+        data_file = os.path.join(self.tmp.name, "data.json")
+        with open(data_file, "w") as f:
+            json.dump({"deployments": [{"id": "d1"}], "pricing": {}}, f)
+        with open(os.path.join(self.tmp.name, "data.journal"), "w") as f:
+            f.write(json.dumps({"op": "upsert", "collection": "deployments", "record": {"id": "d2"}}) + "\n")
+
+        with mock.patch.object(migrate_db, "DATA_FILE", data_file), \
+             mock.patch.object(migrate_db, "BACKUP_DIR", os.path.join(self.tmp.name, "backups")), \
+             mock.patch("builtins.print"):
+            migrate_db.import_to_sqlite(self.db_path)
+            storage = SqliteStorage(self.db_path)
+            self.addCleanup(storage.close)
+            self.assertEqual([d["id"] for d in storage.read()["deployments"]], ["d1", "d2"])
+            self.assertEqual(storage.read()["scheduleItems"], []) # added by migrate()
+
+            # An existing database is left alone unless forced
+            storage.write_all({"deployments": []})
+            migrate_db.import_to_sqlite(self.db_path)
+            self.assertEqual(storage.read(), {"deployments": []})
+            migrate_db.import_to_sqlite(self.db_path, force=True)
+            self.assertEqual(len(storage.read()["deployments"]), 2)
+
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM "deployments"').fetchone(), (2,))
+
+if __name__ == '__main__':
+    unittest.main()
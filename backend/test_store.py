@@ -0,0 +1,286 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fileio import atomic_write
+from store import DataStore, delta_ops
+
+INITIAL = {"deployments": [], "scheduleItems": []}
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data.json")
+        self.journal_path = os.path.join(self.tmp.name, "data.journal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_store(self, **kwargs):
+        store = DataStore(self.path, INITIAL, **kwargs)
+        store.load()
+        self.addCleanup(store.close)
+        return store
+
+    def read_file(self):
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+class TestDataStore(StoreTestCase):
+    def test_load_missing_file_uses_copy_of_initial_data(self):
+        store = self.open_store()
+        store.collection("deployments").append({"id": "d1"})
+        self.assertEqual(INITIAL["deployments"], [])
+
+    def test_reads_are_served_from_memory(self):
+        with open(self.path, "w") as f:
+            json.dump({"deployments": [{"id": "d1", "name": "A"}]}, f)
+        store = self.open_store()
+        os.remove(self.path)
+        self.assertEqual(store.find("deployments", "d1")["name"], "A")
+
+    def test_upsert_update_delete(self):
+        store = self.open_store()
+        store.upsert("scheduleItems", {"id": "s1", "title": "one"})
+        store.upsert("scheduleItems", {"id": "s1", "title": "uno"})
+        self.assertEqual(store.collection("scheduleItems"), [{"id": "s1", "title": "uno"}])
+
+        self.assertTrue(store.update("scheduleItems", "s1", {"sortOrder": 2}))
+        self.assertFalse(store.update("scheduleItems", "missing", {"sortOrder": 2}))
+        self.assertEqual(store.find("scheduleItems", "s1")["sortOrder"], 2)
+
+        self.assertTrue(store.delete("scheduleItems", "s1"))
+        self.assertFalse(store.delete("scheduleItems", "s1"))
+        self.assertEqual(store.collection("scheduleItems"), [])
+
+class TestJournal(StoreTestCase):
+    def test_edits_append_to_journal_without_rewriting_snapshot(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1"})
+        store.update("deployments", "d1", {"name": "A"})
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.journal_path, "r") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_restart_replays_journal(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1", "name": "A"})
+        store.upsert("deployments", {"id": "d2", "name": "B"})
+        store.update("deployments", "d1", {"name": "A2"})
+        store.delete("deployments", "d2")
+        store.close()
+
+        recovered = self.open_store()
+        self.assertEqual(recovered.get("deployments"), [{"id": "d1", "name": "A2"}])
+
+    def test_torn_last_line_is_ignored(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1"})
+        store.close()
+        with open(self.journal_path, "a") as f:
+            f.write('{"op":"upsert","collection":"deploym')
+
+        recovered = self.open_store()
+        self.assertEqual(recovered.get("deployments"), [{"id": "d1"}])
+
+    def test_appends_after_torn_line_survive_restart(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "a"})
+        store.close()
+        with open(self.journal_path, "a") as f:
+            f.write('{"op":"upsert","collection":"deploym')
+
+        store = self.open_store()
+        store.upsert("deployments", {"id": "b"})
+        store.upsert("deployments", {"id": "c"})
+        store.close()
+
+        recovered = self.open_store()
+        self.assertEqual(recovered.get("deployments"), [{"id": "a"}, {"id": "b"}, {"id": "c"}])
+
+    def test_unterminated_last_entry_is_kept_and_not_continued(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "a"})
+        store.close()
+        with open(self.journal_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            f.truncate()
+
+        store = self.open_store()
+        store.upsert("deployments", {"id": "b"})
+        store.close()
+
+        recovered = self.open_store()
+        self.assertEqual(recovered.get("deployments"), [{"id": "a"}, {"id": "b"}])
+
+    def test_corruption_before_the_last_line_fails_loudly(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "a"})
+        store.close()
+        with open(self.journal_path, "a") as f:
+            f.write('{"op":"ups\n{"op":"upsert","collection":"deployments","record":{"id":"b"}}\n')
+
+        with self.assertRaises(ValueError):
+            self.open_store()
+
+    def test_failed_append_leaves_memory_as_persisted(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1"})
+        with mock.patch.object(store.storage.journal, "append", side_effect=OSError("No space left on device")):
+            with self.assertRaises(OSError):
+                store.upsert("deployments", {"id": "d2"})
+        self.assertEqual(store.get("deployments"), [{"id": "d1"}])
+        self.assertIsNone(store.find("deployments", "d2"))
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        store = self.open_store(compact_threshold=200)
+        for i in range(10):
+            store.upsert("deployments", {"id": f"d{i}"})
+        self.assertGreater(len(self.read_file()["deployments"]), 0)
+        self.assertLess(os.path.getsize(self.journal_path), 200)
+
+        recovered = self.open_store()
+        self.assertEqual(len(recovered.get("deployments")), 10)
+
+    def test_replaying_already_compacted_ops_is_harmless(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1", "name": "A"})
+        store.update("deployments", "d1", {"name": "B"})
+        store.delete("deployments", "d1")
+        store.upsert("deployments", {"id": "d2"})
+        store.close()
+        with open(self.journal_path, "r") as f:
+            journal = f.read()
+        store = self.open_store()
+        store.compact()
+        store.close()
+        # Simulate a crash after the snapshot write but before the journal was trimmed
+        with open(self.journal_path, "w") as f:
+            f.write(journal)
+
+        recovered = self.open_store()
+        self.assertEqual(recovered.get("deployments"), [{"id": "d2"}])
+
+class TestDeltaSync(StoreTestCase):
+    def test_every_commit_bumps_revision(self):
+        store = self.open_store()
+        start = store.revision
+        store.upsert("deployments", {"id": "d1"})
+        store.apply_batch([{"op": "upsert", "collection": "deployments", "record": {"id": "d2"}},
+                           {"op": "delete", "collection": "deployments", "id": "d1"}])
+        self.assertEqual(store.revision, start + 2)
+
+    def test_delta_ops_for_list_and_dict_collections(self):
+        current = {"deployments": [{"id": "d1"}], "billingState": {"b1": {"status": "Billed"}}}
+        ops = delta_ops(current,
+                        upserts={"deployments": [{"id": "d2"}], "billingState": {"b2": {"status": "Draft"}}},
+                        deletes={"deployments": ["d1"], "billingState": ["b1"]},
+                        replace={"fiscalYearRates": []})
+        self.assertEqual([op["op"] for op in ops], ["set", "upsert", "put", "delete", "remove"])
+        with self.assertRaises(ValueError):
+            delta_ops(current, upserts={"billingState": [{"id": "b1"}]}, deletes={}, replace={})
+
+    def test_batch_is_one_journal_entry_and_replays(self):
+        store = self.open_store()
+        store.apply_batch(delta_ops(store.data,
+                                    upserts={"deployments": [{"id": "d1"}], "billingState": {"b1": {"status": "Billed"}}},
+                                    deletes={}, replace={}))
+        with open(self.journal_path, "r") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        store.close()
+
+        recovered = self.open_store()
+        self.assertEqual(recovered.get("deployments"), [{"id": "d1"}])
+        self.assertEqual(recovered.get("billingState"), {"b1": {"status": "Billed"}})
+
+    def test_stale_revision_conflicts_only_on_changed_records(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1"})
+        store.upsert("deployments", {"id": "d2"})
+        seen = store.revision
+        store.update("deployments", "d1", {"name": "edited elsewhere"})
+
+        ops = delta_ops(store.data, upserts={"deployments": [{"id": "d1", "name": "mine"}]}, deletes={}, replace={})
+        self.assertEqual(store.conflicts(ops, seen), [{"collection": "deployments", "id": "d1"}])
+        ops = delta_ops(store.data, upserts={"deployments": [{"id": "d2", "name": "mine"}]}, deletes={}, replace={})
+        self.assertEqual(store.conflicts(ops, seen), [])
+
+    def test_revision_from_previous_process_conflicts(self):
+        store = self.open_store()
+        ops = delta_ops(store.data, upserts={"deployments": [{"id": "d1"}]}, deletes={}, replace={})
+        self.assertEqual(len(store.conflicts(ops, store.base_revision - 1)), 1)
+
+    def test_changes_since_returns_only_newer_records(self):
+        store = self.open_store()
+        store.upsert("deployments", {"id": "d1"})
+        store.apply_batch(delta_ops(store.data, upserts={"billingState": {"b1": {"status": "Billed"}}},
+                                    deletes={}, replace={}))
+        since = store.revision
+        store.upsert("deployments", {"id": "d2"})
+        store.delete("deployments", "d1")
+        store.apply_batch([{"op": "put", "collection": "billingState", "key": "b2", "value": {"status": "Draft"}}])
+
+        self.assertEqual(store.changes_since(since), {
+            "upserts": {"deployments": [{"id": "d2"}], "billingState": {"b2": {"status": "Draft"}}},
+            "deletes": {"deployments": ["d1"]},
+            "replace": {},
+        })
+        self.assertEqual(store.changes_since(store.revision), {"upserts": {}, "deletes": {}, "replace": {}})
+
+    def test_changes_since_requires_full_reload_after_replace(self):
+        store = self.open_store()
+        since = store.revision
+        self.assertIsNone(store.changes_since(since - 1))
+        store.replace({"deployments": []})
+        self.assertIsNone(store.changes_since(since))
+
+class TestBackgroundCompaction(unittest.IsolatedAsyncioTestCase):
+    async def test_flush_keeps_ops_appended_during_write(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "data.json")
+        store = DataStore(path, INITIAL)
+        store.load()
+        self.addCleanup(store.close)
+
+        store.upsert("deployments", {"id": "d1"})
+        flush = asyncio.create_task(store.flush())
+        await asyncio.sleep(0)  # let the flush serialize and start writing
+        store.upsert("deployments", {"id": "d2"})
+        await flush
+        store.close()
+
+        recovered = DataStore(path, INITIAL)
+        recovered.load()
+        self.addCleanup(recovered.close)
+        self.assertEqual(len(recovered.get("deployments")), 2)
+
+    async def test_concurrent_flushes_write_once(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "data.json")
+        store = DataStore(path, INITIAL)
+        store.load()
+        self.addCleanup(store.close)
+        store.upsert("deployments", {"id": "d1"})
+
+        with mock.patch("store.atomic_write", wraps=atomic_write) as write:
+            await asyncio.gather(*(store.flush() for _ in range(5)))
+        self.assertEqual(write.call_count, 1)
+
+    async def test_snapshot_write_leaves_no_temp_files(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "data.json")
+        store = DataStore(path, INITIAL)
+        store.load()
+        self.addCleanup(store.close)
+        store.upsert("deployments", {"id": "d1"})
+        await store.flush()
+        self.assertEqual(sorted(os.listdir(tmp.name)), ["data.journal", "data.json"])
+
+if __name__ == '__main__':
+    unittest.main()
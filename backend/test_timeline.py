@@ -0,0 +1,124 @@
+import random
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from api_testing import TestClient, main, use_temp_store
+from timeline import bucket_starts, build_timeline
+
+def ordinal(day):
+    return date.fromisoformat(day).toordinal()
+
+def iso(ordinals):
+    return [date.fromordinal(o).isoformat() for o in ordinals]
+
+def item(item_id, start, end, lane=None, **fields):
+    return {"id": item_id, "title": item_id, "type": "task", "startAt": start, "endAt": end, "swimlaneKey": lane, **fields}
+
+class TestBuckets(unittest.TestCase):
+    def test_alignment(self):
+        self.assertEqual(iso(bucket_starts(ordinal("2026-01-07"), ordinal("2026-01-20"), "week")),
+                         ["2026-01-05", "2026-01-12", "2026-01-19", "2026-01-26"])
+        self.assertEqual(iso(bucket_starts(ordinal("2026-02-15"), ordinal("2026-07-01"), "quarter")),
+                         ["2026-01-01", "2026-04-01", "2026-07-01", "2026-10-01"])
+        self.assertEqual(iso(bucket_starts(ordinal("2026-11-30"), ordinal("2027-01-01"), "month")),
+                         ["2026-11-01", "2026-12-01", "2027-01-01", "2027-02-01"])
+        self.assertEqual(len(bucket_starts(ordinal("2026-01-01"), ordinal("2026-01-31"), "day")), 32)
+        with self.assertRaises(ValueError):
+            bucket_starts(1, 100, "decade")
+        with self.assertRaises(ValueError):
+            bucket_starts(ordinal("2000-01-01"), ordinal("2060-01-01"), "day")
+
+class TestBuildTimeline(unittest.TestCase):
+    def test_bars_are_clipped_and_grouped(self):
+        items = [item("a", "2025-12-20", "2026-01-03", "ops"), item("b", "2026-01-10", "2026-02-20", "eng"),
+                 item("c", "2026-01-05", "2026-01-05"), item("d", "2026-03-01", "2026-03-02", "eng")]
+        result = build_timeline(items, ordinal("2026-01-01"), ordinal("2026-01-31"), "week", lane_order=["ops", "qa"])
+        self.assertEqual(result["mode"], "bars")
+        self.assertEqual([(lane["key"], lane["count"]) for lane in result["lanes"]],
+                         [("ops", 1), ("qa", 0), ("eng", 1), (None, 1)])
+        a = result["lanes"][0]["items"][0]
+        self.assertEqual((a["start"], a["end"], a["clippedStart"], a["clippedEnd"]), ("2026-01-01", "2026-01-03", True, False))
+        self.assertEqual((a["startBucket"], a["endBucket"]), (0, 0))
+        b = result["lanes"][2]["items"][0]
+        self.assertEqual((b["end"], b["clippedEnd"], b["startBucket"], b["endBucket"]), ("2026-01-31", True, 1, 4))
+
+    def test_density_matches_brute_force(self):
+        rng = random.Random(4)
+        base = date(2026, 1, 1)
+        items = []
+        for k in range(500):
+            start = base + timedelta(days=rng.randrange(-60, 400))
+            items.append(item(f"i{k}", start.isoformat(), (start + timedelta(days=rng.randrange(0, 90))).isoformat(),
+                              rng.choice(["x", "y", None]), type=rng.choice(["task", "phase"])))
+        lo, hi = ordinal("2026-02-10"), ordinal("2026-11-20")
+        for zoom in ("week", "month", "quarter"):
+            result = build_timeline(items, lo, hi, zoom, grouping="type", density=True)
+            starts = bucket_starts(lo, hi, zoom)
+            for lane in result["lanes"]:
+                expected = []
+                for k in range(len(starts) - 1):
+                    b_lo, b_hi = max(starts[k], lo), min(starts[k + 1] - 1, hi)
+                    expected.append(sum(1 for i in items if i["type"] == lane["key"]
+                                        and ordinal(i["startAt"]) <= b_hi and ordinal(i["endAt"]) >= b_lo))
+                self.assertEqual(lane["density"], expected, zoom)
+
+    def test_density_is_chosen_for_coarse_zoom_or_many_bars(self):
+        items = [item(f"i{k}", "2026-01-05", "2026-01-06") for k in range(5)]
+        lo, hi = ordinal("2026-01-01"), ordinal("2026-01-31")
+        self.assertEqual(build_timeline(items, lo, hi, "month")["mode"], "density")
+        self.assertEqual(build_timeline(items, lo, hi, "day")["mode"], "bars")
+        self.assertEqual(build_timeline(items, lo, hi, "day", max_bars=4)["mode"], "density")
+        self.assertEqual(build_timeline(items, lo, hi, "month", density=False)["mode"], "bars")
+
+class TestTimelineEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.store = use_temp_store(self, {
+            "deployments": [{"id": "d1", "name": "Dep", "startDate": "2026-01-10", "endDate": "2026-02-10"}],
+            "scheduleItems": [item("a", "2026-01-02", "2026-01-04", "ops"), item("b", "2026-01-20", "2026-01-21", "eng"),
+                              item("c", "2026-03-01", "2026-03-05", "ops", type="milestone")],
+            "timelineViews": [{"id": "v1", "name": "Ops", "grouping": "swimlane_key", "laneOrder": ["eng", "ops"],
+                               "zoom": "week", "startWindow": "2026-01-01", "endWindow": "2026-01-31",
+                               "filter": {"type": ["task", "deployment"]}}],
+        })
+        self.client = TestClient(main.app)
+
+    def test_saved_view(self):
+        body = self.client.get("/api/scheduler/timeline", params={"viewId": "v1"}).json()
+        self.assertEqual((body["start"], body["end"], body["zoom"], body["mode"]), ("2026-01-01", "2026-01-31", "week", "bars"))
+        self.assertEqual([lane["key"] for lane in body["lanes"]], ["eng", "ops", None])
+        self.assertEqual([i["id"] for i in body["lanes"][2]["items"]], ["dep_d1"])
+        self.assertTrue(body["lanes"][2]["items"][0]["clippedEnd"])
+
+        coarse = self.client.get("/api/scheduler/timeline", params={"viewId": "v1", "zoom": "month"}).json()
+        self.assertEqual(coarse["mode"], "density")
+        self.assertEqual([lane["density"] for lane in coarse["lanes"]], [[1], [1], [1]])
+
+    def test_ad_hoc_window_defaults_to_items(self):
+        body = self.client.get("/api/scheduler/timeline", params={"zoom": "day", "grouping": "type"}).json()
+        self.assertEqual((body["start"], body["end"]), ("2026-01-02", "2026-03-05"))
+        self.assertEqual([lane["key"] for lane in body["lanes"]], ["deployment", "milestone", "task"])
+        self.assertEqual(len(body["buckets"]), 63)
+
+    def test_cached_per_view_and_revision(self):
+        with mock.patch("main.build_timeline", wraps=main.build_timeline) as build:
+            first = self.client.get("/api/scheduler/timeline", params={"viewId": "v1"})
+            self.client.get("/api/scheduler/timeline", params={"viewId": "v1"})
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(self.client.get("/api/scheduler/timeline", params={"viewId": "v1"},
+                                             headers={"If-None-Match": first.headers["etag"]}).status_code, 304)
+            self.client.get("/api/scheduler/timeline", params={"viewId": "v1", "zoom": "day"})
+            self.assertEqual(build.call_count, 2)
+            self.store.upsert("scheduleItems", item("d", "2026-01-15", "2026-01-16", "ops"))
+            body = self.client.get("/api/scheduler/timeline", params={"viewId": "v1"}).json()
+            self.assertEqual(build.call_count, 3)
+            self.assertEqual(body["lanes"][1]["count"], 2)
+
+    def test_errors(self):
+        self.assertEqual(self.client.get("/api/scheduler/timeline", params={"viewId": "nope"}).status_code, 404)
+        self.assertEqual(self.client.get("/api/scheduler/timeline", params={"zoom": "decade"}).status_code, 400)
+        res = self.client.get("/api/scheduler/timeline", params={"from": "1900-01-01", "to": "2100-01-01", "zoom": "day"})
+        self.assertEqual(res.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import random
+import unittest
+from datetime import date
+from unittest import mock
+
+from api_testing import TestClient, main, use_temp_store
+from logic_billing import calculate_billing_periods
+from work_calendar import MAX_HORIZON_DAYS, WorkCalendar, calendar_from_spec
+
+def ordinal(day):
+    return date.fromisoformat(day).toordinal()
+
+def brute_hours(calendar, day):
+    if day in calendar.exceptions:
+        return calendar.exceptions[day]
+    working = date.fromordinal(day).weekday() in calendar.working_weekdays and day not in calendar.holidays
+    return calendar.capacity if working else 0.0
+
+def brute_add(calendar, day, n):
+    step = 1 if n > 0 else -1
+    for _ in range(abs(n)):
+        day += step
+        while brute_hours(calendar, day) <= 0:
+            day += step
+    return day
+
+class TestWorkCalendar(unittest.TestCase):
+    def test_matches_day_by_day(self):
+        rng = random.Random(5)
+        for _ in range(300):
+            base = ordinal("2026-01-01")
+            calendar = WorkCalendar(rng.sample(range(7), rng.randint(1, 7)),
+                                    {base + rng.randrange(-400, 400) for _ in range(20)}, 7.5,
+                                    {base + rng.randrange(-400, 400): rng.choice([0.0, 4.0]) for _ in range(8)})
+            start = base + rng.randrange(-3000, 3000)
+            end = start + rng.randrange(-3, 900)
+            days = [day for day in range(start, end + 1) if brute_hours(calendar, day) > 0]
+            self.assertEqual(calendar.days(start, end), days)
+            self.assertEqual(calendar.count(start, end), len(days))
+            self.assertAlmostEqual(calendar.hours(start, end), sum(brute_hours(calendar, d) for d in range(start, end + 1)))
+            n = rng.randrange(-300, 300)
+            self.assertEqual(calendar.add(start, n), brute_add(calendar, start, n))
+
+    def test_resource_calendar_spec(self):
+        calendar = calendar_from_spec({"workingDays": [1, 2, 3, 4, 5], "nonWorkingDates": ["2026-01-01"],
+                                       "exceptions": {"2026-01-03": 4, "2026-01-07": 0}}, 8)
+        self.assertEqual(calendar.hours_on(ordinal("2026-01-01")), 0.0) # holiday
+        self.assertEqual(calendar.hours_on(ordinal("2026-01-03")), 4.0) # working Saturday
+        self.assertEqual(calendar.count(ordinal("2026-01-01"), ordinal("2026-01-09")), 6)
+        self.assertEqual(calendar.add(ordinal("2026-01-06"), 1), ordinal("2026-01-08"))
+        self.assertEqual(calendar.add(ordinal("2026-01-05"), -1), ordinal("2026-01-03"))
+        self.assertIs(calendar_from_spec({"workingDays": [1, 2, 3, 4, 5], "nonWorkingDates": ["2026-01-01"],
+                                          "exceptions": {"2026-01-07": 0, "2026-01-03": 4}}, 8), calendar)
+        self.assertTrue(calendar_from_spec({}).every_day)
+
+    def test_exceptions_only(self):
+        calendar = WorkCalendar([], exceptions={ordinal("2026-02-01"): 3.0})
+        self.assertEqual(calendar.add(ordinal("2026-01-01"), 1), ordinal("2026-02-01"))
+        with self.assertRaises(ValueError):
+            calendar.add(ordinal("2026-01-01"), 2)
+
+    def test_horizon_is_bounded(self):
+        calendar = WorkCalendar(range(5))
+        with self.assertRaises(ValueError):
+            calendar.count(1, date.max.toordinal())
+        self.assertEqual(calendar.count(ordinal("1900-01-01"), ordinal("1900-01-07")), 5)
+        self.assertEqual(calendar.count(ordinal("2900-01-01"), ordinal("2900-01-07")), 5)
+        self.assertLessEqual(len(calendar._daily), MAX_HORIZON_DAYS)
+        self.assertEqual(calendar.add(ordinal("2026-01-02"), 20000), brute_add(calendar, ordinal("2026-01-02"), 20000))
+
+        every_day = WorkCalendar(capacity=6.0)
+        self.assertEqual(every_day.count(1, date.max.toordinal()), date.max.toordinal())
+        self.assertEqual(every_day.add(ordinal("2026-01-01"), -5), ordinal("2025-12-27"))
+        self.assertEqual(every_day._daily, [])
+
+    def test_billing_working_days(self):
+        weekdays = calendar_from_spec({"workingDays": [1, 2, 3, 4, 5]})
+        periods = calculate_billing_periods("2026-01-05", "2026-01-19", "Land", weekdays)
+        self.assertEqual((periods["periods15Day"], periods["workingDays"]), (1, 11))
+        self.assertNotIn("workingDays", calculate_billing_periods("2026-01-05", "2026-01-19", "Land"))
+
+class TestCalendarEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.store = use_temp_store(self, {
+            "resources": [{"id": "r1", "defaultCapacityHoursPerDay": 6, "calendar": {"workingDays": [1, 2, 3, 4, 5]}}],
+        })
+        self.client = TestClient(main.app)
+
+    def test_working_days(self):
+        params = {"from": "2026-01-05", "to": "2026-01-18", "resourceId": "r1"}
+        self.assertEqual(self.client.get("/api/scheduler/calendar/working-days", params=params).json(),
+                         {"workingDays": 10, "capacityHours": 60.0})
+        self.store.update("resources", "r1", {"calendar": {"workingDays": [1, 2, 3]}})
+        self.assertEqual(self.client.get("/api/scheduler/calendar/working-days", params=params).json()["workingDays"], 6)
+        res = self.client.get("/api/scheduler/calendar/working-days",
+                              params={"from": "0001-01-01", "to": "9999-12-31", "resourceId": "r1"})
+        self.assertEqual(res.status_code, 400)
+        params["resourceId"] = "missing"
+        self.assertEqual(self.client.get("/api/scheduler/calendar/working-days", params=params).status_code, 404)
+
+    def test_add_working_days(self):
+        res = self.client.get("/api/scheduler/calendar/add-working-days",
+                              params={"date": "2026-01-09", "days": 1, "resourceId": "r1"})
+        self.assertEqual(res.json(), {"date": "2026-01-12"})
+        with mock.patch("main.business_calendar", None): # no organization calendar: every day works
+            res = self.client.get("/api/scheduler/calendar/add-working-days", params={"date": "2026-01-09", "days": 1})
+        self.assertEqual(res.json(), {"date": "2026-01-10"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Server-side timeline layout for TimelineView zoom levels.
+
+Splits a date window into buckets for the zoom (day, week, month, quarter,
+year), groups the schedule items overlapping it into lanes and either lays
+out each item as a bar clipped to the window or, at coarse zoom or when
+there are too many bars, counts the items per bucket (density). The client
+draws what it receives instead of bucketing the whole schedule itself.
+"""
+from bisect import bisect_right
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from interval_index import span_of
+
+ZOOMS = ("day", "week", "month", "quarter", "year")
+DENSITY_ZOOMS = ("month", "quarter", "year")
+MAX_BUCKETS = 10000
+MAX_BARS = 2000
+
+# TimelineView.grouping names -> item fields
+GROUPING_FIELDS = {"swimlane_key": "swimlaneKey", "swimlane": "swimlaneKey", "none": None}
+
+def _month_start(year: int, month: int) -> int:
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1).toordinal()
+
+def bucket_starts(lo: int, hi: int, zoom: str) -> List[int]:
+    """Ordinals starting each bucket that meets [lo, hi], plus the ordinal after the last one."""
+    if zoom not in ZOOMS:
+        raise ValueError(f"zoom must be one of {', '.join(ZOOMS)}")
+    if zoom in ("day", "week"):
+        step = 1 if zoom == "day" else 7
+        first = lo if zoom == "day" else lo - (lo - 1) % 7 # back to Monday
+        count = (hi - first) // step + 2
+        if count > MAX_BUCKETS + 1:
+            raise ValueError(f"The window spans more than {MAX_BUCKETS} {zoom}s")
+        return [first + k * step for k in range(count)]
+    months = {"month": 1, "quarter": 3, "year": 12}[zoom]
+    start = date.fromordinal(lo)
+    month = start.month - (start.month - 1) % months # back to the start of the quarter/year
+    starts = []
+    while True:
+        ordinal = _month_start(start.year, month)
+        starts.append(ordinal)
+        if ordinal > hi:
+            return starts
+        if len(starts) > MAX_BUCKETS:
+            raise ValueError(f"The window spans more than {MAX_BUCKETS} {zoom}s")
+        month += months
+
+def lane_key(item: Dict[str, Any], grouping: Optional[str]) -> Any:
+    if not grouping:
+        return None
+    return item.get(GROUPING_FIELDS.get(grouping, grouping))
+
+def build_timeline(items: Iterable[Dict[str, Any]], lo: int, hi: int, zoom: str,
+                   grouping: Optional[str] = "swimlane_key", lane_order: Iterable[Any] = (),
+                   density: Optional[bool] = None, max_bars: int = MAX_BARS) -> Dict[str, Any]:
+    """Lanes of bars (or density counts) for the items overlapping [lo, hi].
+
+    Lanes listed in `lane_order` come first, even when empty, then the rest
+    by key with the unkeyed lane last. `density` None picks density for
+    coarse zooms or more than `max_bars` items.
+    """
+    starts = bucket_starts(lo, hi, zoom)
+    n_buckets = len(starts) - 1
+    placed: List[Tuple[Dict[str, Any], int, int]] = []
+    for item in items:
+        span = span_of(item.get("startAt"), item.get("endAt"))
+        if span is not None and span[0] <= hi and span[1] >= lo:
+            placed.append((item, span[0], span[1]))
+    if density is None:
+        density = zoom in DENSITY_ZOOMS or len(placed) > max_bars
+
+    lanes: Dict[Any, List[Tuple[Dict[str, Any], int, int]]] = {key: [] for key in lane_order}
+    for entry in placed:
+        lanes.setdefault(lane_key(entry[0], grouping), []).append(entry)
+    listed = list(dict.fromkeys(lane_order))
+    rest = sorted((key for key in lanes if key not in listed), key=lambda key: (key is None, str(key)))
+    order = listed + rest
+
+    def bucket(ordinal: int) -> int:
+        return bisect_right(starts, ordinal) - 1
+
+    result_lanes = []
+    for key in order:
+        entries = lanes[key]
+        lane: Dict[str, Any] = {"key": key, "count": len(entries)}
+        if density:
+            # Difference array over buckets: +1 where an item starts, -1 after it ends
+            diff = [0] * (n_buckets + 1)
+            for _, start, end in entries:
+                diff[bucket(max(start, lo))] += 1
+                diff[bucket(min(end, hi)) + 1] -= 1
+            counts, running = [], 0
+            for k in range(n_buckets):
+                running += diff[k]
+                counts.append(running)
+            lane["density"] = counts
+        else:
+            entries.sort(key=lambda e: (e[0].get("sortOrder") or 0, e[1], str(e[0].get("id"))))
+            lane["items"] = [{
+                "id": item.get("id"),
+                "title": item.get("title"),
+                "type": item.get("type"),
+                "deploymentId": item.get("deploymentId"),
+                "percentComplete": item.get("percentComplete", 0),
+                "startAt": item.get("startAt"),
+                "endAt": item.get("endAt"),
+                "start": date.fromordinal(max(start, lo)).isoformat(),
+                "end": date.fromordinal(min(end, hi)).isoformat(),
+                "clippedStart": start < lo,
+                "clippedEnd": end > hi,
+                "startBucket": bucket(max(start, lo)),
+                "endBucket": bucket(min(end, hi)),
+            } for item, start, end in entries]
+        result_lanes.append(lane)
+
+    return {
+        "start": date.fromordinal(lo).isoformat(),
+        "end": date.fromordinal(hi).isoformat(),
+        "zoom": zoom,
+        "mode": "density" if density else "bars",
+        "buckets": [date.fromordinal(s).isoformat() for s in starts[:-1]],
+        "lanes": result_lanes,
+    }
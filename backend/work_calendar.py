@@ -0,0 +1,184 @@
+"""Working calendars with O(1) working-day arithmetic.
+
+A WorkCalendar is a weekday mask, a set of non-working dates (holidays) and
+per-date exceptions that set that day's capacity in hours (0 makes it a day
+off, anything else a working day, weekend or not). Over a horizon of days it
+keeps per-day capacity, the running count of working days and of capacity
+hours, and the working days themselves in order. Counting working days or
+hours in a range, stepping N working days and listing the working days in a
+range are then index lookups. The horizon starts around the first date asked
+about and grows to cover any later query, up to MAX_HORIZON_DAYS; past that
+it is rebuilt around the new query, and a query spanning more raises
+ValueError. A calendar that works every day at its base capacity keeps no
+arrays at all.
+
+Resource.calendar is read as:
+{"workingDays": [1..7 ISO weekdays], "nonWorkingDates": ["YYYY-MM-DD", ...],
+ "exceptions": {"YYYY-MM-DD": hours}}; an empty calendar works every day.
+"""
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from date_utils import parse_date
+
+ALL_WEEKDAYS = frozenset(range(7))
+HORIZON_DAYS = 4 * 366 # initial span, centered loosely on the first query
+MAX_HORIZON_DAYS = 100 * 366 # bounds the arrays kept per calendar
+
+class WorkCalendar:
+    def __init__(self, working_weekdays: Iterable[int] = ALL_WEEKDAYS, holidays: Iterable[int] = (),
+                 capacity: float = 8.0, exceptions: Optional[Dict[int, float]] = None):
+        self.working_weekdays: FrozenSet[int] = frozenset(working_weekdays) # date.weekday() values
+        self.holidays: FrozenSet[int] = frozenset(holidays)                 # ordinals
+        self.capacity = capacity
+        self.exceptions: Dict[int, float] = dict(exceptions or {})          # ordinal -> hours
+        self._origin = 0
+        self._end = 0 # horizon is [origin, end)
+        self._daily: List[float] = []
+        self._count: List[int] = []    # working days in [origin, origin + k)
+        self._hours: List[float] = []  # capacity hours in [origin, origin + k)
+        self._working: List[int] = []  # working ordinals in the horizon, ascending
+
+    @property
+    def every_day(self) -> bool:
+        """True if every day is a working day at the base capacity."""
+        return self.working_weekdays == ALL_WEEKDAYS and not self.holidays and not self.exceptions
+
+    # --- Horizon ---
+
+    def _cover(self, start: int, end: int):
+        """Make sure [start, end] lies in the horizon."""
+        if self._origin <= start and end < self._end:
+            return
+        if end + 1 - start > MAX_HORIZON_DAYS:
+            raise ValueError(f"Date range spans more than {MAX_HORIZON_DAYS} days")
+        if self._end == self._origin:
+            lo, hi = start - HORIZON_DAYS // 4, end + 1 + HORIZON_DAYS
+        else:
+            # Grow at least by the current span so repeated extension stays linear
+            span = self._end - self._origin
+            lo = min(start, self._origin - span) if start < self._origin else self._origin
+            hi = max(end + 1, self._end + span) if end >= self._end else self._end
+        if hi - lo > MAX_HORIZON_DAYS:
+            # Too far from what is held: start over around this query
+            pad = (MAX_HORIZON_DAYS - (end + 1 - start)) // 2
+            lo, hi = start - pad, end + 1 + pad
+        self._build(max(1, lo), hi)
+
+    def _build(self, origin: int, end: int):
+        weekdays, holidays, exceptions, capacity = self.working_weekdays, self.holidays, self.exceptions, self.capacity
+        daily = []
+        for ordinal in range(origin, end):
+            hours = exceptions.get(ordinal)
+            if hours is None:
+                # date.fromordinal(o).weekday() == (o - 1) % 7
+                hours = capacity if (ordinal - 1) % 7 in weekdays and ordinal not in holidays else 0.0
+            daily.append(hours)
+        self._origin, self._end = origin, end
+        self._daily = daily
+        self._working = [origin + k for k, hours in enumerate(daily) if hours > 0]
+        self._count = list(accumulate((hours > 0 for hours in daily), initial=0))
+        self._hours = list(accumulate(daily, initial=0.0))
+
+    # --- Queries ---
+
+    def hours_on(self, ordinal: int) -> float:
+        """Capacity on one day; 0 on a day off."""
+        if self.every_day:
+            return self.capacity
+        self._cover(ordinal, ordinal)
+        return self._daily[ordinal - self._origin]
+
+    def daily(self, start: int, end: int) -> List[float]:
+        """Capacity per day over [start, end]."""
+        if end < start:
+            return []
+        if self.every_day:
+            return [self.capacity] * (end + 1 - start)
+        self._cover(start, end)
+        return self._daily[start - self._origin:end + 1 - self._origin]
+
+    def is_working(self, ordinal: int) -> bool:
+        return self.hours_on(ordinal) > 0
+
+    def count(self, start: int, end: int) -> int:
+        """Working days in [start, end]."""
+        if end < start:
+            return 0
+        if self.every_day:
+            return end + 1 - start
+        self._cover(start, end)
+        return self._count[end + 1 - self._origin] - self._count[start - self._origin]
+
+    def hours(self, start: int, end: int) -> float:
+        """Capacity hours in [start, end]."""
+        if end < start:
+            return 0.0
+        if self.every_day:
+            return self.capacity * (end + 1 - start)
+        self._cover(start, end)
+        return self._hours[end + 1 - self._origin] - self._hours[start - self._origin]
+
+    def days(self, start: int, end: int) -> List[int]:
+        """The working days in [start, end], ascending."""
+        if end < start:
+            return []
+        if self.every_day:
+            return list(range(start, end + 1))
+        self._cover(start, end)
+        return self._working[self._count[start - self._origin]:self._count[end + 1 - self._origin]]
+
+    def add(self, ordinal: int, n: int) -> int:
+        """The working day n working days after `ordinal` (before, if n < 0); `ordinal` itself if n == 0.
+
+        Raises ValueError if the calendar runs out of working days.
+        """
+        if n == 0 or self.every_day:
+            return ordinal + n
+        if not self.working_weekdays:
+            # Only exceptions work, and there are finitely many of them
+            working = sorted(o for o, hours in self.exceptions.items() if hours > 0)
+            k = bisect_right(working, ordinal) + n - 1 if n > 0 else bisect_left(working, ordinal) + n
+            if 0 <= k < len(working):
+                return working[k]
+            raise ValueError("Not enough working days in the calendar")
+        # Holidays are finite, so growing the horizon eventually finds the day;
+        # each step adds about the weeks the missing working days need
+        per_week = len(self.working_weekdays)
+        while True:
+            self._cover(ordinal, ordinal)
+            before = self._count[ordinal - self._origin] # index of the first working day >= ordinal
+            if n > 0:
+                k = before + (1 if self._daily[ordinal - self._origin] > 0 else 0) + n - 1
+                if k < len(self._working):
+                    return self._working[k]
+                self._cover(ordinal, self._end + 7 * ((k - len(self._working)) // per_week + 1))
+            else:
+                k = before + n
+                if k >= 0:
+                    return self._working[k]
+                if self._origin == 1:
+                    raise ValueError("Not enough working days in the calendar")
+                self._cover(max(1, self._origin - 7 * (-k // per_week + 1)), ordinal)
+
+def parse_calendar(spec: Optional[Dict[str, Any]]) -> Tuple[FrozenSet[int], FrozenSet[int], Tuple[Tuple[int, float], ...]]:
+    """(weekdays, holiday ordinals, exceptions) from a Resource.calendar-shaped dict."""
+    spec = spec or {}
+    working = spec.get('workingDays')
+    weekdays = frozenset(int(day) - 1 for day in working) if working else ALL_WEEKDAYS
+    holidays = frozenset(parse_date(day).toordinal() for day in spec.get('nonWorkingDates') or [])
+    exceptions = tuple(sorted((parse_date(day).toordinal(), float(hours))
+                              for day, hours in (spec.get('exceptions') or {}).items()))
+    return weekdays, holidays, exceptions
+
+@lru_cache(maxsize=256)
+def shared_calendar(weekdays: FrozenSet[int], holidays: FrozenSet[int], capacity: float,
+                    exceptions: Tuple[Tuple[int, float], ...] = ()) -> WorkCalendar:
+    """One WorkCalendar per distinct definition, so resources on the same calendar share its arrays."""
+    return WorkCalendar(weekdays, holidays, capacity, dict(exceptions))
+
+def calendar_from_spec(spec: Optional[Dict[str, Any]], capacity: float = 8.0) -> WorkCalendar:
+    weekdays, holidays, exceptions = parse_calendar(spec)
+    return shared_calendar(weekdays, holidays, float(capacity), exceptions)
@@ -1,4 +1,4 @@
-import { useState, useEffect, createContext, useContext } from 'react';
+import { useState, useEffect, useRef, createContext, useContext } from 'react';
 
 const StoreContext = createContext();
 
@@ -25,50 +25,188 @@ const INITIAL_DATA = {
     }
 };
 
+const API_DATA = 'http://localhost:8000/api/data';
+const RETRY_MIN_MS = 1000;
+const RETRY_MAX_MS = 30000;
+
+const isPlainObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+const hasIds = (records) => records.every(r => isPlainObject(r) && r.id !== undefined);
+
+// Builds a PATCH /api/data payload from the last state the server acknowledged.
+// State updates are immutable, so a changed record is a new object reference.
+const diffData = (prev, next) => {
+    const delta = { upserts: {}, deletes: {}, replace: {} };
+    let changed = false;
+
+    Object.keys(next).forEach(key => {
+        const before = prev[key];
+        const after = next[key];
+        if (before === after) return;
+        changed = true;
+
+        if (Array.isArray(before) && Array.isArray(after) && hasIds(before) && hasIds(after)) {
+            const beforeById = new Map(before.map(r => [r.id, r]));
+            const afterIds = new Set(after.map(r => r.id));
+            const upserts = after.filter(r => beforeById.get(r.id) !== r);
+            const deletes = before.filter(r => !afterIds.has(r.id)).map(r => r.id);
+            if (upserts.length) delta.upserts[key] = upserts;
+            if (deletes.length) delta.deletes[key] = deletes;
+        } else if (isPlainObject(before) && isPlainObject(after)) {
+            const upserts = {};
+            Object.keys(after).forEach(k => {
+                if (before[k] !== after[k]) upserts[k] = after[k];
+            });
+            const deletes = Object.keys(before).filter(k => !(k in after));
+            if (Object.keys(upserts).length) delta.upserts[key] = upserts;
+            if (deletes.length) delta.deletes[key] = deletes;
+        } else {
+            delta.replace[key] = after;
+        }
+    });
+
+    return changed ? delta : null;
+};
+
+// Applies a /api/changes payload (same shape as the PATCH body) to local state.
+const applyDelta = (current, delta) => {
+    const next = { ...current, ...delta.replace };
+    Object.entries(delta.upserts).forEach(([key, upserts]) => {
+        if (Array.isArray(upserts)) {
+            const byId = new Map(upserts.map(r => [r.id, r]));
+            const existing = (next[key] || []).map(r => byId.get(r.id) || r);
+            const existingIds = new Set(existing.map(r => r.id));
+            next[key] = [...existing, ...upserts.filter(r => !existingIds.has(r.id))];
+        } else {
+            next[key] = { ...(next[key] || {}), ...upserts };
+        }
+    });
+    Object.entries(delta.deletes).forEach(([key, ids]) => {
+        if (Array.isArray(next[key])) {
+            const removed = new Set(ids);
+            next[key] = next[key].filter(r => !removed.has(r.id));
+        } else {
+            next[key] = { ...next[key] };
+            ids.forEach(id => delete next[key][id]);
+        }
+    });
+    return next;
+};
+
 export function StoreProvider({ children }) {
     const [data, setData] = useState(INITIAL_DATA);
     const [isLoaded, setIsLoaded] = useState(false);
+    const [syncError, setSyncError] = useState(null);
+    const syncedRef = useRef(null); // Last state the server has acknowledged
+    const revisionRef = useRef(null); // Server revision that state corresponds to
+    const dataRef = useRef(data); // Latest local state, for saves that outlive a render
+    const savingRef = useRef(false); // A PATCH is in flight
+    const retryRef = useRef({ timer: null, delay: RETRY_MIN_MS });
+    dataRef.current = data;
+
+    const fetchData = async () => {
+        try {
+            const response = await fetch(API_DATA);
+            if (response.ok) {
+                const jsonData = await response.json();
+                const loaded = { ...INITIAL_DATA, ...jsonData };
+                revisionRef.current = Number(response.headers.get('X-Revision'));
+                syncedRef.current = loaded;
+                setData(loaded);
+            } else {
+                console.error("Failed to fetch data");
+            }
+        } catch (error) {
+            console.error("Error connecting to backend:", error);
+        }
+    };
+
+    // Pull records other clients changed since our revision
+    const fetchChanges = async () => {
+        try {
+            const response = await fetch(`http://localhost:8000/api/changes?since=${revisionRef.current}`);
+            if (!response.ok) return;
+            const changes = await response.json();
+            if (changes.full) {
+                await fetchData();
+                return;
+            }
+            const base = syncedRef.current;
+            syncedRef.current = applyDelta(base, changes);
+            revisionRef.current = changes.revision;
+            // Keep local edits not yet saved on top of the server's changes
+            setData(prev => {
+                const unsaved = diffData(base, prev);
+                const merged = applyDelta(prev, changes);
+                return unsaved ? applyDelta(merged, unsaved) : merged;
+            });
+        } catch (error) {
+            console.error("Failed to fetch changes:", error);
+        }
+    };
 
     // Fetch initial data
     useEffect(() => {
-        const fetchData = async () => {
-            try {
-                const response = await fetch('http://localhost:8000/api/data');
-                if (response.ok) {
-                    const jsonData = await response.json();
-                    setData({ ...INITIAL_DATA, ...jsonData });
-                } else {
-                    console.error("Failed to fetch data");
-                }
-            } catch (error) {
-                console.error("Error connecting to backend:", error);
-            } finally {
-                setIsLoaded(true);
-            }
-        };
-        fetchData();
+        fetchData().finally(() => setIsLoaded(true));
     }, []);
 
-    // Sync to backend on change
-    useEffect(() => {
-        if (!isLoaded) return;
+    // Send local changes to the backend, one PATCH at a time. Edits made
+    // while a PATCH is in flight are diffed against the acknowledged state
+    // once it resolves, so nothing is resent against a stale revision.
+    const saveData = async () => {
+        if (savingRef.current) return; // the running save picks up new edits
+        savingRef.current = true;
+        clearTimeout(retryRef.current.timer);
+        try {
+            for (;;) {
+                const snapshot = dataRef.current;
+                const delta = diffData(syncedRef.current, snapshot);
+                if (!delta) break;
 
-        const saveData = async () => {
-            try {
-                await fetch('http://localhost:8000/api/data', {
-                    method: 'POST',
+                const baseRevision = revisionRef.current;
+                const response = await fetch(API_DATA, {
+                    method: 'PATCH',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(data)
+                    body: JSON.stringify({ revision: baseRevision, ...delta })
                 });
-            } catch (error) {
-                console.error("Failed to save data:", error);
+                if (response.status === 409) {
+                    // Another client changed the same records; take the server copy.
+                    console.warn("Sync conflict, reloading data from server");
+                    await fetchData();
+                    break;
+                }
+                if (!response.ok) throw new Error(`Saving failed with status ${response.status}`);
+                const result = await response.json();
+                syncedRef.current = snapshot;
+                if (result.revision !== baseRevision + 1) {
+                    // Other clients saved in between; pick up their changes too.
+                    await fetchChanges();
+                } else {
+                    revisionRef.current = result.revision;
+                }
             }
-        };
+            retryRef.current.delay = RETRY_MIN_MS;
+            setSyncError(null);
+        } catch (error) {
+            // Unsaved edits stay in local state; try again with backoff
+            console.error("Failed to save data:", error);
+            setSyncError(error.message);
+            const delay = retryRef.current.delay;
+            retryRef.current.delay = Math.min(delay * 2, RETRY_MAX_MS);
+            retryRef.current.timer = setTimeout(saveData, delay);
+        } finally {
+            savingRef.current = false;
+        }
+    };
 
+    // Sync changed records to backend
+    useEffect(() => {
+        if (!isLoaded || !syncedRef.current) return;
         const timeoutId = setTimeout(saveData, 500); // 500ms debounce
         return () => clearTimeout(timeoutId);
     }, [data, isLoaded]);
 
+    useEffect(() => () => clearTimeout(retryRef.current.timer), []);
+
     // Deployments
     const addDeployment = (deployment) => {
         setData(prev => ({ ...prev, deployments: [...prev.deployments, deployment] }));
@@ -183,6 +321,7 @@ export function StoreProvider({ children }) {
     return (
         <StoreContext.Provider value={{
             data,
+            syncError,
             addDeployment,
             updateDeployment,
             addLaborCategory,